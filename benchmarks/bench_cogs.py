@@ -0,0 +1,112 @@
+"""
+Benchmarks for `YoBot.load_cogs`.
+
+Generates synthetic cog directories of 10, 100 and 500 cogs and times loading all of them.
+Each synthetic cog has a prefix command and a listener, like the cogs installed through
+`getcogs`, and the first 50 also have a hybrid command, staying under Discord's limit of 100
+global slash commands. Bytecode is warmed first so the timing covers the loader.
+
+Run: `python benchmarks/bench_cogs.py --sizes 10 100 500`
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+import harness
+
+SUITE = 'cogs'
+COG_TEMPLATE = '''from discord.ext import commands
+
+
+class Synthetic{index}Cog(commands.Cog):
+    def __init__(self, yobot):
+        self.yobot = yobot
+
+    @commands.command(name='synthetic{index}')
+    async def synthetic(self, ctx):
+        await ctx.send('synthetic {index}')
+
+{hybrid}
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        pass
+
+
+async def setup(yobot):
+    await yobot.add_cog(Synthetic{index}Cog(yobot))
+'''
+HYBRID_TEMPLATE = '''    @commands.hybrid_command(name='hybrid{index}')
+    async def hybrid(self, ctx):
+        await ctx.send('hybrid {index}')
+'''
+HYBRID_COGS = 50
+
+
+def write_cogs(cogs_dir: str, size: int) -> None:
+    """Writes a number of synthetic cogs into a directory."""
+    os.makedirs(cogs_dir, exist_ok=True)
+    for index in range(size):
+        with open(os.path.join(cogs_dir, f'synthetic{size}_{index}_cog.py'), 'w') as f:
+            name = f'{size}_{index}'
+            hybrid = HYBRID_TEMPLATE.format(index=name) if index < HYBRID_COGS else ''
+            f.write(COG_TEMPLATE.format(index=name, hybrid=hybrid))
+
+
+async def unload_all(yobot, size: int) -> None:
+    """Unloads every synthetic cog of a size and forgets the modules so they are imported again."""
+    for name in [name for name in yobot.extensions if name.startswith(f'cogs.synthetic{size}_')]:
+        await yobot.unload_extension(name)
+    for name in [name for name in sys.modules if name.startswith(f'cogs.synthetic{size}_')]:
+        del sys.modules[name]
+
+
+async def measure(sizes: list, repeat: int) -> dict:
+    """Times loading synthetic cog directories of each size."""
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        cogs_package = importlib.import_module('cogs')
+        for size in sizes:
+            yobot.cogs_dir = os.path.join(work_dir, 'cogs', str(size))
+            write_cogs(yobot.cogs_dir, size)
+            importlib.invalidate_caches()
+            # The loader imports `cogs.<file>`, so each size joins the `cogs` namespace package.
+            # Iterating first lets the namespace path recalculate, or it would drop the new entry.
+            list(cogs_package.__path__)  # type: ignore
+            cogs_package.__path__.append(yobot.cogs_dir)  # type: ignore
+            await yobot.load_cogs()  # Warm up bytecode.
+            await unload_all(yobot, size)
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await yobot.load_cogs()
+                best = min(best, time.perf_counter() - started)
+                await unload_all(yobot, size)
+            metrics[f'load_{size}_cogs'] = harness.metric(best * 1000, 'ms')
+            metrics[f'load_{size}_cogs_per_cog'] = harness.metric(best / size * 1e6, 'us')
+        await yobot.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args.sizes, args.repeat))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500], help='Cog directory sizes.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per size, the fastest is kept.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
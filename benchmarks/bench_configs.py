@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks for `Configs`.
+
+Measures `get`, `set_all`, `load` and `save` for each supported file type, using a config
+shaped like the one `launch_bot` writes. INI files only support whole-section access
+through `set_all`, so `get` is not measured for them.
+
+Run: `python benchmarks/bench_configs.py`
+"""
+import argparse
+import configparser
+import json
+import os
+
+import harness
+import yaml
+
+from utils.yobot_configs import Configs
+
+SUITE = 'configs'
+
+
+def write_config(work_dir: str, file_type: str) -> str:
+    """Writes a sample config of the given type and returns its path."""
+    with open(harness.make_config(work_dir), 'r') as f:
+        data = yaml.safe_load(f)
+    path = os.path.join(work_dir, f'config.{file_type}')
+    if file_type == 'ini':
+        parser = configparser.ConfigParser()
+        for section, values in data.items():
+            if isinstance(values, dict):
+                parser[section] = {k: str(v) for k, v in values.items()}
+        with open(path, 'w') as f:
+            parser.write(f)
+    elif file_type == 'json':
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+    else:
+        with open(path, 'w') as f:
+            yaml.dump(data, f)
+    return path
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        for file_type in ('yaml', 'json', 'ini'):
+            config = Configs(write_config(work_dir, file_type))
+            config.load()
+            if file_type == 'ini':
+                def set_all():
+                    config.set_all('cog_repo', {'repo_owner': 'RareMojo', 'repo_name': 'YoBot-Discord-Cogs'})
+            else:
+                def set_all():
+                    config.set_all('blacklist.cog_removal', ['yobotcorecog.py', 'yobotcommandcog.py'])
+                metrics[f'{file_type}_get'] = harness.metric(
+                    harness.time_call(lambda: config.get('file_paths.cogs_dir'), args.number) * 1e6, 'us')
+            metrics[f'{file_type}_set_all'] = harness.metric(harness.time_call(set_all, args.number) * 1e6, 'us')
+            metrics[f'{file_type}_load'] = harness.metric(harness.time_call(config.load, args.number // 20) * 1e6, 'us')
+            metrics[f'{file_type}_save'] = harness.metric(harness.time_call(config.save, args.number // 20) * 1e6, 'us')
+    return metrics
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--number', type=int, default=2000, help='Calls per timing run.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
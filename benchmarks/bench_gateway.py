@@ -0,0 +1,90 @@
+"""
+End-to-end throughput benchmarks against the offline Discord stand-in.
+
+Measures startup-to-ready time, prefix command throughput through `YoBotCommandCog`
+and slash command round-trip latency.
+
+Run: `python benchmarks/bench_gateway.py`
+"""
+import argparse
+import asyncio
+import time
+
+import harness
+from fake_discord import FakeDiscord
+
+SUITE = 'gateway'
+
+
+async def measure(messages: int = 500, interactions: int = 200) -> dict:
+    """
+    Runs the gateway benchmarks.
+
+    Args:
+        messages (int): The number of prefix commands to push through the bot.
+        interactions (int): The number of slash commands to time.
+
+    Returns:
+        dict: The measured metrics.
+    """
+    metrics = {}
+    fake = await FakeDiscord(guilds=2, channels=4, members=50).start()
+    with harness.work_dir() as work_dir:
+        started = time.perf_counter()
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        built = time.perf_counter()
+        await yobot.load_cogs()
+        # This is what `YoBot.start` does, split so the ready wait can be set up after login.
+        await yobot.login(yobot.config_file.get('discord_token'))
+        bot_task = asyncio.create_task(yobot.connect())
+        try:
+            await asyncio.wait_for(yobot.wait_until_ready(), timeout=30)
+            ready = time.perf_counter()
+            metrics['build_time'] = harness.metric((built - started) * 1000, 'ms')
+            metrics['startup_to_ready'] = harness.metric((ready - started) * 1000, 'ms')
+
+            # Prefix commands: each `!ping` is answered with one channel message.
+            key = 'POST /channels/{id}/messages'
+            done = fake.expect_calls(key, fake.requests.get(key, 0) + messages)
+            sent = time.perf_counter()
+            for i in range(messages):
+                await fake.send_message('!ping', channel=i % 4)
+            finished = await asyncio.wait_for(done, timeout=60)
+            metrics['prefix_commands_per_second'] = harness.metric(messages / (finished - sent), 'msg/s', better='higher')
+
+            # Slash commands: time from INTERACTION_CREATE to the interaction callback.
+            samples = []
+            for _ in range(interactions):
+                interaction = fake.make_interaction('ping')
+                prefix = f"POST /interactions/{interaction['id']}/"
+                answered = fake.expect(lambda route, body: route.startswith(prefix))
+                sent = time.perf_counter()
+                await fake.dispatch('INTERACTION_CREATE', interaction)
+                samples.append(await asyncio.wait_for(answered, timeout=10) - sent)
+            metrics.update(harness.latency_metrics('interaction_round_trip', samples))
+        finally:
+            await yobot.close()
+            await asyncio.gather(bot_task, return_exceptions=True)
+            await fake.stop()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(messages=args.messages, interactions=args.interactions))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--messages', type=int, default=500, help='Prefix commands to send.')
+    parser.add_argument('--interactions', type=int, default=200, help='Slash commands to time.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,114 @@
+"""
+Benchmarks for `YoBotHTTP`, the shared HTTP client for cogs.
+
+Serves a small JSON API from a local aiohttp server and fetches it the way cogs do today,
+with a new session and connection for every request, then through the shared client with
+pooled keep-alive connections, fresh cache hits and ETag revalidation.
+
+Run: `python benchmarks/bench_http.py --requests 500`
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+import aiohttp
+from aiohttp import web
+
+import harness
+
+SUITE = 'http'
+BODY = json.dumps({'items': [{'id': index, 'name': f'item {index}'} for index in range(100)]}).encode()
+ETAG = f'"{hashlib.sha1(BODY).hexdigest()}"'
+
+
+async def handler(request: web.Request) -> web.Response:
+    """Returns the JSON body, or a 304 when the client already has it."""
+    request.app['counts']['hits'] += 1
+    if request.headers.get('If-None-Match') == ETAG:
+        return web.Response(status=304, headers={'ETag': ETAG})
+    return web.Response(body=BODY, content_type='application/json', headers={'ETag': ETAG})
+
+
+async def start_server() -> tuple:
+    """Starts the local API on a free port and returns its runner and URL."""
+    app = web.Application()
+    app['counts'] = {'hits': 0}
+    app.router.add_get('/api', handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+    return runner, app, f'http://127.0.0.1:{port}/api'
+
+
+async def measure(args: argparse.Namespace) -> dict:
+    """Times each way of fetching against the local API."""
+    from utils.yobot_http import YoBotHTTP
+
+    runner, app, url = await start_server()
+    metrics = {}
+    try:
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            async with aiohttp.ClientSession() as session:  # A session per request, as cogs do today.
+                async with session.get(url) as response:
+                    await response.read()
+        metrics['new_session_per_request'] = harness.metric((time.perf_counter() - started) / args.requests * 1e6, 'us')
+
+        with harness.work_dir() as work_dir:
+            client = YoBotHTTP(harness.build_yobot(harness.make_config(work_dir)))
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                await client.get(url)
+            metrics['pooled'] = harness.metric((time.perf_counter() - started) / args.requests * 1e6, 'us')
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client.get(url) for _ in range(args.requests)))
+            metrics['pooled_concurrent'] = harness.metric((time.perf_counter() - started) / args.requests * 1e6, 'us')
+
+            await client.get(url, ttl=3600)
+            hits = app['counts']['hits']
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                await client.get(url, ttl=3600)
+            metrics['cached'] = harness.metric((time.perf_counter() - started) / args.requests * 1e6, 'us')
+            metrics['cached_server_hits'] = harness.metric(app['counts']['hits'] - hits, 'requests')
+
+            await client.get(url, ttl=1e-9, params={'stale': 1})
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                # Always stale, so each request is a conditional GET answered with a 304.
+                await client.get(url, ttl=1e-9, params={'stale': 1})
+            metrics['revalidated'] = harness.metric((time.perf_counter() - started) / args.requests * 1e6, 'us')
+
+            stats = client.stats()['127.0.0.1']
+            print(f"{stats['requests']} requests, {stats['cache_hits']} cache hits, "
+                  f"{stats['revalidated']} revalidated, p95 {stats['p95']:.2f}ms.")
+            await client.close()
+    finally:
+        await runner.cleanup()
+    metrics['speedup'] = harness.metric(metrics['new_session_per_request']['value'] / metrics['pooled']['value'], 'x', better='higher')
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--requests', type=int, default=500, help='Requests made in each mode.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,47 @@
+"""
+Micro-benchmarks for the YoBot logger.
+
+Measures `YoBotLoggerFormat.format` and `YoBotLoggerRotator.emit`, which run for every log line.
+
+Run: `python benchmarks/bench_logger.py`
+"""
+import argparse
+import logging
+import os
+
+import harness
+
+from utils.yobot_logger import YoBotLoggerFormat, YoBotLoggerRotator
+
+SUITE = 'logger'
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    record = logging.LogRecord('YoBot', logging.INFO, __file__, 1, 'Loaded - [ %s ]', ('yobot_core_cog',), None)
+    formatter = YoBotLoggerFormat()
+    metrics = {'format': harness.metric(harness.time_call(lambda: formatter.format(record), args.number) * 1e6, 'us')}
+
+    with harness.work_dir() as work_dir:
+        handler = YoBotLoggerRotator(log_file=os.path.join(work_dir, 'latest.log'), maxBytes=1000000, backupCount=1)
+        handler.setFormatter(formatter)
+        try:
+            metrics['emit'] = harness.metric(harness.time_call(lambda: handler.emit(record), args.number) * 1e6, 'us')
+        finally:
+            handler.close()
+    return metrics
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--number', type=int, default=2000, help='Calls per timing run.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,70 @@
+"""
+Benchmarks for the event loops YoBot can run on, see `utils.yobot_loop`.
+
+Runs the gateway suite against the offline Discord stand-in once per loop: asyncio's own
+loop, uvloop when it is installed and asyncio with eager tasks on Python 3.12 and newer.
+Compares prefix command throughput, which is mostly gateway event dispatch, and slash
+command round-trip latency.
+
+Run: `python benchmarks/bench_loops.py --messages 500 --interactions 200`
+"""
+import argparse
+import asyncio
+import sys
+
+import harness
+from bench_gateway import measure as measure_gateway
+
+SUITE = 'loops'
+
+
+def loop_variants() -> dict:
+    """Returns a loop factory and task factory for each loop available here."""
+    from utils.yobot_loop import load_uvloop
+
+    variants = {'asyncio': (None, None)}
+    uvloop = load_uvloop()
+    if uvloop is not None:
+        variants['uvloop'] = (uvloop.new_event_loop, None)
+    eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+    if eager_task_factory is not None:
+        variants['asyncio_eager'] = (None, eager_task_factory)
+        if uvloop is not None:
+            variants['uvloop_eager'] = (uvloop.new_event_loop, eager_task_factory)
+    return variants
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    metrics = {}
+    for name, (loop_factory, task_factory) in loop_variants().items():
+        async def measure() -> dict:
+            if task_factory is not None:
+                asyncio.get_running_loop().set_task_factory(task_factory)
+            return await measure_gateway(messages=args.messages, interactions=args.interactions)
+
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            results = runner.run(measure())
+        print(f"{name}: {results['prefix_commands_per_second']['value']:.0f} commands/s, "
+              f"interaction p50 {results['interaction_round_trip_p50']['value']:.2f}ms")
+        for key in ('prefix_commands_per_second', 'interaction_round_trip_p50', 'interaction_round_trip_p95'):
+            metrics[f'{name}_{key}'] = results[key]
+    return metrics
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--messages', type=int, default=500, help='Prefix commands to send on each loop.')
+    parser.add_argument('--interactions', type=int, default=200, help='Slash commands to time on each loop.')
+
+
+if __name__ == '__main__':
+    if sys.version_info < (3, 11):
+        sys.exit('The loops suite needs Python 3.11 or newer to choose a loop per run.')
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
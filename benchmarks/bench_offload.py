@@ -0,0 +1,124 @@
+"""
+Benchmarks for `YoBotOffload`, the thread and process pools for blocking and CPU heavy work.
+
+A cog handles a burst of commands that each read a file and resize an image. Run inline, as
+cogs do today, every call stalls the event loop for its whole duration, so heartbeats and
+every other command wait behind it. The same calls go through `run_blocking` and `run_cpu`.
+Measures the loop lag seen by a ticker while the burst runs, and how long the burst takes.
+Blocking work is simulated with `time.sleep` and CPU work with a pure Python loop.
+
+Run: `python benchmarks/bench_offload.py --calls 40`
+"""
+import argparse
+import asyncio
+import time
+
+import harness
+
+SUITE = 'offload'
+
+
+def blocking_work(seconds: float) -> float:
+    """Stands in for blocking I/O such as reading a file or running a subprocess."""
+    time.sleep(seconds)
+    return seconds
+
+
+def cpu_work(rounds: int) -> int:
+    """Stands in for CPU heavy work such as resizing an image."""
+    total = 0
+    for value in range(rounds):
+        total = (total + value * value) % 1000003
+    return total
+
+
+async def lag_during(burst, tick: float = 0.005) -> tuple:
+    """Runs a burst while a ticker measures how late the loop runs it, returning the worst lag and the burst time."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(tick * 2)
+    started = time.perf_counter()
+    await burst()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+    lags.sort()
+    return lags[-1] if lags else 0.0, elapsed
+
+
+async def measure(args: argparse.Namespace) -> dict:
+    """Runs the same bursts inline and through the offload pools."""
+    from utils.yobot_offload import YoBotOffload
+
+    metrics = {}
+
+    async def inline_blocking() -> None:
+        for _ in range(args.calls):
+            blocking_work(args.blocking)
+
+    async def inline_cpu() -> None:
+        for _ in range(args.calls):
+            cpu_work(args.rounds)
+
+    lag, elapsed = await lag_during(inline_blocking)
+    metrics['inline_blocking_lag_max'] = harness.metric(lag * 1000, 'ms')
+    metrics['inline_blocking_seconds'] = harness.metric(elapsed, 's')
+    lag, elapsed = await lag_during(inline_cpu)
+    metrics['inline_cpu_lag_max'] = harness.metric(lag * 1000, 'ms')
+    metrics['inline_cpu_seconds'] = harness.metric(elapsed, 's')
+
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        offload = YoBotOffload(yobot, {'threads': args.workers, 'processes': args.processes, 'per_cog': args.workers})
+        await offload.warm_up()
+
+        async def offloaded_blocking() -> None:
+            await asyncio.gather(*(offload.run_blocking(blocking_work, args.blocking, cog='cogs.bench')
+                                   for _ in range(args.calls)))
+
+        async def offloaded_cpu() -> None:
+            await asyncio.gather(*(offload.run_cpu(cpu_work, args.rounds, cog='cogs.bench') for _ in range(args.calls)))
+
+        lag, elapsed = await lag_during(offloaded_blocking)
+        metrics['offload_blocking_lag_max'] = harness.metric(lag * 1000, 'ms')
+        metrics['offload_blocking_seconds'] = harness.metric(elapsed, 's')
+        lag, elapsed = await lag_during(offloaded_cpu)
+        metrics['offload_cpu_lag_max'] = harness.metric(lag * 1000, 'ms')
+        metrics['offload_cpu_seconds'] = harness.metric(elapsed, 's')
+        stats = offload.report()['cogs.bench']
+        metrics['offload_queue_p95'] = harness.metric(stats['queue_p95'], 'ms')
+        offload.shutdown()
+        yobot.store.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--calls', type=int, default=40, help='Calls in each burst.')
+    parser.add_argument('--blocking', type=float, default=0.02, help='Seconds each blocking call takes.')
+    parser.add_argument('--rounds', type=int, default=200000, help='Loop rounds in each CPU heavy call.')
+    parser.add_argument('--workers', type=int, default=8, help='Threads, and calls at once for the cog.')
+    parser.add_argument('--processes', type=int, default=2, help='Worker processes.')
+
+
+if __name__ == '__main__':  # The process pool starts workers with spawn, which imports this module again.
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,137 @@
+"""
+Benchmarks for `YoBotScheduler`, the shared timer for periodic jobs.
+
+Runs the same periodic jobs, like cogs refreshing feeds and cleaning caches, once as a
+sleeping task per job, as cogs do today with `tasks.loop` or `asyncio.sleep`, and once
+through the scheduler. Measures the CPU time spent, how often the loop wakes up, the timers
+pending on the loop and how late runs start.
+
+Run: `python benchmarks/bench_scheduler.py --jobs 1000 --seconds 3`
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import harness
+
+SUITE = 'scheduler'
+
+
+class WakeupCounter():
+    """Counts how many times the loop waits on its selector, once per loop iteration."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.selector = loop._selector  # type: ignore
+        self.select = self.selector.select
+        self.wakeups = 0
+        self.timers = 0
+        self.loop = loop
+        self.selector.select = self.counted
+
+    def counted(self, timeout=None):
+        self.wakeups += 1
+        self.timers = max(self.timers, len(self.loop._scheduled))  # type: ignore
+        return self.select(timeout)
+
+    def close(self) -> None:
+        self.selector.select = self.select
+
+
+def make_intervals(jobs: int) -> list:
+    """Returns each job's interval, a mix of fast and slow jobs."""
+    rng = random.Random(45)
+    return [rng.choice([0.05, 0.1, 0.25, 0.5, 1.0]) for _ in range(jobs)]
+
+
+async def sleep_loops(intervals: list, seconds: float) -> tuple:
+    """Runs each job in its own sleep loop, returning the CPU time, wakeups, pending timers and lateness."""
+    lateness = []
+
+    async def job_loop(interval: float) -> None:
+        expected = time.monotonic() + interval
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            lateness.append(now - expected)
+            expected = now + interval
+
+    counter = WakeupCounter(asyncio.get_running_loop())
+    cpu = time.process_time()
+    tasks = [asyncio.create_task(job_loop(interval)) for interval in intervals]
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu
+    counter.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return cpu, counter.wakeups, counter.timers, lateness
+
+
+async def scheduled(yobot, intervals: list, seconds: float) -> tuple:
+    """Runs each job through the scheduler, returning the CPU time, wakeups, pending timers and lateness."""
+    from utils.yobot_scheduler import YoBotScheduler
+
+    scheduler = YoBotScheduler(yobot, {'max_concurrency': len(intervals)})
+    lateness = []
+    jobs = []
+
+    def make_job(index: int, interval: float):
+        async def job() -> None:
+            lateness.append(time.monotonic() - (jobs[index].scheduled - interval))  # Already moved on to the next run.
+        return job
+
+    counter = WakeupCounter(asyncio.get_running_loop())
+    cpu = time.process_time()
+    scheduler.start()
+    for index, interval in enumerate(intervals):
+        jobs.append(scheduler.every(interval, make_job(index, interval), name=f'job {index}'))
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu
+    counter.close()
+    await scheduler.stop()
+    return cpu, counter.wakeups, counter.timers, lateness
+
+
+async def measure(args: argparse.Namespace) -> dict:
+    """Times both ways of running the jobs."""
+    intervals = make_intervals(args.jobs)
+    loops_cpu, loops_wakeups, loops_timers, loops_late = await sleep_loops(intervals, args.seconds)
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        scheduler_cpu, scheduler_wakeups, scheduler_timers, scheduler_late = await scheduled(yobot, intervals, args.seconds)
+        yobot.store.close()
+    loops_late.sort()
+    scheduler_late.sort()
+    print(f'{len(loops_late)} runs as sleep loops, {len(scheduler_late)} through the scheduler.')
+    return {
+        'sleep_loops_cpu': harness.metric(loops_cpu * 1000, 'ms'),
+        'sleep_loops_wakeups': harness.metric(loops_wakeups, 'wakeups'),
+        'sleep_loops_timers': harness.metric(loops_timers, 'timers'),
+        'sleep_loops_late_p95': harness.metric(loops_late[int(len(loops_late) * 0.95)] * 1000, 'ms'),
+        'scheduler_cpu': harness.metric(scheduler_cpu * 1000, 'ms'),
+        'scheduler_wakeups': harness.metric(scheduler_wakeups, 'wakeups'),
+        'scheduler_timers': harness.metric(scheduler_timers, 'timers'),
+        'scheduler_late_p95': harness.metric(scheduler_late[int(len(scheduler_late) * 0.95)] * 1000, 'ms'),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--jobs', type=int, default=1000, help='Periodic jobs, with intervals from 0.05 to 1 second.')
+    parser.add_argument('--seconds', type=float, default=3.0, help='How long each way runs.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,133 @@
+"""
+Benchmarks for `YoBotSendQueue`, the paced outgoing message queues.
+
+A log-forwarding cog posts bursts of short lines to a few channels. Sending them directly, as
+cogs do today, makes a request per line and most of them break Discord's per-channel limit,
+each one a 429 and a blocking retry in discord.py. The same bursts go through the send queue,
+joined and paced. Also measures how long an interaction reply waits while the queues are busy.
+Channels are simulated and the limits scaled down so the suite finishes in seconds.
+
+Run: `python benchmarks/bench_sendqueue.py --lines 1000`
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+import harness
+
+SUITE = 'sendqueue'
+RATE, PER = 5, 0.25  # Discord allows 5 messages per 5 seconds per channel, scaled down 20 times.
+
+
+class SimChannel():
+    """A channel that counts the messages that would have been rate limited."""
+
+    def __init__(self, channel_id: int, latency: float):
+        self.id = channel_id
+        self.latency = latency
+        self.sent: deque = deque()
+        self.requests = 0
+        self.limited = 0
+
+    async def send(self, content=None, **kwargs):
+        now = time.monotonic()
+        while self.sent and now - self.sent[0] >= PER:
+            self.sent.popleft()
+        self.requests += 1
+        if len(self.sent) >= RATE:
+            self.limited += 1
+        self.sent.append(now)
+        await asyncio.sleep(self.latency)
+        return content
+
+
+class SimInteraction(discord.Interaction):
+    """An interaction that only needs an ID and a response, for timing replies."""
+
+    def __init__(self, interaction_id: int, latency: float):
+        self.id = interaction_id
+        self.latency = latency
+        self.replied = asyncio.get_running_loop().create_future()
+
+    @property
+    def response(self):
+        return self
+
+    def is_done(self) -> bool:
+        return False
+
+    async def send_message(self, content=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.replied.set_result(time.perf_counter())
+
+
+async def measure(args: argparse.Namespace) -> dict:
+    """Sends the same bursts directly and through the queue."""
+    from utils.yobot_sendqueue import YoBotSendQueue
+
+    lines = [f'[{index:05d}] member joined, role given, welcome message sent' for index in range(args.lines)]
+    metrics = {}
+
+    channels = [SimChannel(index, args.latency) for index in range(args.channels)]
+    await asyncio.gather(*(channels[index % len(channels)].send(line) for index, line in enumerate(lines)))
+    metrics['direct_requests'] = harness.metric(sum(channel.requests for channel in channels), 'requests')
+    metrics['direct_rate_limited'] = harness.metric(sum(channel.limited for channel in channels), 'requests')
+
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        queue = YoBotSendQueue(yobot, {'channel_rate': RATE, 'channel_per': PER, 'global_rate': 1000, 'max_depth': args.lines})
+        channels = [SimChannel(index, args.latency) for index in range(args.channels)]
+        started = time.perf_counter()
+        futures = [queue.send(channels[index % len(channels)], line, coalesce=True, priority='low')
+                   for index, line in enumerate(lines)]
+        await asyncio.gather(*futures)
+        metrics['queued_seconds'] = harness.metric(time.perf_counter() - started, 's')
+        metrics['queued_requests'] = harness.metric(sum(channel.requests for channel in channels), 'requests')
+        metrics['queued_rate_limited'] = harness.metric(sum(channel.limited for channel in channels), 'requests')
+
+        # Interaction replies while every channel has a backlog and the global limit is reached.
+        queue = YoBotSendQueue(yobot, {'channel_rate': RATE, 'channel_per': PER, 'global_rate': 20, 'global_per': PER,
+                                       'interaction_reserve': 4, 'max_depth': args.lines})
+        channels = [SimChannel(index, args.latency) for index in range(args.channels * 4)]
+        backlog = [queue.send(channels[index % len(channels)], line, priority='low') for index, line in enumerate(lines)]
+        await asyncio.sleep(PER)
+        replies = []
+        for index in range(args.interactions):
+            interaction = SimInteraction(index, args.latency)
+            started = time.perf_counter()
+            queue.respond(interaction, 'pong')
+            replies.append(await interaction.replied - started)
+            await asyncio.sleep(PER / 3)  # Within the 4 sends per window kept for interactions.
+        await queue.drain(0)
+        await asyncio.gather(*backlog, return_exceptions=True)
+        replies.sort()
+        metrics['interaction_reply_p50'] = harness.metric(replies[len(replies) // 2] * 1000, 'ms')
+        metrics['interaction_reply_p95'] = harness.metric(replies[int(len(replies) * 0.95)] * 1000, 'ms')
+        yobot.store.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--lines', type=int, default=1000, help='Log lines sent in the burst.')
+    parser.add_argument('--channels', type=int, default=5, help='Channels the lines are spread over.')
+    parser.add_argument('--interactions', type=int, default=20, help='Interaction replies timed under load.')
+    parser.add_argument('--latency', type=float, default=0.005, help='Simulated request latency in seconds.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,109 @@
+"""
+Benchmarks for `YoBotSnapshot`, the warm-start snapshot of guild state.
+
+Saves the same guild records, with their roles, permission role sets, prefixes and cogs
+turned off, as the binary snapshot and as JSON. Measures the size on disk, how long saving
+takes, how long until the first guild can be read after a restart and how long reading
+every guild takes. JSON has to be parsed in full before any guild can be read.
+
+Run: `python benchmarks/bench_snapshot.py --guilds 1000 --roles 40`
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import harness
+
+SUITE = 'snapshot'
+
+
+def make_records(guilds: int, roles: int) -> list:
+    """Returns guild records shaped like a bot's guilds."""
+    from utils.yobot_snapshot import YoBotGuildSnapshot
+
+    rng = random.Random(49)
+    records = []
+    for index in range(guilds):
+        guild_id = 10 ** 17 + index * 1000
+        role_map = {guild_id + role: (f'role-{role}', rng.getrandbits(40), role) for role in range(roles)}
+        allowed = {'admin': frozenset(rng.sample(list(role_map), 2)), 'mod': frozenset(rng.sample(list(role_map), 3))}
+        records.append(YoBotGuildSnapshot(guild_id, f'Guild {index}', guild_id + 999, rng.randint(10, 50000), role_map,
+                                          allowed, ('!', '?') if index % 3 else (), ('music',) if index % 5 == 0 else ()))
+    return records
+
+
+def as_json(records: list) -> str:
+    """Returns the same records as JSON."""
+    return json.dumps({str(record.id): {
+        'name': record.name, 'owner_id': record.owner_id, 'member_count': record.member_count,
+        'roles': {str(role_id): list(role) for role_id, role in record.roles.items()},
+        'allowed': {level: sorted(roles) for level, roles in record.allowed.items()},
+        'prefixes': list(record.prefixes), 'disabled_cogs': list(record.disabled_cogs)} for record in records})
+
+
+def measure(args: argparse.Namespace) -> dict:
+    """Saves and reads the records both ways."""
+    from utils.yobot_snapshot import YoBotSnapshot, encode, write_mapped
+
+    records = make_records(args.guilds, args.roles)
+    ids = [record.id for record in records]
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        json_file = os.path.join(work_dir, 'snapshot.json')
+        snapshot_file = os.path.join(work_dir, 'snapshot.bin')
+
+        def save_json() -> None:
+            with open(json_file, 'w', encoding='utf-8') as f:
+                f.write(as_json(records))
+
+        def first_json() -> None:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                json.load(f)[str(ids[0])]
+
+        def save_snapshot() -> None:
+            write_mapped(snapshot_file, encode(records, 'tree', 'levels'))
+
+        def first_snapshot() -> None:
+            snapshot = YoBotSnapshot(yobot, snapshot_file, {'enabled': True})
+            snapshot.guild(ids[0])
+            snapshot.release()
+
+        def all_snapshot() -> None:
+            snapshot = YoBotSnapshot(yobot, snapshot_file, {'enabled': True})
+            for guild_id in ids:
+                snapshot.guild(guild_id)
+            snapshot.release()
+
+        metrics['json_save'] = harness.metric(harness.time_call(save_json, number=3) * 1000, 'ms')
+        metrics['json_first_guild'] = harness.metric(harness.time_call(first_json, number=3) * 1000, 'ms')
+        metrics['json_size'] = harness.metric(os.path.getsize(json_file) / 1024, 'KiB')
+        metrics['snapshot_save'] = harness.metric(harness.time_call(save_snapshot, number=3) * 1000, 'ms')
+        metrics['snapshot_first_guild'] = harness.metric(harness.time_call(first_snapshot, number=3) * 1000, 'ms')
+        metrics['snapshot_all_guilds'] = harness.metric(harness.time_call(all_snapshot, number=3) * 1000, 'ms')
+        metrics['snapshot_size'] = harness.metric(os.path.getsize(snapshot_file) / 1024, 'KiB')
+        yobot.store.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return measure(args)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--guilds', type=int, default=1000, help='Guilds in the snapshot.')
+    parser.add_argument('--roles', type=int, default=40, help='Roles in each guild.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,90 @@
+"""
+Benchmarks for `YoBotStore`, the key-value store for cog state.
+
+Writes the same cog state through the store and through `Configs`, which rewrites the whole
+YAML file on every save, as cogs storing state in `config.yaml` do today. The YAML side writes
+fewer keys by default, as each save gets slower as the file grows. Also measures cached
+and uncached reads and a prefix scan.
+
+Run: `python benchmarks/bench_store.py --keys 1000`
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import harness
+
+SUITE = 'store'
+
+
+def state(index: int) -> dict:
+    """Returns a small cog state value, like a member's points or settings."""
+    return {'points': index * 7, 'level': index % 50, 'name': f'member {index}', 'flags': [index % 2 == 0, index % 3 == 0]}
+
+
+async def measure(args: argparse.Namespace) -> dict:
+    """Times each operation against a fresh store and config."""
+    from utils.yobot_configs import Configs
+    from utils.yobot_store import YoBotStore
+
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        config_file = harness.make_config(work_dir)
+        yobot = harness.build_yobot(config_file)
+
+        config = Configs(config_file)
+        config.load()
+        started = time.perf_counter()
+        for index in range(args.yaml_keys):
+            config.set_all(f'cog_state.member{index}', state(index))
+            config.save()
+        metrics['yaml_set_and_save'] = harness.metric((time.perf_counter() - started) / args.yaml_keys * 1e6, 'us')
+
+        store = YoBotStore(yobot, os.path.join(work_dir, 'bench.db'), cache_size=args.keys // 2)
+        started = time.perf_counter()
+        for index in range(args.keys):
+            await store.set('bench', f'member{index}', state(index))
+        queued = time.perf_counter() - started
+        await store.flush()
+        committed = time.perf_counter() - started
+        metrics['store_set'] = harness.metric(queued / args.keys * 1e6, 'us')
+        metrics['store_set_committed'] = harness.metric(committed / args.keys * 1e6, 'us')
+        metrics['store_batches'] = harness.metric(store.stats['batches'], 'batches')
+
+        last = f'member{args.keys - 1}'
+        metrics['store_get_cached'] = harness.metric(
+            await harness.time_async(lambda: store.get('bench', last), args.number) * 1e6, 'us')
+        started = time.perf_counter()
+        for index in range(args.keys // 2):  # Evicted by the later writes.
+            await store.get('bench', f'member{index}')
+        metrics['store_get_uncached'] = harness.metric((time.perf_counter() - started) / (args.keys // 2) * 1e6, 'us')
+
+        started = time.perf_counter()
+        rows = await store.scan('bench', 'member1')
+        metrics[f'store_scan_{len(rows)}_keys'] = harness.metric((time.perf_counter() - started) * 1000, 'ms')
+        store.close()
+        yobot.store.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--keys', type=int, default=1000, help='Keys written.')
+    parser.add_argument('--yaml-keys', type=int, default=200, help='Keys written through Configs, each save rewrites the file.')
+    parser.add_argument('--number', type=int, default=20000, help='Calls per timing run for cached reads.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
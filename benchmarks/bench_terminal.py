@@ -0,0 +1,55 @@
+"""
+Micro-benchmarks for terminal command dispatch.
+
+Measures `YoBotTerminalCommands.handle_terminal_command` for commands that do not prompt,
+including the first and last branches of the dispatch chain and an unknown command.
+
+Run: `python benchmarks/bench_terminal.py`
+"""
+import argparse
+import asyncio
+
+import harness
+
+from utils.yobot_terminal import YoBotTerminalCommands
+
+SUITE = 'terminal'
+COMMANDS = {
+    'ping': 'ping',
+    'help': 'help',
+    'aliases': 'alias',
+    'unknown': 'notacommand',
+}
+
+
+async def measure(number: int) -> dict:
+    """Times each terminal command against an offline YoBot."""
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        for name, command in COMMANDS.items():
+            async def dispatch():
+                await YoBotTerminalCommands(yobot, command).handle_terminal_command()
+            metrics[f'dispatch_{name}'] = harness.metric(await harness.time_async(dispatch, number) * 1e6, 'us')
+        await yobot.close()
+    return metrics
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    return asyncio.run(measure(args.number))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--number', type=int, default=1000, help='Commands per timing run.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,124 @@
+"""
+Benchmarks for `YoBotTriggers`, the shared message keyword scanner.
+
+Registers 10,000 patterns, 100 cogs with 99 keywords and one regex each, and scans a stream
+of synthetic chat messages where about 2% contain a trigger. The shared automaton is compared
+with every cog scanning each message for its own keywords, as message-scanning cogs do today.
+
+Run: `python benchmarks/bench_triggers.py --patterns 10000 --messages 20000`
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+import harness
+
+SUITE = 'triggers'
+COGS = 100
+
+
+def make_words(rng: random.Random, count: int, length: range) -> list:
+    """Returns distinct random lowercase words."""
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.choice(length))))
+    return list(words)
+
+
+def make_cogs(rng: random.Random, patterns: int) -> list:
+    """Returns (keywords, regexes) for each synthetic cog."""
+    per_cog = patterns // COGS
+    keywords = make_words(rng, patterns, range(6, 11))
+    cogs = []
+    for index in range(COGS):
+        own = keywords[index * per_cog:(index + 1) * per_cog]
+        cogs.append((own[:-1], [rf'{own[-1]}\d+']))
+    return cogs
+
+
+def make_messages(rng: random.Random, count: int, cogs: list) -> list:
+    """Returns chat messages from a common vocabulary, some with a trigger keyword or regex match."""
+    common = make_words(rng, 2000, range(2, 8))
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(common) for _ in range(rng.randint(6, 20))]
+        if rng.random() < 0.02:
+            keywords, regexes = rng.choice(cogs)
+            words.insert(rng.randrange(len(words)), rng.choice(keywords) if rng.random() < 0.8 else regexes[0][:-3] + '42')
+        messages.append(' '.join(words).capitalize())
+    return messages
+
+
+def naive_scan(cogs: list, content: str) -> int:
+    """Scans a message the way separate cogs would, each with its own keywords and regexes."""
+    matched = 0
+    for keywords, patterns in cogs:
+        lowered = content.lower()
+        if any(re.search(rf'\b{re.escape(keyword)}\b', lowered) for keyword in keywords if keyword in lowered) \
+                or any(pattern.search(content) for pattern in patterns):
+            matched += 1
+    return matched
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the suite and returns its metrics."""
+    from utils.yobot_triggers import YoBotTriggers
+
+    rng = random.Random(41)
+    cogs = make_cogs(rng, args.patterns)
+    messages = make_messages(rng, args.messages, cogs)
+
+    with harness.work_dir() as work_dir:
+        triggers = YoBotTriggers(harness.build_yobot(harness.make_config(work_dir)))
+
+        async def callback(message, matches):
+            pass
+
+        for keywords, regexes in cogs:
+            triggers.register(callback, keywords, regexes)
+        started = time.perf_counter()
+        triggers.build()
+        build = time.perf_counter() - started
+
+        shared_matches = 0
+        started = time.perf_counter()
+        for content in messages:
+            shared_matches += len(triggers.match(content))
+        shared = (time.perf_counter() - started) / len(messages)
+
+    compiled = [(keywords, [re.compile(regex) for regex in regexes]) for keywords, regexes in cogs]
+    sample = messages[:args.naive_messages]
+    naive_matches = 0
+    started = time.perf_counter()
+    for content in sample:
+        naive_matches += naive_scan(compiled, content)
+    naive = (time.perf_counter() - started) / len(sample)
+
+    print(f'{shared_matches} cog callbacks over {len(messages)} messages, '
+          f'{naive_matches} from per-cog scanning of the first {len(sample)}.')
+    return {
+        f'build_{args.patterns}_patterns': harness.metric(build * 1000, 'ms'),
+        'shared_scan_per_message': harness.metric(shared * 1e6, 'us'),
+        'shared_messages_per_second': harness.metric(1 / shared, 'msg/s', better='higher'),
+        'per_cog_scan_per_message': harness.metric(naive * 1e6, 'us'),
+        'speedup': harness.metric(naive / shared, 'x', better='higher'),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the suite's command line arguments."""
+    parser.add_argument('--patterns', type=int, default=10000, help='Patterns registered across 100 cogs.')
+    parser.add_argument('--messages', type=int, default=20000, help='Messages scanned by the shared scanner.')
+    parser.add_argument('--naive-messages', type=int, default=500, help='Messages scanned per cog for comparison.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = run(args)
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
@@ -0,0 +1,426 @@
+import asyncio
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import yarl
+from aiohttp import WSMsgType, web
+
+import discord.http
+from discord.gateway import DiscordWebSocket
+
+
+class FakeDiscord:
+    """
+    A local stand-in for the Discord gateway and REST API.
+
+    It speaks just enough of the protocol to drive a YoBot built by `Builder.yobot_build`
+    without a real token: identify, READY, GUILD_CREATE, MESSAGE_CREATE and INTERACTION_CREATE.
+    REST calls made by the bot are recorded so benchmarks can wait for responses.
+
+    Args:
+        guilds (int): The number of guilds to announce after READY.
+        channels (int): The number of text channels per guild.
+        members (int): The number of members per guild.
+        host (str): The interface to bind to.
+        port (int): The port to bind to, 0 picks a free one.
+    """
+
+    API_VERSION = 10
+    HEARTBEAT_INTERVAL = 41250
+    DISCORD_EPOCH = 1420070400000
+
+    def __init__(self, guilds: int = 1, channels: int = 2, members: int = 10, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self._ids = itertools.count()
+        self.bot_user = self.make_user('YoBot', bot=True)
+        self.application_id = self.bot_user['id']
+        self.owner = self.make_user('Owner')
+        self.guilds = [self.make_guild(f'Guild {i}', channels, members) for i in range(guilds)]
+        self.members = {(guild['id'], member['user']['id']): member for guild in self.guilds for member in guild['members']}
+        self.requests: Dict[str, int] = {}  # Route -> number of calls.
+        self.sockets: List[web.WebSocketResponse] = []
+        self.ready = asyncio.Event()
+        self.identifies = 0
+        self.resumes = 0
+        self._sequence = 0
+        self._session_id = 'fake-session'
+        self._waiters: List[tuple] = []
+        self._count_waiters: List[tuple] = []
+        self._runner: Optional[web.AppRunner] = None
+        self._restore: Optional[Callable[[], None]] = None
+
+    # Payload factories
+
+    def snowflake(self) -> str:
+        """Returns a new unique snowflake timestamped now, so interactions are not seen as expired."""
+        return str(((int(time.time() * 1000) - self.DISCORD_EPOCH) << 22) | (next(self._ids) & 0x3FFFFF))
+
+    def make_user(self, name: str, bot: bool = False) -> dict:
+        """Returns a user payload."""
+        return {
+            'id': self.snowflake(),
+            'username': name,
+            'discriminator': '0',
+            'global_name': name,
+            'avatar': None,
+            'bot': bot,
+        }
+
+    def make_guild(self, name: str, channels: int, members: int) -> dict:
+        """Returns a GUILD_CREATE payload with text channels, roles and members."""
+        guild_id = self.snowflake()
+        everyone = self.make_role(guild_id, '@everyone', position=0)
+        everyone['id'] = guild_id
+        roles = [everyone, self.make_role(None, 'Admin', position=2), self.make_role(None, 'Moderator', position=1)]
+        users = [self.bot_user, self.owner] + [self.make_user(f'member{i}') for i in range(max(members - 2, 0))]
+        return {
+            'id': guild_id,
+            'name': name,
+            'icon': None,
+            'owner_id': self.owner['id'],
+            'unavailable': False,
+            'large': False,
+            'member_count': len(users),
+            'features': [],
+            'emojis': [],
+            'stickers': [],
+            'roles': roles,
+            'channels': [
+                {'id': self.snowflake(), 'type': 0, 'name': f'channel-{i}', 'position': i, 'permission_overwrites': []}
+                for i in range(channels)
+            ],
+            'threads': [],
+            'members': [self.make_member(user, [roles[1]['id']] if user is self.owner else []) for user in users],
+            'voice_states': [],
+            'presences': [],
+            'stage_instances': [],
+            'guild_scheduled_events': [],
+            'joined_at': self.timestamp(),
+        }
+
+    def make_role(self, guild_id: Optional[str], name: str, position: int) -> dict:
+        """Returns a role payload."""
+        return {
+            'id': guild_id or self.snowflake(),
+            'name': name,
+            'permissions': '0' if position == 0 else '8',
+            'position': position,
+            'color': 0,
+            'hoist': False,
+            'managed': False,
+            'mentionable': False,
+        }
+
+    def make_member(self, user: dict, roles: List[str]) -> dict:
+        """Returns a guild member payload."""
+        return {'user': user, 'roles': roles, 'joined_at': self.timestamp(), 'deaf': False, 'mute': False, 'flags': 0}
+
+    def make_message(self, channel_id: str, guild_id: Optional[str], author: dict, content: str) -> dict:
+        """Returns a message payload."""
+        message = {
+            'id': self.snowflake(),
+            'type': 0,
+            'channel_id': channel_id,
+            'author': author,
+            'content': content,
+            'timestamp': self.timestamp(),
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False,
+        }
+        if guild_id is not None:
+            message['guild_id'] = guild_id
+            member = self.members.get((guild_id, author['id']), {})
+            message['member'] = {'roles': member.get('roles', []), 'joined_at': self.timestamp(), 'deaf': False, 'mute': False, 'flags': 0}
+        return message
+
+    @staticmethod
+    def timestamp() -> str:
+        """Returns the current time as an ISO 8601 timestamp."""
+        return datetime.now(timezone.utc).isoformat()
+
+    # Server lifecycle
+
+    @property
+    def base_url(self) -> str:
+        """The HTTP base URL of the fake server."""
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> 'FakeDiscord':
+        """Starts the fake server and points discord.py at it."""
+        app = web.Application()
+        app.router.add_get('/gateway', self.handle_gateway)
+        app.router.add_route('*', '/api/v{version}/{path:.*}', self.handle_rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        self.install()
+        return self
+
+    async def stop(self) -> None:
+        """Closes every gateway connection and stops the server."""
+        for ws in list(self.sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+
+    def install(self) -> None:
+        """Redirects discord.py's REST routes and default gateway to this server."""
+        old_base = discord.http.Route.BASE
+        old_gateway = DiscordWebSocket.DEFAULT_GATEWAY
+        discord.http.Route.BASE = f'{self.base_url}/api/v{self.API_VERSION}'
+        DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f'ws://{self.host}:{self.port}/gateway')
+
+        def restore():
+            discord.http.Route.BASE = old_base
+            DiscordWebSocket.DEFAULT_GATEWAY = old_gateway
+        self._restore = restore
+
+    # Gateway
+
+    async def handle_gateway(self, request: web.Request) -> web.WebSocketResponse:
+        """Handles a gateway websocket connection."""
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        await self.send(ws, {'op': 10, 'd': {'heartbeat_interval': self.HEARTBEAT_INTERVAL}})
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                await self.handle_op(ws, payload['op'], payload.get('d'))
+        finally:
+            self.sockets.remove(ws)
+        return ws
+
+    async def handle_op(self, ws: web.WebSocketResponse, op: int, data: Any) -> None:
+        """Responds to a client opcode."""
+        if op == 1:  # Heartbeat
+            await self.send(ws, {'op': 11, 'd': None})
+        elif op == 2:  # Identify
+            self.identifies += 1
+            await self.dispatch_to(ws, 'READY', {
+                'v': self.API_VERSION,
+                'user': self.bot_user,
+                'guilds': [{'id': guild['id'], 'unavailable': True} for guild in self.guilds],
+                'session_id': self._session_id,
+                'resume_gateway_url': f'ws://{self.host}:{self.port}/gateway',
+                'application': {'id': self.application_id, 'flags': 0},
+                'private_channels': [],
+                'relationships': [],
+            })
+            for guild in self.guilds:
+                await self.dispatch_to(ws, 'GUILD_CREATE', guild)
+            self.ready.set()
+        elif op == 6:  # Resume
+            self.resumes += 1
+            await self.dispatch_to(ws, 'RESUMED', {})
+            self.ready.set()
+        elif op == 8:  # Request guild members
+            guild = self.get_guild(data['guild_id'])
+            await self.dispatch_to(ws, 'GUILD_MEMBERS_CHUNK', {
+                'guild_id': guild['id'],
+                'members': guild['members'],
+                'chunk_index': 0,
+                'chunk_count': 1,
+                'nonce': data.get('nonce'),
+            })
+
+    async def send(self, ws: web.WebSocketResponse, payload: dict) -> None:
+        """Sends a raw payload over a gateway connection."""
+        await ws.send_str(json.dumps(payload))
+
+    async def dispatch_to(self, ws: web.WebSocketResponse, event: str, data: dict) -> None:
+        """Sends a dispatch event over a gateway connection."""
+        self._sequence += 1
+        await self.send(ws, {'op': 0, 't': event, 's': self._sequence, 'd': data})
+
+    async def dispatch(self, event: str, data: dict) -> None:
+        """Sends a dispatch event to every connected client."""
+        for ws in list(self.sockets):
+            await self.dispatch_to(ws, event, data)
+
+    def get_guild(self, guild_id: Any) -> dict:
+        """Returns the guild payload with the given ID."""
+        return next(guild for guild in self.guilds if guild['id'] == str(guild_id))
+
+    async def send_message(self, content: str, guild: int = 0, channel: int = 0, author: Optional[dict] = None) -> dict:
+        """
+        Sends a MESSAGE_CREATE event.
+
+        Args:
+            content (str): The message content.
+            guild (int): The index of the guild to send in.
+            channel (int): The index of the channel to send in.
+            author (dict): The author, defaults to the guild owner.
+
+        Returns:
+            dict: The dispatched message payload.
+        """
+        data = self.guilds[guild]
+        message = self.make_message(data['channels'][channel]['id'], data['id'], author or self.owner, content)
+        await self.dispatch('MESSAGE_CREATE', message)
+        return message
+
+    def make_interaction(self, name: str, options: Optional[list] = None, guild: int = 0, channel: int = 0) -> dict:
+        """
+        Returns an INTERACTION_CREATE payload for a slash command.
+
+        Args:
+            name (str): The command name.
+            options (list): The command options.
+            guild (int): The index of the guild to send in.
+            channel (int): The index of the channel to send in.
+        """
+        data = self.guilds[guild]
+        channel_data = data['channels'][channel]
+        return {
+            'id': self.snowflake(),
+            'application_id': self.application_id,
+            'type': 2,
+            'token': f'token-{self.snowflake()}',
+            'version': 1,
+            'guild_id': data['id'],
+            'channel_id': channel_data['id'],
+            'channel': dict(channel_data, guild_id=data['id']),
+            'member': dict(self.make_member(self.owner, []), permissions='8'),
+            'app_permissions': '8',
+            'locale': 'en-US',
+            'guild_locale': 'en-US',
+            'data': {'id': self.snowflake(), 'name': name, 'type': 1, 'options': options or []},
+        }
+
+    async def send_interaction(self, name: str, options: Optional[list] = None, guild: int = 0, channel: int = 0) -> dict:
+        """Sends an INTERACTION_CREATE event for a slash command and returns its payload."""
+        interaction = self.make_interaction(name, options, guild, channel)
+        await self.dispatch('INTERACTION_CREATE', interaction)
+        return interaction
+
+    # REST
+
+    async def handle_rest(self, request: web.Request) -> web.Response:
+        """Handles a REST call made by the bot."""
+        path = '/' + request.match_info['path']
+        route = f'{request.method} {path}'
+        key = f'{request.method} {self.route_key(path)}'
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self._notify_count(key)
+        body = None
+        if request.can_read_body and request.content_type == 'application/json':
+            body = await request.json()
+        self._notify(route, body)
+
+        if path == '/users/@me':
+            return self.json_response(self.bot_user)
+        if path == '/oauth2/applications/@me':
+            return self.json_response({
+                'id': self.application_id,
+                'name': self.bot_user['username'],
+                'description': '',
+                'icon': None,
+                'bot_public': True,
+                'bot_require_code_grant': False,
+                'owner': self.owner,
+                'verify_key': '',
+                'flags': 0,
+            })
+        if path in ('/gateway', '/gateway/bot'):
+            return self.json_response({'url': f'ws://{self.host}:{self.port}/gateway', 'shards': 1})
+        if request.method == 'POST' and path.startswith('/channels/') and path.endswith('/messages'):
+            channel_id = path.split('/')[2]
+            content = (body or {}).get('content', '')
+            guild_id = next((g['id'] for g in self.guilds if any(c['id'] == channel_id for c in g['channels'])), None)
+            return self.json_response(self.make_message(channel_id, guild_id, self.bot_user, content))
+        if path.endswith('/callback'):
+            return web.Response(status=204)
+        if path.startswith('/webhooks/') and request.method in ('GET', 'POST', 'PATCH'):
+            # Interaction followups and original responses.
+            guild = self.guilds[0]
+            content = (body or {}).get('content', '')
+            return self.json_response(self.make_message(guild['channels'][0]['id'], guild['id'], self.bot_user, content))
+        if request.method == 'PUT' and path.endswith('/commands'):
+            return self.json_response([dict(command, id=self.snowflake(), application_id=self.application_id, version='1')
+                                      for command in body or []])
+        return self.json_response({})
+
+    @staticmethod
+    def json_response(data: Any) -> web.Response:
+        """Returns a JSON response with the bare content type discord.py expects."""
+        return web.Response(body=json.dumps(data).encode('utf-8'), headers={'Content-Type': 'application/json'})
+
+    @staticmethod
+    def route_key(path: str) -> str:
+        """Collapses IDs and tokens out of a REST path so calls can be counted per route."""
+        parts = []
+        for part in path.split('/'):
+            if part.isdigit():
+                part = '{id}'
+            elif part.startswith('token-'):
+                part = '{token}'
+            parts.append(part)
+        return '/'.join(parts)
+
+    def expect(self, predicate: Callable[[str, Any], bool]) -> 'asyncio.Future':
+        """
+        Returns a future resolved with the time of the first REST call matching a predicate.
+
+        Args:
+            predicate (Callable): Called with the route ('POST /channels/1/messages') and JSON body.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((predicate, future))
+        return future
+
+    def expect_calls(self, key: str, count: int) -> 'asyncio.Future':
+        """
+        Returns a future resolved with the time a route has been called a total number of times.
+
+        Args:
+            key (str): The collapsed route, such as 'POST /channels/{id}/messages'.
+            count (int): The total number of calls to wait for.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._count_waiters.append((key, count, future))
+        self._notify_count(key)
+        return future
+
+    def _notify_count(self, key: str) -> None:
+        """Resolves any count waiters for a route."""
+        if not self._count_waiters:
+            return
+        calls = self.requests.get(key, 0)
+        now = time.perf_counter()
+        for waiter in list(self._count_waiters):
+            waiter_key, count, future = waiter
+            if waiter_key == key and calls >= count:
+                if not future.done():
+                    future.set_result(now)
+                self._count_waiters.remove(waiter)
+
+    def _notify(self, route: str, body: Any) -> None:
+        """Resolves any waiters matching a REST call."""
+        now = time.perf_counter()
+        remaining = []
+        for predicate, future in self._waiters:
+            if future.done():
+                continue
+            if predicate(route, body):
+                future.set_result(now)
+            else:
+                remaining.append((predicate, future))
+        self._waiters = remaining
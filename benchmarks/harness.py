@@ -0,0 +1,231 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)  # YoBot imports its packages relative to src/.
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+def metric(value: float, unit: str, better: str = 'lower') -> dict:
+    """
+    Returns a single benchmark measurement.
+
+    Args:
+        value (float): The measured value.
+        unit (str): The unit of the value.
+        better (str): Whether a 'lower' or 'higher' value is an improvement.
+    """
+    return {'value': round(value, 6), 'unit': unit, 'better': better}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Returns the given percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_metrics(name: str, samples: List[float]) -> Dict[str, dict]:
+    """Returns mean, p50 and p95 metrics in milliseconds for a list of samples in seconds."""
+    return {
+        f'{name}_mean': metric(statistics.fmean(samples) * 1000 if samples else 0.0, 'ms'),
+        f'{name}_p50': metric(percentile(samples, 50) * 1000, 'ms'),
+        f'{name}_p95': metric(percentile(samples, 95) * 1000, 'ms'),
+    }
+
+
+def time_call(func: Callable[[], object], number: int = 1000, repeat: int = 5) -> float:
+    """
+    Returns the best time per call of a function, in seconds.
+
+    Args:
+        func (Callable): The function to time.
+        number (int): The number of calls per timing run.
+        repeat (int): The number of timing runs, the fastest is kept.
+    """
+    return min(timeit.Timer(func).repeat(repeat=repeat, number=number)) / number
+
+
+async def time_async(func: Callable[[], Awaitable[object]], number: int = 1000, repeat: int = 5) -> float:
+    """Returns the best time per await of a coroutine function, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def make_config(work_dir: str, **overrides) -> str:
+    """
+    Writes an offline YoBot config file into a working directory.
+
+    Args:
+        work_dir (str): The directory to write the config and logs into.
+        **overrides: Top level config values to override.
+
+    Returns:
+        str: The path to the config file.
+    """
+    config_dir = os.path.join(work_dir, 'configs')
+    log_dir = os.path.join(work_dir, 'logs')
+    os.makedirs(config_dir, exist_ok=True)
+    os.makedirs(log_dir, exist_ok=True)
+    config_file = os.path.join(config_dir, 'config.yaml')
+    config = {
+        'owner_name': 'Owner',
+        'owner_id': '0',
+        'prefix': '!',
+        'discord_token': 'fake-token',
+        'bot_name': 'YoBot',
+        'presence': 'Benchmarking',
+        'log_level': 'WARNING',
+        'dev_mode': False,
+        'update_bot': False,
+        'file_paths': {
+            'root_dir': ROOT_DIR,
+            'config_dir': config_dir,
+            'config_file': config_file,
+            'log_dir': log_dir,
+            'log_file': os.path.join(log_dir, 'latest.log'),
+            'avatar_file': os.path.join(ROOT_DIR, 'resources', 'images', 'avatar.png'),
+            'cogs_dir': os.path.join(SRC_DIR, 'cogs'),
+            'resources_dir': os.path.join(ROOT_DIR, 'resources'),
+            'images_dir': os.path.join(ROOT_DIR, 'resources', 'images'),
+            'sounds_dir': os.path.join(ROOT_DIR, 'resources', 'sounds'),
+            'texts_dir': os.path.join(ROOT_DIR, 'resources', 'texts'),
+            'ascii_logo': os.path.join(ROOT_DIR, 'resources', 'texts', 'logo.txt'),
+        },
+        'cog_repo': {
+            'repo_owner': 'RareMojo',
+            'repo_name': 'YoBot-Discord-Cogs',
+            'repo_info': 'cogdescriptions.csv',
+        },
+        'blacklist': {
+            'cog_removal': ['yobotcorecog.py', 'yobotcommandcog.py'],
+        },
+    }
+    config.update(overrides)
+    with open(config_file, 'w') as f:
+        yaml.dump(config, f, default_flow_style=False)
+    return config_file
+
+
+def build_yobot(config_file: str) -> 'YoBot':
+    """Builds a YoBot instance through `Builder.yobot_build`, as `launch_bot` does."""
+    from utils.yobot_builder import Builder
+    from utils.yobot_configs import Configs
+
+    config = Configs(config_file)
+    config.load()
+    yobot = Builder(config=config).yobot_build()
+    if yobot is None:
+        raise RuntimeError('YoBot failed to build.')
+    return yobot
+
+
+def work_dir() -> tempfile.TemporaryDirectory:
+    """Returns a temporary working directory for a benchmark run."""
+    return tempfile.TemporaryDirectory(prefix='yobot-bench-')
+
+
+def save_results(suite: str, metrics: Dict[str, dict], path: Optional[str] = None) -> str:
+    """
+    Saves benchmark results as JSON for later regression comparison.
+
+    Args:
+        suite (str): The benchmark suite name.
+        metrics (dict): The measured metrics.
+        path (str): Where to write the results, defaults to results/<suite>.json.
+
+    Returns:
+        str: The path the results were written to.
+    """
+    path = path or os.path.join(RESULTS_DIR, f'{suite}.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    results = {
+        'suite': suite,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metrics': metrics,
+    }
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4)
+    return path
+
+
+def load_results(suite: str, path: Optional[str] = None) -> Optional[dict]:
+    """Loads previously saved results, if any."""
+    path = path or os.path.join(RESULTS_DIR, f'{suite}.json')
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def change(current: dict, previous: dict) -> Optional[float]:
+    """
+    Returns the relative change of a metric, positive when it got worse.
+
+    Args:
+        current (dict): The current metric.
+        previous (dict): The previous metric.
+    """
+    old = previous['value']
+    if not old:
+        return None
+    delta = (current['value'] - old) / old
+    return delta if current.get('better', 'lower') == 'lower' else -delta
+
+
+def regressions(metrics: Dict[str, dict], baseline: Optional[dict], threshold: float) -> List[Tuple[str, float]]:
+    """
+    Returns the metrics that got worse than a baseline by more than a threshold.
+
+    Args:
+        metrics (dict): The current metrics.
+        baseline (dict): The saved baseline results.
+        threshold (float): The allowed relative slowdown, 0.2 being 20%.
+    """
+    found = []
+    old_metrics = (baseline or {}).get('metrics', {})
+    for name, current in metrics.items():
+        if name not in old_metrics:
+            continue
+        delta = change(current, old_metrics[name])
+        if delta is not None and delta > threshold:
+            found.append((name, delta))
+    return found
+
+
+def report(suite: str, metrics: Dict[str, dict], previous: Optional[dict] = None) -> None:
+    """Prints benchmark results, with the change against previous results when given."""
+    old_metrics = (previous or {}).get('metrics', {})
+    print(f'[ {suite} ]')
+    for name, current in metrics.items():
+        line = f"  {name:<40} {current['value']:>14.3f} {current['unit']:<8}"
+        if name in old_metrics:
+            delta = change(current, old_metrics[name])
+            if delta is not None:
+                line += f" ({'worse' if delta > 0 else 'better'} by {abs(delta) * 100:.1f}%)"
+        print(line)
@@ -0,0 +1,185 @@
+"""
+Replays a recorded gateway event log into an offline YoBot.
+
+Recordings are made by turning on `recorder.enabled` in config.yaml. The recorded READY and
+GUILD_CREATE payloads become the fake gateway's initial state, and every later dispatch event
+is fed to the bot with its original pacing, sped up, or as fast as possible.
+
+Handler latency is the time from an event leaving the fake gateway until its parse and every
+listener it triggered have finished. Loop lag is how late a 10ms timer fires while events of
+that type are being processed.
+
+Run: `python benchmarks/replay.py logs/gateway-<stamp>.jsonl.gz --speed 10x`
+"""
+import argparse
+import asyncio
+import collections
+import time
+from typing import Dict, List, Optional
+
+import harness
+from fake_discord import FakeDiscord
+
+from utils.yobot_recorder import read_recording
+
+SUITE = 'replay'
+STARTUP_EVENTS = {'READY', 'GUILD_CREATE'}
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """Parses a speed such as '1x', '10x' or 'max' into a multiplier, None meaning no pacing."""
+    if value.lower() == 'max':
+        return None
+    speed = float(value.lower().rstrip('x'))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError('Speed must be positive.')
+    return speed
+
+
+class ReplayProbe():
+    """
+    Attributes the bot's work back to the gateway event that caused it.
+
+    Events arrive over a single socket in order, so each `socket_event_type` dispatch is
+    matched with the oldest event sent but not yet seen. Listener tasks scheduled while that
+    event is parsed are tracked until they finish.
+    """
+
+    def __init__(self, yobot):
+        self.yobot = yobot
+        self.loop = asyncio.get_running_loop()
+        self.sent = collections.deque()
+        self.current: Optional[dict] = None
+        self.latency: Dict[str, List[float]] = collections.defaultdict(list)
+        self.lag: Dict[str, List[float]] = collections.defaultdict(list)
+        self.outstanding = 0
+        self.drained = asyncio.Event()
+        self._dispatch = yobot.dispatch
+        self._schedule_event = yobot._schedule_event
+        yobot.dispatch = self.dispatch
+        yobot._schedule_event = self.schedule_event
+
+    def mark_sent(self, event_type: str) -> None:
+        """Records that an event has been sent to the bot."""
+        self.sent.append((event_type, time.perf_counter()))
+        self.outstanding += 1
+        self.drained.clear()
+
+    def dispatch(self, event_name: str, *args, **kwargs) -> None:
+        """Wraps `YoBot.dispatch` to notice when a new gateway event starts parsing."""
+        if event_name == 'socket_event_type' and self.sent:
+            event_type, sent = self.sent.popleft()
+            self.current = {'type': event_type, 'sent': sent, 'tasks': 0, 'parsed': False}
+            self.loop.call_soon(self.parsed, self.current)
+        self._dispatch(event_name, *args, **kwargs)
+
+    def schedule_event(self, coro, event_name: str, *args, **kwargs):
+        """Wraps `YoBot._schedule_event` to follow the listener tasks of the current event."""
+        task = self._schedule_event(coro, event_name, *args, **kwargs)
+        if task is None:
+            return None  # The listener's cog is turned off in the event's guild.
+        event = self.current
+        if event is not None and not event['parsed']:
+            event['tasks'] += 1
+            task.add_done_callback(lambda _: self.task_done(event))
+        return task
+
+    def parsed(self, event: dict) -> None:
+        """Called once the event's synchronous parse has completed."""
+        event['parsed'] = True
+        self.finish(event)
+
+    def task_done(self, event: dict) -> None:
+        """Called when one of the event's listener tasks finishes."""
+        event['tasks'] -= 1
+        self.finish(event)
+
+    def finish(self, event: dict) -> None:
+        """Records the event's latency once it is parsed and all its listeners are done."""
+        if event['parsed'] and event['tasks'] == 0 and 'done' not in event:
+            event['done'] = True
+            self.latency[event['type']].append(time.perf_counter() - event['sent'])
+            self.outstanding -= 1
+            if self.outstanding == 0:
+                self.drained.set()
+
+    async def sample_lag(self, interval: float = 0.01) -> None:
+        """Samples loop lag and attributes it to the event being processed."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = time.perf_counter() - started - interval
+            if self.current is not None:
+                self.lag[self.current['type']].append(max(lag, 0.0))
+
+
+async def replay(file: str, speed: Optional[float]) -> dict:
+    """
+    Replays a recording and returns per-event-type metrics.
+
+    Args:
+        file (str): The path to the recording.
+        speed (float): The pacing multiplier, None to replay as fast as possible.
+    """
+    events = [event for event in read_recording(file) if event['op'] == 0]
+    fake = FakeDiscord(guilds=0)
+    startup = [event for event in events if event['e'] in STARTUP_EVENTS]
+    ready = next((event['d'] for event in startup if event['e'] == 'READY'), None)
+    if ready is not None:
+        fake.bot_user = ready['user']
+        fake.application_id = (ready.get('application') or {}).get('id', fake.bot_user['id'])
+    fake.guilds = [event['d'] for event in startup if event['e'] == 'GUILD_CREATE'] or fake.guilds
+    stream = [event for event in events if event['e'] not in STARTUP_EVENTS]
+    await fake.start()
+
+    metrics = {}
+    with harness.work_dir() as work_dir:
+        yobot = harness.build_yobot(harness.make_config(work_dir))
+        await yobot.load_cogs()
+        await yobot.login(yobot.config_file.get('discord_token'))
+        probe = ReplayProbe(yobot)  # The gateway binds `dispatch` on connect, so this goes first.
+        bot_task = asyncio.create_task(yobot.connect())
+        try:
+            await asyncio.wait_for(yobot.wait_until_ready(), timeout=30)
+            sampler = asyncio.create_task(probe.sample_lag())
+            started = time.perf_counter()
+            first = stream[0]['t'] if stream else 0.0
+            for event in stream:
+                if speed is not None:
+                    delay = (event['t'] - first) / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                data = event['d']
+                if event['e'] == 'INTERACTION_CREATE':
+                    # Interactions expire, so they get a fresh ID and token.
+                    data = dict(data, id=fake.snowflake(), token=f'token-{fake.snowflake()}',
+                                application_id=fake.application_id)
+                probe.mark_sent(event['e'])
+                await fake.dispatch(event['e'], data)
+            await asyncio.wait_for(probe.drained.wait(), timeout=60)
+            elapsed = time.perf_counter() - started
+            sampler.cancel()
+
+            metrics['events'] = harness.metric(len(stream), 'events', better='higher')
+            metrics['events_per_second'] = harness.metric(len(stream) / elapsed if elapsed else 0.0, 'ev/s', better='higher')
+            for event_type, samples in sorted(probe.latency.items()):
+                metrics.update(harness.latency_metrics(f'{event_type}_handler', samples))
+                lag = probe.lag.get(event_type, [])
+                metrics[f'{event_type}_loop_lag_p95'] = harness.metric(harness.percentile(lag, 95) * 1000, 'ms')
+                metrics[f'{event_type}_loop_lag_max'] = harness.metric(max(lag, default=0.0) * 1000, 'ms')
+        finally:
+            await yobot.close()
+            await asyncio.gather(bot_task, return_exceptions=True)
+            await fake.stop()
+    return metrics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recording', help='The gateway recording to replay.')
+    parser.add_argument('--speed', type=parse_speed, default=1.0, help="Pacing: '1x', '10x' or 'max'.")
+    args = parser.parse_args()
+    previous = harness.load_results(SUITE)
+    metrics = asyncio.run(replay(args.recording, args.speed))
+    harness.report(SUITE, metrics, previous)
+    print(f'Results saved to {harness.save_results(SUITE, metrics)}')
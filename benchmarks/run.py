@@ -0,0 +1,59 @@
+"""
+Runs the YoBot benchmark suites and checks them against a saved baseline.
+
+Each suite's results are written to `benchmarks/results/<suite>.json`. Save a baseline with
+`--save-baseline` on a known good build, then later runs fail with exit code 1 when any
+metric is worse than the baseline by more than `--threshold`.
+
+Run: `python benchmarks/run.py [suite ...] [--threshold 0.2] [--save-baseline]`
+"""
+import argparse
+import importlib
+import os
+import sys
+
+import harness
+
+SUITES = ['logger', 'configs', 'terminal', 'cogs', 'gateway', 'triggers', 'store', 'http', 'sendqueue', 'scheduler', 'offload', 'loops', 'snapshot']
+
+
+def baseline_path(suite: str) -> str:
+    """Returns the path of a suite's baseline results."""
+    return os.path.join(harness.RESULTS_DIR, 'baseline', f'{suite}.json')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('suites', nargs='*', default=SUITES, help=f"Suites to run: {', '.join(SUITES)}.")
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown against the baseline, 0.2 is 20%%.')
+    parser.add_argument('--save-baseline', action='store_true', help='Save these results as the new baseline.')
+    args = parser.parse_args()
+
+    failed = []
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"Unknown suite '{suite}'.")
+        module = importlib.import_module(f'bench_{suite}')
+        suite_parser = argparse.ArgumentParser()
+        module.add_arguments(suite_parser)
+        metrics = module.run(suite_parser.parse_args([]))  # Suites run with their defaults.
+
+        baseline = harness.load_results(suite, baseline_path(suite))
+        harness.report(suite, metrics, baseline)
+        harness.save_results(suite, metrics)
+        if args.save_baseline:
+            print(f'Baseline saved to {harness.save_results(suite, metrics, baseline_path(suite))}')
+            continue
+        for name, delta in harness.regressions(metrics, baseline, args.threshold):
+            failed.append(f'{suite}.{name} is {delta * 100:.1f}% worse than the baseline')
+
+    if failed:
+        print(f'\n{len(failed)} regression(s) over the {args.threshold * 100:.0f}% threshold:')
+        for line in failed:
+            print(f'  {line}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,38 @@
 import asyncio
+import contextlib
+import hashlib
+import json
 import os
-from typing import TYPE_CHECKING
+import signal
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, Optional
 
 import yaml
 from discord.ext import commands
 
+from utils.yobot_blacklist import YoBotBlacklist
+from utils.yobot_cogindex import YoBotCogIndex, extension_name
+from utils.yobot_deferral import YoBotDeferrals
 from utils.yobot_configs import Configs
 from utils.yobot_exceptions import *
+from utils.yobot_guildcogs import YoBotGuildCogs, event_guild_id
+from utils.yobot_lazycogs import YoBotLazyCogs
+from utils.yobot_http import YoBotHTTP
+from utils.yobot_limiter import YoBotLimiter
 from utils.yobot_logger import terminal_command_loop
+from utils.yobot_memory import YoBotMemory
+from utils.yobot_offload import YoBotOffload, caller_module
+from utils.yobot_permissions import YoBotPermissions
+from utils.yobot_prefixes import YoBotPrefixes
+from utils.yobot_recorder import YoBotRecorder
+from utils.yobot_scheduler import YoBotScheduler
+from utils.yobot_sendqueue import YoBotSendQueue
+from utils.yobot_snapshot import YoBotSnapshot
+from utils.yobot_startup import YoBotStartup
+from utils.yobot_store import YoBotStore
+from utils.yobot_tree import YoBotCommandTree
+from utils.yobot_triggers import YoBotTriggers
+from utils.yobot_watchdog import YoBotWatchdog
 
 if TYPE_CHECKING:
     from discord import Intents
@@ -31,7 +56,28 @@ class YoBot(commands.Bot):
         log (YoBotLogger): The bot's logger.
         repo_info (str): The bot's repo info.
         cog_removal_blacklist (list): The cog removal blacklist.
+        recorder (YoBotRecorder): The opt-in gateway event recorder.
+        watchdog (YoBotWatchdog): The event loop lag watchdog.
+        synced_tree_hash (str): The hash of the application commands Discord last received.
+        memory (YoBotMemory): The live memory diagnostics.
+        limiter (YoBotLimiter): The shared command rate and concurrency limits.
+        permissions (YoBotPermissions): The cached role permission levels.
+        prefixes (YoBotPrefixes): The per-guild command prefixes.
+        blacklist (YoBotBlacklist): The compiled cog removal, load and guild blacklists.
+        cog_index (YoBotCogIndex): The persisted index of the cogs directory.
+        deferrals (YoBotDeferrals): The automatic deferral of slow application commands and their timings.
+        guild_cogs (YoBotGuildCogs): The cogs turned off per guild.
+        lazy_cogs (YoBotLazyCogs): The on-first-use cog loader, when enabled in the config.
+        web (YoBotHTTP): The shared HTTP client for cogs.
+        offload (YoBotOffload): The thread and process pools for blocking and CPU heavy work.
+        scheduler (YoBotScheduler): The shared timer for periodic and one-shot jobs.
+        send_queue (YoBotSendQueue): The paced outgoing message queues.
+        snapshot (YoBotSnapshot): The warm-start snapshot of guild state, when enabled in the config.
+        startup (YoBotStartup): The startup phase timings, logged once ready with `--profile-startup`.
+        store (YoBotStore): The key-value store for cog state.
+        triggers (YoBotTriggers): The shared keyword and regex scanner for messages.
         running (bool): Whether the bot is running.
+        accepting (bool): Whether new commands are accepted, False while shutting down.
     """
 
     def __init__(self, intents: 'Intents', config: Configs, logger: 'YoBotLogger'):
@@ -43,11 +89,243 @@ class YoBot(commands.Bot):
         self.log_file = self.config_file.get('file_paths.log_file')
         self.log = logger
         self.log.debug('YoBot built.')
+        self.startup = YoBotStartup()
 
-        super().__init__(command_prefix=self.config_file.get('prefix'), intents=intents)
+        self.recorder = YoBotRecorder(self, enabled=bool(self.config_file.get('recorder.enabled')),
+                                      log_dir=self.config_file.get('file_paths.log_dir'))
+
+        config_dir = self.config_file.get('file_paths.config_dir') or os.path.dirname(self.config_file.config_file)
+        self.prefixes = YoBotPrefixes(self, os.path.join(config_dir, 'prefixes.json'), self.config_file.get('prefix'))
+        self.blacklist = YoBotBlacklist(self)
+        self.cog_index = YoBotCogIndex(self, os.path.join(config_dir, 'cog_index.json'))
+        self.scheduler = YoBotScheduler(self, self.config_file.get('scheduler'))
+        self.lazy_cogs = YoBotLazyCogs(self, self.config_file.get('lazy_cogs'))
+        self.guild_cogs = YoBotGuildCogs(self, os.path.join(config_dir, 'guild_cogs.json'))
+        store_config = self.config_file.get('store') or {}
+        self.store = YoBotStore(self, os.path.join(config_dir, 'store.db'), cache_size=store_config.get('cache_size', 4096),
+                                batch_delay=store_config.get('batch_delay', 0.05))
+
+        # Raw socket events are only dispatched when recording, as they cost a decode per payload.
+        super().__init__(command_prefix=self.prefixes.get_prefix, intents=intents,
+                         enable_debug_events=self.recorder.enabled, tree_cls=YoBotCommandTree)
         """Initializes the bot."""
         self.log.debug('YoBot initialized.')
         self.running = True
+        self.accepting = True
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stopping = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.synced_tree_hash: Optional[str] = None
+        self._restart_lock = asyncio.Lock()
+        self.watchdog = YoBotWatchdog(self)
+        self.memory = YoBotMemory(self)
+        self.limiter = YoBotLimiter(self)
+        self.permissions = YoBotPermissions(self)
+        self.permissions.add_listeners()
+        self.add_check(self.guild_cogs.check)
+        self.web = YoBotHTTP(self, self.config_file.get('http'))
+        self.offload = YoBotOffload(self, self.config_file.get('offload'))
+        self.send_queue = YoBotSendQueue(self, self.config_file.get('send_queue'))
+        self.deferrals = YoBotDeferrals(self, self.config_file.get('deferral'))
+        self.triggers = YoBotTriggers(self)
+        self.triggers.add_listeners()
+        self.apply_config()
+        # After the permissions are configured, which would forget the seeded role sets.
+        self.snapshot = YoBotSnapshot(self, os.path.join(config_dir, 'snapshot.bin'), self.config_file.get('snapshot'))
+        if self.snapshot.enabled:
+            self.snapshot.add_listeners()
+            self.snapshot.seed_permissions()
+        if self.recorder.enabled:
+            self.add_listener(self.recorder.on_socket_raw_receive, 'on_socket_raw_receive')
+            self.log.info(f'Recording gateway events to {self.recorder.file}.')
+
+    async def start_bot(self):
+        """Starts YoBot and runs it until it is stopped."""
+        self.log.info('YoBot starting...')
+        self._loop = asyncio.get_running_loop()
+        self.add_signal_handlers()
+        if self.config_file.get('watchdog.enabled') is not False:
+            self.watchdog.start(self._loop)
+        self.scheduler.start()
+        warm_up = asyncio.create_task(self.offload.warm_up(), name='offload-warm-up')  # Overlaps cog loading.
+        # Logging in waits on Discord, so it overlaps cog loading too. This is the first half of `start`.
+        login = asyncio.create_task(self.log_in(self.config_file.get('discord_token')), name='login')
+        yobot_task: Optional[asyncio.Task] = None
+        command_task: Optional[asyncio.Task] = None
+        stopping = asyncio.create_task(self._stopping.wait(), name='stopping')
+        try:
+            # Inside the try, so a cog failing to load still closes what was started above.
+            with self.startup.phase('load cogs'):
+                await self.load_cogs()
+            self.lazy_cogs.start()
+            tree_hash = self.tree_hash()
+            self.synced_tree_hash = self.snapshot.tree_hash or tree_hash  # Without a snapshot, assume Discord has what was last run.
+            if self.synced_tree_hash != tree_hash:
+                self.log.warning('Application commands changed since the last run, use the sync terminal command to update Discord.')
+            # This is for the bot itself.
+            yobot_task = asyncio.create_task(self.connect_after(login), name='yobot')
+            # This is for the terminal commands.
+            command_task = asyncio.create_task(terminal_command_loop(self), name='terminal')
+            # This is for Flask to run the web server.
+            #flask_task = asyncio.create_task(start_server(self))
+            # Runs until stopped, or until the connection to Discord ends on its own.
+            await asyncio.wait([yobot_task, stopping], return_when=asyncio.FIRST_COMPLETED)
+            if yobot_task.done() and not yobot_task.cancelled() and yobot_task.exception():
+                self.log.error(f"Bot encountered an error: {yobot_task.exception()}")
+        except Exception as e:
+            self.log.error(f"Bot encountered an error: {e}")
+        finally:
+            stopping.cancel()
+            warm_up.cancel()
+            await self.shutdown(yobot_task or login, command_task)  # Without a connection yet, logging in is stopped instead.
+            #flask_task.cancel()  # Cancels the Flask task.
+
+    async def log_in(self, token: str) -> None:
+        """Logs in to Discord, timed as a startup phase."""
+        with self.startup.phase('log in'):
+            await self.login(token)
+
+    async def connect_after(self, login: 'asyncio.Task') -> None:
+        """Connects to the gateway once logged in, the second half of `start`."""
+        await login
+        if self.startup.profile:
+            self._startup_report = asyncio.create_task(self.report_startup(), name='startup-report')
+        await self.connect()
+
+    async def report_startup(self) -> None:
+        """Logs the startup phases once YoBot is ready."""
+        with self.startup.phase('connect until ready'):
+            await self.wait_until_ready()
+        self.startup.report(self)
+
+    def add_signal_handlers(self):
+        """Stops YoBot gracefully on SIGTERM."""
+        try:
+            self._loop.add_signal_handler(signal.SIGTERM, self.stop_bot)  # type: ignore
+        except (NotImplementedError, RuntimeError, AttributeError):
+            # Windows has no loop signal handlers, a plain handler hands over to the loop instead.
+            with contextlib.suppress(ValueError, AttributeError):
+                signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_bot())
+
+    async def shutdown(self, yobot_task: 'asyncio.Task', command_task: Optional['asyncio.Task']):
+        """
+        Shuts YoBot down in order, logging how long each step took.
+
+        New commands are turned away, running ones get until the drain timeout to finish,
+        cogs are unloaded, the Discord connection is closed and buffered state is written out.
+
+        Args:
+            yobot_task (Task): The task running the Discord client.
+            command_task (Task): The task running the terminal, None if it never started.
+        """
+        self.running = False
+        self.accepting = False
+        timings: Dict[str, float] = {}
+        drain_timeout = self.config_file.get('shutdown.drain_timeout') or 10.0
+
+        started = time.perf_counter()
+        if command_task is not None:
+            command_task.cancel()  # The terminal reads input in a daemon thread, so this does not wait on it.
+        try:
+            await asyncio.wait_for(self._idle.wait(), drain_timeout)
+        except asyncio.TimeoutError:
+            self.log.warning(f'{self._in_flight} commands still running after {drain_timeout}s, shutting down anyway.')
+        timings['drain'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await self.scheduler.stop()  # Cancels running jobs before their cogs go away.
+        self.lazy_cogs.stop()
+        for name in list(self.extensions):
+            try:
+                await self.unload_extension(name)  # Runs the cog's unload hooks.
+            except Exception as e:
+                self.log.error(f'Error unloading {name}: {e}')
+        timings['cogs'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await self.send_queue.drain(drain_timeout)  # Sends what cogs queued, including on unload.
+        timings['sends'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        snapshot = self.snapshot.capture() if self.snapshot.enabled else None  # While the guilds are still cached.
+        try:
+            await self.close()  # Closes the gateway and the HTTP session.
+            await asyncio.wait_for(asyncio.shield(yobot_task), 5)
+        except Exception:
+            yobot_task.cancel()
+        await self.web.close()
+        timings['discord'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        self.recorder.close()  # Writes out any buffered gateway events.
+        self.prefixes.flush()  # Writes out any unsaved prefix changes.
+        self.guild_cogs.flush()
+        if snapshot is not None:
+            self.snapshot.save(snapshot)
+        self.snapshot.release()
+        self.store.close()  # Commits queued writes.
+        self.offload.shutdown()
+        self.watchdog.stop()  # Stops the loop lag helper thread.
+        for handler in self.log.handlers:
+            handler.flush()
+        timings['flush'] = time.perf_counter() - started
+
+        self.log.info('YoBot stopped: ' + ' | '.join(f'{step} {seconds * 1000:.1f}ms' for step, seconds in timings.items()))
+
+    @contextlib.contextmanager
+    def in_flight(self) -> Iterator[None]:
+        """Counts a running command, so shutdown can wait for it."""
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.set()
+
+    async def invoke(self, ctx: commands.Context):
+        """Runs a prefix command, unless YoBot is shutting down."""
+        if not self.accepting:
+            return
+        if ctx.command is not None:
+            self.lazy_cogs.touch(ctx.command.module)
+        with self.in_flight():
+            await super().invoke(ctx)
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        """Dispatches an event, keeping lazy cogs that listen to it loaded."""
+        if self.lazy_cogs.enabled:
+            self.lazy_cogs.touch_event(event_name)
+        super().dispatch(event_name, *args, **kwargs)
+
+    def _schedule_event(self, coro, event_name: str, *args, **kwargs):
+        """Schedules a listener, unless its cog is turned off in the guild the event came from."""
+        if args and not self.guild_cogs.is_enabled(event_guild_id(args[:1]), coro.__module__):
+            return None
+        return super()._schedule_event(coro, event_name, *args, **kwargs)
+
+    async def _remove_module_references(self, name: str) -> None:
+        """Drops an unloaded extension's trigger subscriptions and jobs along with its commands and listeners."""
+        await super()._remove_module_references(name)
+        self.triggers.unregister_module(name)
+        self.scheduler.unregister_module(name)
+
+    def run_blocking(self, func: Callable, *args: Any, cog: Optional[str] = None,
+                     timeout: Optional[float] = None, **kwargs: Any) -> Awaitable[Any]:
+        """Runs a blocking function in a thread, counted against the calling cog, see `YoBotOffload.run_blocking`."""
+        return self.offload.run_blocking(func, *args, cog=cog or caller_module(), timeout=timeout, **kwargs)
+
+    def run_cpu(self, func: Callable, *args: Any, cog: Optional[str] = None,
+                timeout: Optional[float] = None, **kwargs: Any) -> Awaitable[Any]:
+        """Runs a CPU heavy function in a worker process, counted against the calling cog, see `YoBotOffload.run_cpu`."""
+        return self.offload.run_cpu(func, *args, cog=cog or caller_module(), timeout=timeout, **kwargs)
+
+    def apply_config(self):
+        """Applies the loaded config to YoBot and its subsystems."""
+        self.log_file = self.config_file.get('file_paths.log_file')
         self.cogs_dir = self.config_file.get('file_paths.cogs_dir')
         self.cogs_removal_blacklist = self.config_file.get('blacklist.cog_removal')
         self.avatar_file = self.config_file.get('file_paths.avatar_file')
@@ -55,33 +333,91 @@ class YoBot(commands.Bot):
         self.presence = self.config_file.get('presence')
         self.owner_name = self.config_file.get('owner_name')
         self.owner_id = self.config_file.get('owner_id')
+        self.watchdog.threshold = self.config_file.get('watchdog.threshold') or 0.25
+        self.watchdog.interval = self.config_file.get('watchdog.interval') or 0.5
+        self.limiter.configure(self.config_file.get('limiter'))
+        self.permissions.configure(self.config_file.get('permissions'))
+        self.deferrals.configure(self.config_file.get('deferral'))
+        self.prefixes.default = self.config_file.get('prefix')
 
-    async def start_bot(self):
-        """Starts YoBot."""
-        self.log.info('YoBot starting...')
+    def tree_hash(self) -> str:
+        """Returns a hash of the global application commands as Discord would receive them."""
+        payload = [command.to_dict() for command in self.tree.get_commands()]
+        payload.extend(self.lazy_cogs.unloaded_app_commands())  # Deferred cogs still have their commands synced.
+        payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def sync_tree(self) -> list:
+        """Syncs the application commands with Discord and remembers what was sent."""
+        await self.lazy_cogs.load_all()  # Discord needs the full tree, which deferred cogs only have once loaded.
+        synced = await self.tree.sync()
+        self.synced_tree_hash = self.tree_hash()
+        return synced
+
+    async def reload_cogs(self) -> None:
+        """Reloads every loaded cog, unloads cogs whose file is gone or that are now blacklisted and loads new ones."""
+        entries = self.cog_index.refresh(self.cogs_dir)
+        for name in [name for name in self.extensions if name.startswith('cogs.')]:
+            filename = f"{name[len('cogs.'):]}.py"
+            if filename not in entries:
+                await self.unload_extension(name)
+                self.log.debug(f'Unloaded - [ {name} ] (file removed)')
+            elif self.blacklist.matches('cog_load', filename):
+                await self.unload_extension(name)
+                self.log.debug(f'Unloaded - [ {name} ] (load blacklist)')
+            else:
+                await self.reload_extension(name)  # Rolls back to the old version if the new one fails.
+                if self.lazy_cogs.is_lazy(filename) and entries[filename].get('manifest') is None:
+                    self.lazy_cogs.record(name, entries[filename])  # The file changed, so its manifest was dropped.
+        self.lazy_cogs.prune()
         await self.load_cogs()
-        # This is for the bot itself.
-        yobot_task = asyncio.create_task(
-            self.start(self.config_file.get('discord_token')), name='yobot')
-        # This is for the terminal commands.
-        command_task = asyncio.create_task(terminal_command_loop(self), name='terminal')
-        # This is for Flask to run the web server.
-        #flask_task = asyncio.create_task(start_server(self))
-        try:
-            while self.running:
-                # This is to allow the bot to run in the background.
-                await asyncio.sleep(0)
-        except Exception as e:
-            self.log.error(f"Bot encountered an error: {e}")
-        finally:
-            yobot_task.cancel()  # Cancels the bot task.
-            command_task.cancel()  # Cancels the command task.
-            #flask_task.cancel()  # Cancels the Flask task.
+
+    async def soft_restart(self) -> Dict[str, float]:
+        """
+        Restarts YoBot in place, keeping the gateway connection open.
+
+        Reloads the config, rebuilds the logger handlers without starting a new log file,
+        reloads the cogs and syncs the application commands only if they changed.
+
+        Returns:
+            dict: The seconds each phase took.
+        """
+        timings: Dict[str, float] = {}
+        async with self._restart_lock:
+            self.log.info('YoBot soft restarting...')
+            started = time.perf_counter()
+            self.config_file.load()
+            self.apply_config()
+            self.prefixes.flush()  # Keep unsaved changes before reading the file back.
+            self.prefixes.load()
+            self.guild_cogs.flush()
+            self.guild_cogs.load()
+            timings['configs'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            self.log.reload(self.config_file.get('log_level') or 'INFO')
+            timings['logger'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await self.reload_cogs()
+            timings['cogs'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            changed = self.tree_hash() != self.synced_tree_hash
+            if changed and self.is_ready():
+                synced = await self.sync_tree()
+                self.log.info(f'{len(synced)} commands synchronized.')
+            timings['sync' if changed else 'sync (unchanged)'] = time.perf_counter() - started
+
+        self.log.info('Soft restart finished: ' + ' | '.join(f'{phase} {seconds * 1000:.1f}ms' for phase, seconds in timings.items()))
+        return timings
 
     def stop_bot(self):
-        """Stops YoBot."""
+        """Stops YoBot, safe to call from any thread."""
         self.log.info('YoBot stopping...')
         self.running = False
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopping.set)
 
     async def load_cogs(self):
         """Loads all cogs in the cogs directory."""
@@ -89,16 +425,21 @@ class YoBot(commands.Bot):
         loaded_extensions = 0
         cog_name = None
         try:
-            for filename in os.listdir(self.cogs_dir):
-                if filename.endswith('cog.py'):
-                    cog_name = f'cogs.{filename[:-3]}'
-                    if cog_name in self.extensions:
-                        self.log.debug(
-                            f'Skipping - [ {filename[:-3]} ] (already loaded)')
-                        continue
-                    await self.load_extension(cog_name)
-                    self.log.debug(f'Loaded - [ {filename[:-3]} ]')
-                    loaded_extensions += 1
+            for filename, entry in self.cog_index.refresh(self.cogs_dir).items():
+                cog_name = extension_name(filename)
+                if cog_name in self.extensions:
+                    self.log.debug(
+                        f'Skipping - [ {filename[:-3]} ] (already loaded)')
+                    continue
+                if self.blacklist.matches('cog_load', filename):
+                    self.log.debug(f'Skipping - [ {filename[:-3]} ] (load blacklist)')
+                    continue
+                if self.lazy_cogs.is_lazy(filename):
+                    await self.lazy_cogs.add(cog_name, entry)
+                    continue
+                await self.load_extension(cog_name)
+                self.log.debug(f'Loaded - [ {filename[:-3]} ]')
+                loaded_extensions += 1
         except Exception as e:
             raise CogException(cog_name, f'There was an error loading {e}')
         self.log.debug(f'Loaded {loaded_extensions} cogs.')
\ No newline at end of file
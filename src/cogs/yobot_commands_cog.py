@@ -1,7 +1,9 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from discord.ext import commands
 
+from utils.yobot_limiter import limited
+
 if TYPE_CHECKING:
     from bot.yobot import YoBot
 
@@ -32,8 +34,7 @@ class YoBotCommandCog(commands.Cog, name="YoBot Discord Commands", description="
     @commands.hybrid_command(name="admin")
     async def admin_command(self, ctx: commands.Context) -> None:
         """Admin only command example"""
-        allowed_roles = ["Admin", "Moderator"]
-        if any(role.name in allowed_roles for role in ctx.author.roles):  # type: ignore
+        if self.yobot.permissions.has_level(ctx.author, "admin"):  # Roles are set in the config's permissions section.
             try:
                 await ctx.send("Admin!")
             except Exception as e:
@@ -45,16 +46,51 @@ class YoBotCommandCog(commands.Cog, name="YoBot Discord Commands", description="
             except Exception as e:
                 self.yobot.log.error(f"Error in admin_command: {e}")
             self.yobot.log.warning(
-                f"{ctx.author} tried to use the ping command.")
+                f"{ctx.author} tried to use the admin command.")
+
 
+    @commands.hybrid_command(name="prefix")
+    @commands.guild_only()
+    async def prefix_command(self, ctx: commands.Context, *, prefixes: Optional[str] = None) -> None:
+        """Shows this server's prefixes, the owner can change them: /prefix <prefix ...|default>"""
+        try:
+            if prefixes is None:
+                await ctx.send(f"Prefixes: {' '.join(self.yobot.prefixes.for_guild(ctx.guild.id))}")  # type: ignore
+            elif str(ctx.author.id) != str(self.yobot.owner_id):
+                await ctx.send("You don't have permission to use this command.")
+            else:
+                new_prefixes = prefixes.split()
+                self.yobot.prefixes.set(ctx.guild.id, [] if new_prefixes == ['default'] else new_prefixes)  # type: ignore
+                await ctx.send(f"Prefixes set to: {' '.join(self.yobot.prefixes.for_guild(ctx.guild.id))}")  # type: ignore
+        except Exception as e:
+            self.yobot.log.error(f"Error in prefix_command: {e}")
+            await ctx.send("An error occurred while executing the command.")
+
+    @commands.hybrid_command(name="guildcog")
+    @commands.guild_only()
+    async def guildcog_command(self, ctx: commands.Context, action: Optional[str] = None, cog: Optional[str] = None) -> None:
+        """Shows the cogs turned off in this server, the owner can change them: /guildcog <on|off> <cog>"""
+        try:
+            if action is None:
+                disabled = self.yobot.guild_cogs.disabled_in(ctx.guild.id)  # type: ignore
+                await ctx.send(f"Turned off here: {', '.join(disabled) or 'none'}")
+            elif str(ctx.author.id) != str(self.yobot.owner_id):
+                await ctx.send("You don't have permission to use this command.")
+            elif action.lower() not in ["on", "off"] or cog is None:
+                await ctx.send("Usage: /guildcog <on|off> <cog>")
+            else:
+                await ctx.send(self.yobot.guild_cogs.change(ctx.guild.id, cog, action.lower() == "on"))  # type: ignore
+        except Exception as e:
+            self.yobot.log.error(f"Error in guildcog_command: {e}")
+            await ctx.send("An error occurred while executing the command.")
 
     @commands.command(name="restart")
     async def restart(self, ctx):
-        """Restarts the bot."""
+        """Restarts the bot in place, keeping it connected."""
         try:
             await ctx.send('Restarting...')
-            self.yobot.stop_bot()
-            await self.yobot.start_bot()
+            timings = await self.yobot.soft_restart()
+            await ctx.send('Restarted in {:.0f}ms.'.format(sum(timings.values()) * 1000))
         except Exception as e:
             self.yobot.log.error(f"Error in restart command: {e}")
             await ctx.send("An error occurred while executing the command.")
@@ -69,6 +105,7 @@ class YoBotCommandCog(commands.Cog, name="YoBot Discord Commands", description="
                 self.yobot.log.error(f"Error in parent_command: {e}")
 
     @parent_command.command(name="sub")
+    @limited()  # Opts into the shared rate and concurrency limits.
     async def sub_command(self, ctx: commands.Context, argument: str) -> None:
         """This is a sub command. It looks like this: /parent sub <argument>"""
         try:
@@ -1,8 +1,12 @@
+import traceback
 from typing import TYPE_CHECKING
 
 import discord.ext.commands as commands
 
+from utils.yobot_guildcogs import CogDisabled
 from utils.yobot_lib import update_with_discord, welcome_to_yobot
+from utils.yobot_limiter import CommandRateLimited
+from utils.yobot_permissions import MissingRoleLevel
 
 if TYPE_CHECKING:
     from bot.yobot import YoBot
@@ -53,6 +57,26 @@ class YoBotCoreCog(commands.Cog, name='YoBot Core', description='Core Discord ev
         except Exception as e:
             self.yobot.log.error(f'Error handling message: {e}')
 
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
+        """Called when a command fails."""
+        try:
+            if isinstance(error, CommandRateLimited):
+                self.yobot.log.debug(f'{ctx.author} was rate limited using {ctx.command}: {error}')
+                if ctx.interaction is not None:  # Interactions must be answered, prefix commands are dropped quietly.
+                    await ctx.send(str(error), ephemeral=True)
+            elif isinstance(error, MissingRoleLevel):
+                self.yobot.log.warning(f'{ctx.author} tried to use the {ctx.command} command.')
+                await ctx.send(str(error), ephemeral=True)
+            elif isinstance(error, CogDisabled):
+                self.yobot.log.debug(f'{ctx.command} is turned off in {ctx.guild}.')  # Turned off cogs stay quiet.
+            elif isinstance(error, commands.CommandNotFound):
+                self.yobot.log.debug(f'{error}')
+            elif ctx.command is None or not ctx.command.has_error_handler():
+                trace = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+                self.yobot.log.error(f'Error in command {ctx.command}: {error}\n{trace}')
+        except Exception as e:
+            self.yobot.log.error(f'Error handling command error: {e}')
 
 async def setup(yobot: 'YoBot') -> None:
     """Loads the cog."""
@@ -1,10 +1,10 @@
-import asyncio
+import argparse
 import os
 
 import yaml
 
-from utils.yobot_builder import Builder
 from utils.yobot_configs import Configs
+from utils.yobot_startup import YoBotStartup
 
 #                       __                 __
 #                      /\ \               /\ \__
@@ -34,7 +34,22 @@ from utils.yobot_configs import Configs
 # along with this program as 'LICENSE.md'.  If not, see <https://www.gnu.org/licenses/>.
 
 
-def launch_bot():
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    Args:
+        argv (list): The options, the command line by default.
+    """
+    parser = argparse.ArgumentParser(description='Starts YoBot.')
+    parser.add_argument('--loop', choices=('auto', 'asyncio', 'uvloop'),
+                        help='The event loop to run on, overriding loop.policy in the config.')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Log how long each startup phase and the slowest imports took once YoBot is ready.')
+    return parser.parse_args(argv)
+
+
+def launch_bot(args: argparse.Namespace = None):
     """
     Ensures that the bot's files are set up, then builds and starts the bot.
 
@@ -47,7 +62,14 @@ def launch_bot():
     If you are developing the bot itself, you may need to edit this file.
 
     This is meant to be the main entry point for the bot.
+
+    Args:
+        args (argparse.Namespace): The command line options, parsed from the command line by default.
     """
+    args = args or parse_arguments()
+    startup = YoBotStartup(profile=args.profile_startup)
+    # discord.py takes most of the startup time to import, so it imports while the files and config are checked.
+    startup.preload('utils.yobot_builder')
     root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # The root of the project file is considered <../YoBot-Discord>.
     config_dir = f'{root_dir}/configs'
     config_file = f'{root_dir}/configs/config.yaml'
@@ -79,6 +101,7 @@ def launch_bot():
                 print('Cogs directory not found. Creating cogs directory...')
         except Exception as e:
             print(f'Error creating directories: {e}')
+        startup.mark('check directories')
 
         if not os.path.isfile(config_file):
             print('Config file not found. Setting up config...')
@@ -116,7 +139,77 @@ def launch_bot():
                     "repo_info": "cogdescriptions.csv",
                 },
                 "blacklist": {
-                    "cog_removal": ["yobotcorecog.py", "yobotcommandcog.py"],
+                    "cog_removal": ["yobot_core_cog.py", "yobot_commands_cog.py"],
+                    "cog_load": [],
+                    "guilds": {},
+                },
+                "recorder": {
+                    "enabled": False,
+                },
+                "watchdog": {
+                    "enabled": True,
+                    "threshold": 0.25,
+                    "interval": 0.5,
+                },
+                "permissions": {
+                    "admin": ["Admin", "Moderator"],
+                },
+                "shutdown": {
+                    "drain_timeout": 10.0,
+                },
+                "http": {
+                    "limit": 100,
+                    "limit_per_host": 10,
+                    "dns_ttl": 300,
+                    "timeout": 30.0,
+                    "cache_size": 256,
+                },
+                "deferral": {
+                    "enabled": True,
+                    "threshold": 2.0,
+                    "ephemeral": False,
+                },
+                "offload": {
+                    "threads": 8,
+                    "processes": 2,
+                    "per_cog": 4,
+                    "timeout": 60.0,
+                },
+                "loop": {
+                    "policy": "auto",
+                    "eager_tasks": False,
+                    "executor_workers": 8,
+                },
+                "scheduler": {
+                    "max_concurrency": 10,
+                },
+                "send_queue": {
+                    "channel_rate": 5,
+                    "channel_per": 5.0,
+                    "global_rate": 45,
+                    "global_per": 1.0,
+                    "interaction_reserve": 5,
+                    "max_depth": 500,
+                },
+                "snapshot": {
+                    "enabled": False,
+                },
+                "store": {
+                    "cache_size": 4096,
+                    "batch_delay": 0.05,
+                },
+                "lazy_cogs": {
+                    "enabled": False,
+                    "idle_ttl": 3600,
+                    "eager": ["yobot_core_cog.py", "yobot_commands_cog.py"],
+                },
+                "limiter": {
+                    "user": {"rate": 5, "per": 10},
+                    "guild": {"rate": 30, "per": 10},
+                    "global": {"rate": 100, "per": 1},
+                    "max_concurrency": 50,
+                    "guild_concurrency": 5,
+                    "queue_timeout": 5.0,
                 }
             }
 
@@ -127,14 +220,23 @@ def launch_bot():
             print('Config file found.')
     except Exception as e:
         print(f'Error setting up YoBot files: {e}')
+    startup.mark('set up config')
 
     config = Configs(config_file)
     config.load()
+    startup.mark('load config')
+    startup.wait_for_preloads()
+    from utils.yobot_builder import Builder
+    from utils.yobot_loop import run_loop
+
     builder = Builder(config=config)
+    startup.mark('start logger')
 
     yobot = builder.yobot_build()  # Build the bot.
+    startup.mark('build YoBot')
     if yobot:
-        asyncio.run(yobot.start_bot())
+        yobot.startup = startup
+        run_loop(yobot, yobot.start_bot, args.loop)
     else:
         print('YoBot failed to build or start.')
         input('Press ENTER to EXIT.')
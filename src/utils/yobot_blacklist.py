@@ -0,0 +1,109 @@
+import fnmatch
+import re
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Optional, Pattern, Tuple
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+POLICIES = ('cog_removal', 'cog_load')
+GLOB_CHARACTERS = set('*?[')
+
+
+class YoBotMatcher():
+    """
+    A compiled set of blacklist patterns.
+
+    Plain names go into a set, globs and `re:` regular expressions are joined into one
+    pattern, and every answer is remembered so repeated lookups are a dict hit.
+
+    Args:
+        patterns (list): File names, globs like `test_*cog.py`, or regexes like `re:^dev_.*`.
+    """
+
+    def __init__(self, patterns: Optional[Iterable[str]]):
+        self.names: FrozenSet[str] = frozenset()
+        self.pattern: Optional[Pattern[str]] = None
+        self._results: Dict[str, bool] = {}
+        names, expressions = set(), []
+        for pattern in patterns or []:
+            pattern = str(pattern)
+            if pattern.startswith('re:'):
+                expressions.append(f'(?:{pattern[3:]})')
+            elif GLOB_CHARACTERS & set(pattern):
+                expressions.append(fnmatch.translate(pattern))
+            else:
+                names.add(pattern)
+        self.names = frozenset(names)
+        if expressions:
+            self.pattern = re.compile('|'.join(expressions))
+
+    def __contains__(self, name: str) -> bool:
+        result = self._results.get(name)
+        if result is None:
+            result = self._results[name] = name in self.names or (
+                self.pattern is not None and self.pattern.match(name) is not None)
+        return result
+
+    def __bool__(self) -> bool:
+        return bool(self.names) or self.pattern is not None
+
+
+class YoBotBlacklist():
+    """
+    The cog blacklists from the `blacklist` config section.
+
+    `cog_removal` protects cogs from the removal commands, `cog_load` keeps cogs from being
+    loaded, and `guilds` maps guild IDs to the cogs turned off in that guild. Each is compiled
+    once and rebuilt only when the config changes.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+    """
+
+    def __init__(self, yobot: 'YoBot'):
+        self.yobot = yobot
+        self._version: Optional[int] = None
+        self._policies: Dict[str, YoBotMatcher] = {}
+        self._guilds: Dict[int, YoBotMatcher] = {}
+
+    def _refresh(self) -> None:
+        """Recompiles the blacklists if the config changed since they were compiled."""
+        config = self.yobot.config_file
+        if config.version == self._version:
+            return
+        self._version = config.version
+        self._policies = {policy: YoBotMatcher(config.get(f'blacklist.{policy}')) for policy in POLICIES}
+        self._guilds = {}
+        for guild_id, patterns in (config.get('blacklist.guilds') or {}).items():
+            try:
+                self._guilds[int(guild_id)] = YoBotMatcher(patterns)
+            except ValueError:
+                self.yobot.log.warning(f"Ignoring blacklist for '{guild_id}', guild IDs must be numbers.")
+
+    def matches(self, policy: str, filename: str) -> bool:
+        """
+        Returns whether a cog file is on a blacklist.
+
+        Args:
+            policy (str): `cog_removal` or `cog_load`.
+            filename (str): The cog's file name.
+        """
+        self._refresh()
+        return filename in self._policies[policy]
+
+    def blocked_in_guild(self, guild_id: Optional[int], filename: str) -> bool:
+        """
+        Returns whether a cog is turned off in a guild by the `guilds` blacklist.
+
+        Args:
+            guild_id (int): The guild's ID, or None for direct messages.
+            filename (str): The cog's file name.
+        """
+        self._refresh()
+        matcher = self._guilds.get(guild_id) if guild_id is not None else None
+        return matcher is not None and filename in matcher
+
+    def guild_policies(self) -> Tuple[int, ...]:
+        """Returns the IDs of guilds with a blacklist."""
+        self._refresh()
+        return tuple(self._guilds)
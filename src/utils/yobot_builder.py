@@ -4,7 +4,6 @@ from discord import Intents
 
 from bot.yobot import YoBot
 from utils.yobot_logger import YoBotLogger
-from utils.yobot_lib import download_cogs
 from utils.yobot_exceptions import *
 from utils.yobot_configs import Configs
 
@@ -67,6 +66,7 @@ class Builder(YoBot):
                 if update:
                     self.log.debug('Trying to build cogs')
                     self.log.info('Running first time Cog setup...')
+                    from utils.yobot_lib import download_cogs  # Pulls in requests, which only the first run needs.
                     download_cogs(self, config['repo_owner'], config['repo_name'], config['repo_info'])
                     self.log.info('Cog setup complete.')
         except FileNotFoundError as e:
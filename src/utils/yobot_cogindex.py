@@ -0,0 +1,208 @@
+import ast
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+INDEX_VERSION = 1
+COMMAND_DECORATORS = {
+    'command': 'prefix',
+    'group': 'prefix',
+    'hybrid_command': 'hybrid',
+    'hybrid_group': 'hybrid',
+}
+
+
+class YoBotCogIndex():
+    """
+    A persisted index of the cogs in the cogs directory.
+
+    Each `*cog.py` file is recorded with its mtime, size and SHA-1, along with the cog classes,
+    commands and listeners found by reading its source, without importing it. Refreshing
+    only stats the directory, files are read again when their mtime or size changed and
+    parsed again only when their hash did. Entries can carry extra data, such as lazy cog
+    manifests, which is dropped whenever the file changes.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the index file.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str):
+        self.yobot = yobot
+        self.file = file
+        self.entries: Dict[str, dict] = {}
+        self.cogs_dir: Optional[str] = None
+        self.version = 0  # Bumped whenever an entry is added, changed or removed.
+        self.load()
+
+    def load(self) -> None:
+        """Reads the saved index, a missing, broken or outdated index is rebuilt on refresh."""
+        try:
+            with open(self.file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        except (OSError, ValueError) as e:
+            self.yobot.log.warning(f'Rebuilding the cog index, {self.file} could not be read: {e}')
+            saved = {}
+        if saved.get('version') != INDEX_VERSION:
+            saved = {}
+        self.cogs_dir = saved.get('cogs_dir')
+        self.entries = saved.get('cogs', {})
+
+    def save(self) -> None:
+        """Writes the index, to a temporary file first so it is never half written."""
+        os.makedirs(os.path.dirname(self.file) or '.', exist_ok=True)
+        temporary = f'{self.file}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'cogs_dir': self.cogs_dir, 'cogs': self.entries}, f)
+        os.replace(temporary, self.file)
+
+    def refresh(self, cogs_dir: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Brings the index up to date with the cogs directory.
+
+        Args:
+            cogs_dir (str): The cogs directory, YoBot's by default.
+
+        Returns:
+            dict: The entries by file name, in file name order.
+        """
+        cogs_dir = os.path.abspath(cogs_dir or self.yobot.cogs_dir)
+        changed = cogs_dir != self.cogs_dir
+        if changed:
+            self.cogs_dir = cogs_dir
+            self.entries = {}
+        found = set()
+        with os.scandir(cogs_dir) as files:
+            for file in files:
+                if not file.name.endswith('cog.py') or not file.is_file():
+                    continue
+                found.add(file.name)
+                stat = file.stat()
+                entry = self.entries.get(file.name)
+                if entry is not None and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                    continue
+                with open(file.path, 'rb') as f:
+                    source = f.read()
+                sha1 = hashlib.sha1(source).hexdigest()
+                if entry is None or entry['sha1'] != sha1:
+                    entry = {'sha1': sha1, **scan_source(source, file.name)}
+                    self.yobot.log.debug(f'Indexed - [ {file.name} ]')
+                entry['mtime'] = stat.st_mtime_ns  # Touched but unchanged files keep their entry.
+                entry['size'] = stat.st_size
+                self.entries[file.name] = entry
+                changed = True
+        for name in set(self.entries) - found:
+            del self.entries[name]
+            changed = True
+        if changed:
+            self.version += 1
+            self.entries = dict(sorted(self.entries.items()))
+            self.save()
+        return self.entries
+
+    def files(self, cogs_dir: Optional[str] = None) -> List[str]:
+        """Returns the cog file names, refreshing the index first."""
+        return list(self.refresh(cogs_dir))
+
+    def is_loaded(self, filename: str) -> bool:
+        """Returns whether a cog file's extension is loaded."""
+        return extension_name(filename) in self.yobot.extensions
+
+
+def extension_name(filename: str) -> str:
+    """Returns the extension name YoBot loads a cog file as."""
+    return f'cogs.{filename[:-3]}'
+
+
+def _decorator_name(decorator: ast.expr) -> str:
+    """Returns the last part of a decorator's name, `commands.hybrid_command(...)` gives `hybrid_command`."""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    return ''
+
+
+def _decorator_owner(decorator: ast.expr) -> str:
+    """Returns what a decorator is accessed on, `commands.command()` gives `commands`."""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute) and isinstance(decorator.value, ast.Name):
+        return decorator.value.id
+    return ''
+
+
+def _keywords(decorator: ast.expr) -> dict:
+    """Returns a decorator call's literal keyword arguments."""
+    if not isinstance(decorator, ast.Call):
+        return {}
+    found = {}
+    for keyword in decorator.keywords:
+        try:
+            found[keyword.arg] = ast.literal_eval(keyword.value)
+        except ValueError:
+            pass
+    return found
+
+
+def scan_source(source: bytes, filename: str) -> dict:
+    """
+    Reads a cog's classes, commands and listeners from its source.
+
+    Only literal names are picked up, anything computed at import time is left out.
+
+    Args:
+        source (bytes): The cog file's source.
+        filename (str): The file name, for error messages.
+
+    Returns:
+        dict: The `cogs`, `commands`, `listeners` and `has_setup` of the file, or an `error`.
+    """
+    try:
+        tree = ast.parse(source, filename)
+    except (SyntaxError, ValueError) as e:
+        return {'cogs': [], 'commands': [], 'listeners': [], 'has_setup': False, 'error': str(e)}
+    cogs, found_commands, listeners = [], [], []
+    has_setup = False
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == 'setup':
+            has_setup = True
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if not any(_decorator_name(base) in ('Cog', 'GroupCog') for base in node.bases):
+            continue
+        cogs.append(node.name)
+        groups: Dict[str, dict] = {}  # Method names to commands, for `@group.command()` subcommands.
+        for item in node.body:
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for decorator in item.decorator_list:
+                name = _decorator_name(decorator)
+                keywords = _keywords(decorator)
+                if name == 'listener':
+                    event = keywords.get('name')
+                    if event is None and isinstance(decorator, ast.Call) and decorator.args:
+                        event = getattr(decorator.args[0], 'value', None)
+                    listeners.append(event or item.name)
+                elif name in COMMAND_DECORATORS:
+                    owner = _decorator_owner(decorator)
+                    command = {
+                        'name': keywords.get('name') or item.name,
+                        'aliases': list(keywords.get('aliases') or []),
+                        'kind': 'slash' if owner == 'app_commands' else COMMAND_DECORATORS[name],
+                        'description': (ast.get_docstring(item) or '').split('\n')[0],
+                    }
+                    if owner in groups:
+                        command['parent'] = groups[owner]['name']
+                        command['kind'] = groups[owner]['kind']
+                    groups[item.name] = command
+                    found_commands.append(command)
+    return {'cogs': cogs, 'commands': found_commands, 'listeners': sorted(set(listeners)), 'has_setup': has_setup, 'error': None}
@@ -7,8 +7,10 @@ class Configs:
         self.config_file = config_file
         self.config = None
         self.file_type = None
+        self.version = 0  # Bumped on every change, so compiled views of the config know to rebuild.
 
     def load(self):
+        self.version += 1
         if self.config_file.endswith('.ini'):
             self.file_type = 'ini'
             self.config = configparser.ConfigParser()
@@ -47,12 +49,14 @@ class Configs:
             return value
 
     def set(self, key, value):
+        self.version += 1
         if self.file_type == 'ini':
             self.config.set(key, value)
         else:
             self.config[key] = value
             
     def set_all(self, key, value):
+        self.version += 1
         if self.file_type == 'ini':
             self.config[key] = value
         else:
@@ -67,6 +71,7 @@ class Configs:
             config[keys[-1]] = value
     
     def clear(self):
+        self.version += 1
         if self.file_type == 'ini':
             self.config.clear()
         else:
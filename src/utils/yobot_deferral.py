@@ -0,0 +1,229 @@
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+import discord
+from discord.interactions import InteractionResponse
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotCommandTiming():
+    """How long one application command takes and how often it had to be deferred."""
+
+    def __init__(self):
+        self.calls = 0
+        self.deferred = 0
+        self.runtimes: Deque[float] = deque(maxlen=256)
+
+    def percentile(self, pct: float) -> float:
+        """Returns a percentile in milliseconds of recent runtimes."""
+        if not self.runtimes:
+            return 0.0
+        ordered = sorted(self.runtimes)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+class YoBotDeferral():
+    """
+    One running application command and whether YoBot has deferred it.
+
+    Attributes:
+        interaction (Interaction): The command's interaction.
+        started (float): When the command started, on the monotonic clock.
+        deferred (bool): Whether YoBot deferred the response.
+        ephemeral (bool): Whether YoBot's thinking message is only shown to the user.
+        responding (bool): Whether the command has started to respond itself.
+        followed_up (bool): Whether the command has sent its first followup since the deferral.
+    """
+
+    def __init__(self, interaction: discord.Interaction):
+        self.interaction = interaction
+        self.started = time.monotonic()
+        self.deferred = False
+        self.ephemeral = False
+        self.responding = False
+        self.followed_up = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def landed(self) -> None:
+        """Waits for a deferral in progress, so nothing is sent before Discord has it."""
+        if self.task is not None and not self.task.done():
+            await asyncio.shield(self.task)
+
+
+class YoBotInteractionResponse(InteractionResponse):
+    """
+    An interaction response that knows when YoBot has deferred it.
+
+    Once deferred, `send_message` sends a followup instead, which replaces the "thinking"
+    message, and `defer` does nothing, so commands don't need to know they were deferred.
+    A modal can't follow a deferral, so commands that open one must do it before the threshold.
+    """
+
+    def __init__(self, parent: discord.Interaction, deferral: YoBotDeferral):
+        super().__init__(parent)
+        self._deferral = deferral
+
+    async def defer(self, **kwargs: Any) -> None:
+        await self._deferral.landed()
+        if self._deferral.deferred:
+            return
+        self._deferral.responding = True
+        await super().defer(**kwargs)
+
+    async def send_message(self, content: Optional[Any] = None, **kwargs: Any) -> None:
+        await self._deferral.landed()
+        if not self._deferral.deferred:
+            self._deferral.responding = True
+            return await super().send_message(content, **kwargs)
+        delete_after = kwargs.pop('delete_after', None)
+        message = await self._parent.followup.send(content, wait=delete_after is not None, **kwargs)
+        if delete_after is not None:
+            await message.delete(delay=delete_after)
+
+    async def send_modal(self, modal, /) -> None:
+        self._deferral.responding = True
+        await super().send_modal(modal)
+
+
+class YoBotFollowup():
+    """
+    An interaction's followup webhook that keeps the first reply after a deferral as visible as asked.
+
+    The first followup after a deferral replaces the thinking message and takes its visibility,
+    so an ephemeral reply after a public deferral would be shown to everyone. When the two
+    differ, the thinking message is deleted first, so the reply is sent as a message of its own.
+    """
+
+    def __init__(self, parent: discord.Interaction, deferral: YoBotDeferral):
+        self._parent = parent
+        self._deferral = deferral
+        self._webhook: Optional[discord.Webhook] = None
+
+    @property
+    def webhook(self) -> discord.Webhook:
+        """The interaction's own followup webhook."""
+        if self._webhook is None:
+            self._webhook = type(self._parent).followup.function(self._parent)  # type: ignore
+        return self._webhook
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.webhook, name)
+
+    async def send(self, *args: Any, **kwargs: Any) -> Any:
+        deferral = self._deferral
+        await deferral.landed()
+        if deferral.deferred and not deferral.followed_up:
+            deferral.followed_up = True
+            if bool(kwargs.get('ephemeral', False)) != deferral.ephemeral:
+                await self._parent.delete_original_response()
+        return await self.webhook.send(*args, **kwargs)
+
+
+class YoBotDeferrals():
+    """
+    Defers slow application commands before Discord gives up on them.
+
+    Discord fails an interaction that gets no response within 3 seconds. Every application
+    command, including hybrid commands used as slash commands, is watched from when YoBot
+    receives it, and if it has not started responding by the threshold YoBot defers it, which
+    shows that the bot is thinking. The command's own response then becomes a followup, as
+    `ctx.send` already does for hybrid commands. Each command's runtimes and how often it was
+    deferred are kept, so the `slow` terminal command can show which ones to look at.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `deferral` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        self.yobot = yobot
+        self.commands: Dict[str, YoBotCommandTiming] = {}
+        self.failed = 0
+        self.configure(config)
+
+    def configure(self, config: Optional[dict]) -> None:
+        """
+        Sets the threshold and whether deferred responses are ephemeral, keeping the timings.
+
+        Args:
+            config (dict): The `deferral` config section.
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True) is not False
+        self.threshold = float(config.get('threshold', 2.0))
+        self.ephemeral = bool(config.get('ephemeral', False))
+
+    def watch(self, interaction: discord.Interaction) -> Optional[YoBotDeferral]:
+        """
+        Starts watching an application command, deferring it if it runs past the threshold.
+
+        Args:
+            interaction (Interaction): The command's interaction.
+
+        Returns:
+            YoBotDeferral: The watch to pass to `finish`, or None if the interaction is not watched.
+        """
+        if not self.enabled or interaction.type is not discord.InteractionType.application_command:
+            return None
+        deferral = YoBotDeferral(interaction)
+        interaction._cs_response = YoBotInteractionResponse(interaction, deferral)  # type: ignore
+        interaction._cs_followup = YoBotFollowup(interaction, deferral)  # type: ignore
+        deferral.timer = asyncio.get_running_loop().call_later(self.threshold, self._expired, deferral)
+        return deferral
+
+    def _expired(self, deferral: YoBotDeferral) -> None:
+        """Defers a command that has not responded by the threshold."""
+        deferral.timer = None
+        if deferral.responding or deferral.interaction.response.is_done():
+            return
+        deferral.task = asyncio.create_task(self._defer(deferral), name='auto-defer')
+
+    async def _defer(self, deferral: YoBotDeferral) -> None:
+        deferral.deferred = True
+        deferral.ephemeral = self.ephemeral
+        try:
+            await InteractionResponse.defer(deferral.interaction.response, ephemeral=self.ephemeral, thinking=True)
+        except discord.HTTPException as e:
+            # Too late or already answered, the command's own response tries as if never deferred.
+            deferral.deferred = False
+            self.failed += 1
+            self.yobot.log.debug(f'Could not defer /{command_name(deferral.interaction)}: {e}')
+
+    async def finish(self, deferral: Optional[YoBotDeferral]) -> None:
+        """
+        Stops watching a command and records how long it took.
+
+        Args:
+            deferral (YoBotDeferral): The watch from `watch`.
+        """
+        if deferral is None:
+            return
+        if deferral.timer is not None:
+            deferral.timer.cancel()
+        await deferral.landed()
+        timing = self.commands.setdefault(command_name(deferral.interaction), YoBotCommandTiming())
+        timing.calls += 1
+        timing.deferred += deferral.deferred
+        timing.runtimes.append(time.monotonic() - deferral.started)
+
+    def report(self) -> List[dict]:
+        """Returns each command's calls, deferrals and runtimes, the most often deferred first."""
+        rows = [{'command': name, 'calls': timing.calls, 'deferred': timing.deferred,
+                 'deferred_pct': timing.deferred * 100 / timing.calls if timing.calls else 0.0,
+                 'p50': timing.percentile(50), 'p95': timing.percentile(95),
+                 'max': max(timing.runtimes, default=0.0) * 1000}
+                for name, timing in self.commands.items()]
+        return sorted(rows, key=lambda row: (row['deferred_pct'], row['p95']), reverse=True)
+
+
+def command_name(interaction: discord.Interaction) -> str:
+    """Returns the full name of an interaction's command, with its group."""
+    command = interaction.command
+    if command is not None:
+        return command.qualified_name
+    return (interaction.data or {}).get('name', 'unknown')  # type: ignore
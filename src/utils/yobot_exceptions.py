@@ -36,4 +36,19 @@ class FileException(YoBotException):
     """Exception raised for errors related to files."""
     def __init__(self, file_name, message):
         self.file_name = file_name
-        super().__init__(f"Error with file {file_name}: {message}")
\ No newline at end of file
+        super().__init__(f"Error with file {file_name}: {message}")
+
+
+class HTTPException(YoBotException):
+    """Exception raised for HTTP responses with an error status."""
+    def __init__(self, url, status):
+        self.url = url
+        self.status = status
+        super().__init__(f"Error fetching {url}: status {status}")
+
+class SendQueueFull(YoBotException):
+    """Exception raised when a send queue already holds its most messages."""
+    def __init__(self, key, depth):
+        self.key = key
+        self.depth = depth
+        super().__init__(f"Send queue for {key} is full with {depth} messages")
\ No newline at end of file
@@ -0,0 +1,215 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.yobot_jsonfile import YoBotJsonFile
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class CogDisabled(commands.CheckFailure):
+    """
+    Raised when a command's cog is turned off in the guild it was used in.
+
+    Args:
+        cog (str): The cog's extension name.
+    """
+
+    def __init__(self, cog: str):
+        self.cog = cog
+        super().__init__('This command is turned off in this server.')
+
+
+class YoBotGuildCogs():
+    """
+    Per-guild cog enablement for YoBot.
+
+    Every cog gets a bit, and each guild with turned off cogs keeps one integer mask, so
+    checking a listener or command is a dict lookup and a shift. Masks combine the cogs
+    turned off with the `guildcogs` commands, saved to a JSON file, and the cogs matched by
+    the `blacklist.guilds` config section. Events from guilds without a mask skip the check
+    entirely.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the guild cogs file.
+        save_delay (float): The number of seconds to wait for more changes before saving.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str, save_delay: float = 1.0):
+        self.yobot = yobot
+        self.file = file
+        self.disabled: Dict[int, set] = {}
+        self._bits: Dict[str, int] = {}
+        self._masks: Dict[int, int] = {}
+        self._version: Optional[tuple] = None
+        self.saver = YoBotJsonFile(yobot, file, self._serialize, 'guild cogs', save_delay)
+        self.load()
+
+    def load(self) -> None:
+        """Loads the saved guild cog settings, a missing or broken file turns nothing off."""
+        try:
+            with open(self.file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        except (OSError, ValueError) as e:
+            self.yobot.log.error(f'Error loading guild cogs from {self.file}: {e}')
+            saved = {}
+        self.disabled = {int(guild_id): set(names) for guild_id, names in saved.items() if names}
+        self._version = None
+
+    def _bit(self, name: str) -> int:
+        """Returns a cog's bit, giving it the next free one the first time."""
+        bit = self._bits.get(name)
+        if bit is None:
+            bit = self._bits[name] = len(self._bits)
+        return bit
+
+    def _rebuild(self) -> None:
+        """Rebuilds every guild's mask from the saved settings and the guild blacklist."""
+        masks: Dict[int, int] = {}
+        for guild_id, names in self.disabled.items():
+            for name in names:
+                masks[guild_id] = masks.get(guild_id, 0) | 1 << self._bit(name)
+        blacklist = self.yobot.blacklist
+        for guild_id in blacklist.guild_policies():
+            for filename in self.yobot.cog_index.entries:
+                if blacklist.blocked_in_guild(guild_id, filename):
+                    masks[guild_id] = masks.get(guild_id, 0) | 1 << self._bit(f'cogs.{filename[:-3]}')
+        self._masks = masks
+        self._version = self._sources()
+
+    def _sources(self) -> tuple:
+        """Returns the versions of the config and cog index the masks were built from."""
+        return self.yobot.config_file.version, self.yobot.cog_index.version
+
+    def is_enabled(self, guild_id: Optional[int], name: Optional[str]) -> bool:
+        """
+        Returns whether a cog is turned on in a guild, always True outside of guilds.
+
+        Args:
+            guild_id (int): The guild's ID, or None.
+            name (str): The module the listener or command comes from.
+        """
+        if self._version != self._sources():
+            self._rebuild()
+        if not self._masks or guild_id is None:
+            return True
+        mask = self._masks.get(guild_id)
+        if not mask:
+            return True
+        bit = self._bits.get(name)  # type: ignore
+        return bit is None or not mask >> bit & 1
+
+    def has_disabled(self, guild_id: Optional[int]) -> bool:
+        """Returns whether any cog is turned off in a guild."""
+        if self._version != self._sources():
+            self._rebuild()
+        return guild_id is not None and bool(self._masks.get(guild_id))
+
+    def set(self, guild_id: int, name: str, enabled: bool) -> None:
+        """
+        Turns a cog on or off in a guild and schedules a save.
+
+        Args:
+            guild_id (int): The guild's ID.
+            name (str): The cog's extension name.
+            enabled (bool): Whether the cog should run in the guild.
+        """
+        names = self.disabled.setdefault(guild_id, set())
+        if enabled:
+            names.discard(name)
+            if not names:
+                del self.disabled[guild_id]
+        else:
+            names.add(name)
+        self._rebuild()
+        self.saver.schedule()
+
+    def change(self, guild_id: int, cog: str, enabled: bool) -> str:
+        """
+        Turns a cog on or off in a guild by the name a user gave, for the terminal and owner commands.
+
+        Returns:
+            str: What happened, to show the user.
+        """
+        name = self.resolve(cog)
+        if name is None:
+            return f"'{cog}' is not an installed cog."
+        if not enabled and self.is_protected(name):
+            return f"'{name}' is on the cog removal blacklist and can't be turned off."
+        self.set(guild_id, name, enabled)
+        if enabled and name in self.disabled_in(guild_id):
+            return f"'{name}' is still turned off in {guild_id} by the guild blacklist in the config."
+        return f"'{name}' turned {'on' if enabled else 'off'} in {guild_id}."
+
+    def resolve(self, cog: str) -> Optional[str]:
+        """
+        Returns the extension name for a cog given as a file name, module or extension name.
+
+        Args:
+            cog (str): The cog, like `music_cog`, `music_cog.py` or `cogs.music_cog`.
+
+        Returns:
+            str: The extension name, or None if no such cog is installed.
+        """
+        stem = cog[len('cogs.'):] if cog.startswith('cogs.') else cog
+        stem = stem[:-3] if stem.endswith('.py') else stem
+        return f'cogs.{stem}' if f'{stem}.py' in self.yobot.cog_index.refresh() else None
+
+    def is_protected(self, name: str) -> bool:
+        """Returns whether a cog is on the removal blacklist, which also keeps it from being turned off."""
+        return self.yobot.blacklist.matches('cog_removal', f"{name[len('cogs.'):]}.py")
+
+    def disabled_in(self, guild_id: int) -> List[str]:
+        """Returns the cogs turned off in a guild, by setting or by the guild blacklist."""
+        if self._version != self._sources():
+            self._rebuild()
+        mask = self._masks.get(guild_id, 0)
+        return sorted(name for name, bit in self._bits.items() if mask >> bit & 1)
+
+    def _serialize(self) -> str:
+        """Returns the settings as JSON."""
+        return json.dumps({str(guild_id): sorted(names) for guild_id, names in self.disabled.items()}, indent=4)
+
+    def flush(self) -> None:
+        """Saves any pending change now, used on shutdown."""
+        self.saver.flush()
+
+    def check(self, ctx: commands.Context) -> bool:
+        """A global command check that rejects commands from cogs turned off in the guild."""
+        if ctx.command is not None and not self.is_enabled(ctx.guild.id if ctx.guild else None, ctx.command.module):
+            raise CogDisabled(ctx.command.module)
+        return True
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Answers and rejects application commands from cogs turned off in the guild."""
+        if interaction.type is not discord.InteractionType.application_command or not self.has_disabled(interaction.guild_id):
+            return True
+        command = interaction.command
+        if command is None or self.is_enabled(interaction.guild_id, command.module):
+            return True
+        await interaction.response.send_message(str(CogDisabled(command.module)), ephemeral=True)  # type: ignore
+        return False
+
+
+def event_guild_id(args: Iterable[Any]) -> Optional[int]:
+    """
+    Returns the ID of the guild an event came from, looking at its first argument.
+
+    Covers guilds, raw event payloads and anything with a `guild`, such as messages,
+    members, roles and channels.
+    """
+    for arg in args:
+        if isinstance(arg, discord.Guild):
+            return arg.id
+        guild_id = getattr(arg, 'guild_id', None)
+        if guild_id is not None:
+            return guild_id
+        guild = getattr(arg, 'guild', None)
+        return guild.id if guild is not None else None
+    return None
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from utils.yobot_exceptions import HTTPException
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+PRIVATE_HEADERS = {'authorization', 'proxy-authorization', 'cookie'}
+BODY_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'content-range'}  # Describe the 304's own empty body.
+
+
+class YoBotResponse():
+    """
+    A fully read HTTP response.
+
+    Attributes:
+        status (int): The status code.
+        headers (CIMultiDictProxy): The response headers.
+        body (bytes): The response body.
+        url (str): The final URL.
+        from_cache (bool): Whether this came from the cache without a request.
+    """
+
+    def __init__(self, status: int, headers: CIMultiDictProxy, body: bytes, url: str, from_cache: bool = False):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+        self.from_cache = from_cache
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        return self.body.decode(encoding, errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class YoBotHostStats():
+    """Request counts and recent latencies for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+        self.latencies: Deque[float] = deque(maxlen=256)
+
+    def percentile(self, pct: float) -> float:
+        """Returns a latency percentile in seconds over the recent requests."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class YoBotHTTP():
+    """
+    A shared HTTP client for YoBot and its cogs.
+
+    One aiohttp session keeps connections alive and caches DNS lookups, with limits on
+    connections overall and per host. GET responses can be cached for a number of seconds,
+    in an LRU of a fixed size, keyed by the URL and request headers. Requests with credentials
+    are never cached, nor are responses marked `no-store` or `private`, and `max-age` and
+    `no-cache` shorten how long a response is reused. Stale entries with an ETag or
+    Last-Modified header are checked with a conditional request, and a 304 reuses the cached
+    body with the 304's headers, which decide how long it is reused from then on. Latencies are kept per host.
+    The session is opened on the first request and closed on shutdown.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `http` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        config = config or {}
+        self.yobot = yobot
+        self.limit = config.get('limit', 100)
+        self.limit_per_host = config.get('limit_per_host', 10)
+        self.dns_ttl = config.get('dns_ttl', 300)
+        self.timeout = config.get('timeout', 30.0)
+        self.cache_size = config.get('cache_size', 256)
+        self.hosts: Dict[str, YoBotHostStats] = {}
+        self._cache: 'OrderedDict[str, Tuple[float, YoBotResponse]]' = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session, opened on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.dns_ttl, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                  headers={'User-Agent': 'YoBot'})
+        return self._session
+
+    async def request(self, method: str, url: str, *, ttl: Optional[float] = None, **kwargs: Any) -> YoBotResponse:
+        """
+        Makes a request and reads the whole response.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            ttl (float): For GET requests, how many seconds a response can be reused without
+                asking the server again, at most its `max-age`. None or 0 means no caching.
+                Requests sending credentials are never cached.
+            **kwargs: Passed on to `aiohttp.ClientSession.request`, such as `params` or `json`.
+
+        Returns:
+            YoBotResponse: The response.
+        """
+        full_url = URL(url).update_query(kwargs.pop('params')) if kwargs.get('params') else URL(url)
+        stats = self.hosts.setdefault(full_url.host or '', YoBotHostStats())
+        request_headers = CIMultiDict(kwargs['headers']) if kwargs.get('headers') else None
+        cacheable = bool(method == 'GET' and ttl and not sends_credentials(request_headers, kwargs))
+        key = cache_key(full_url, request_headers)
+        cached = self._cache.get(key) if cacheable else None
+        if cached is not None:
+            self._cache.move_to_end(key)
+            expires, response = cached
+            if time.monotonic() < expires:
+                stats.cache_hits += 1
+                return YoBotResponse(response.status, response.headers, response.body, response.url, from_cache=True)
+            headers = CIMultiDict(request_headers or {})
+            if 'ETag' in response.headers:
+                headers['If-None-Match'] = response.headers['ETag']
+            if 'Last-Modified' in response.headers:
+                headers['If-Modified-Since'] = response.headers['Last-Modified']
+            kwargs['headers'] = headers
+
+        stats.requests += 1
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, full_url, **kwargs) as raw:
+                body = await raw.read()
+                response = YoBotResponse(raw.status, raw.headers, body, str(raw.url))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats.errors += 1
+            raise
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+        if response.status >= 500:
+            stats.errors += 1
+
+        if cacheable:
+            if response.status == 304 and cached is not None:
+                stats.revalidated += 1
+                response = revalidated(cached[1], response)
+            lifetime = cache_lifetime(response, ttl) if response.status == 200 else None
+            if lifetime is None:
+                self._cache.pop(key, None)
+            else:
+                self._cache[key] = (time.monotonic() + lifetime, response)
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return response
+
+    async def get(self, url: str, *, ttl: Optional[float] = None, **kwargs: Any) -> YoBotResponse:
+        """Makes a GET request, see `request`."""
+        return await self.request('GET', url, ttl=ttl, **kwargs)
+
+    async def get_text(self, url: str, *, ttl: Optional[float] = None, **kwargs: Any) -> str:
+        """Returns the body of a successful GET request as text, raising for error statuses."""
+        response = await self.get(url, ttl=ttl, **kwargs)
+        if not response.ok:
+            raise HTTPException(url, response.status)
+        return response.text()
+
+    async def get_json(self, url: str, *, ttl: Optional[float] = None, **kwargs: Any) -> Any:
+        """Returns the body of a successful GET request as JSON, raising for error statuses."""
+        return json.loads(await self.get_text(url, ttl=ttl, **kwargs))
+
+    def stats(self) -> Dict[str, dict]:
+        """Returns the counters and latency percentiles, in milliseconds, of each host."""
+        return {host: {'requests': stats.requests, 'errors': stats.errors, 'cache_hits': stats.cache_hits,
+                       'revalidated': stats.revalidated, 'p50': stats.percentile(50) * 1000, 'p95': stats.percentile(95) * 1000}
+                for host, stats in self.hosts.items()}
+
+    async def close(self) -> None:
+        """Closes the session and its connections, used on shutdown."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def sends_credentials(headers: Optional[CIMultiDict], kwargs: Dict[str, Any]) -> bool:
+    """Returns whether a request sends credentials, whose responses belong to one caller."""
+    if headers and any(name.lower() in PRIVATE_HEADERS for name in headers):
+        return True
+    return bool(kwargs.get('auth') or kwargs.get('cookies'))
+
+
+def cache_key(url: URL, headers: Optional[CIMultiDict]) -> str:
+    """Returns the cache key of a request, its URL and headers, since headers can change the response."""
+    if not headers:
+        return str(url)
+    return f"{url}\n" + '\n'.join(sorted(f'{name.lower()}: {value}' for name, value in headers.items()))
+
+
+def cache_control(headers: CIMultiDictProxy) -> Dict[str, Optional[str]]:
+    """Returns a response's Cache-Control directives, lower cased, with their values if they have one."""
+    directives: Dict[str, Optional[str]] = {}
+    for directive in headers.get('Cache-Control', '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def revalidated(cached: YoBotResponse, not_modified: YoBotResponse) -> YoBotResponse:
+    """Returns a cached response updated with the headers of the 304 that revalidated it, such as a new Cache-Control or ETag."""
+    updates = [(name, value) for name, value in not_modified.headers.items() if name.lower() not in BODY_HEADERS]
+    headers = CIMultiDict(cached.headers)
+    for name, _ in updates:
+        headers.popall(name, None)
+    headers.extend(updates)
+    return YoBotResponse(cached.status, CIMultiDictProxy(headers), cached.body, cached.url)
+
+
+def cache_lifetime(response: YoBotResponse, ttl: float) -> Optional[float]:
+    """
+    Returns how many seconds a response can be reused for, or None if it must not be cached.
+
+    A response that can't be reused without checking is still kept if it has an ETag or
+    Last-Modified header to check it with.
+    """
+    directives = cache_control(response.headers)
+    if 'no-store' in directives or 'private' in directives:
+        return None
+    lifetime = ttl
+    if 'no-cache' in directives:
+        lifetime = 0.0
+    elif 'max-age' in directives:
+        try:
+            lifetime = min(ttl, max(0.0, float(directives['max-age'] or 0)))
+        except ValueError:
+            lifetime = 0.0
+    if lifetime <= 0 and 'ETag' not in response.headers and 'Last-Modified' not in response.headers:
+        return None
+    return lifetime
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotJsonFile():
+    """
+    Saves a JSON file from a worker thread, a short while after the last change.
+
+    Bursts of changes are saved once. Each save writes a temporary file and replaces the real
+    one, so it is never half written. Saves run one at a time on a single thread, so they land
+    in the order they were made, and `flush` waits for a save that is already running.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the JSON file.
+        serialize (Callable): Returns the current contents as JSON, called on the event loop.
+        description (str): What the file holds, for error messages.
+        save_delay (float): The number of seconds to wait for more changes before saving.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str, serialize: Callable[[], str], description: str, save_delay: float = 1.0):
+        self.yobot = yobot
+        self.file = file
+        self.serialize = serialize
+        self.description = description
+        self.save_delay = save_delay
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._saving: Optional[Future] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def schedule(self) -> None:
+        """Saves after the save delay, restarting the delay if a save is already pending."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.write(self.serialize())  # Nothing would run a timer, so save now.
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+        self._save_handle = loop.call_later(self.save_delay, self._save_in_background)
+
+    def _save_in_background(self) -> None:
+        """Writes a copy of the current contents from the worker thread."""
+        self._save_handle = None
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(1, thread_name_prefix='yobot-jsonfile')
+        self._saving = self._writer.submit(self.write, self.serialize())
+        self._saving.add_done_callback(self._saved)
+
+    def _saved(self, future: Future) -> None:
+        """Reports a failed background save."""
+        if future.exception() is not None:
+            self.yobot.log.error(f'Error saving {self.description} to {self.file}: {future.exception()}')
+
+    def write(self, data: str) -> None:
+        """Replaces the file, writing to a temporary file first so it is never half written."""
+        os.makedirs(os.path.dirname(self.file) or '.', exist_ok=True)
+        temporary = f'{self.file}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(temporary, self.file)
+
+    def flush(self) -> None:
+        """Saves any pending change now, after any save already running, used on shutdown."""
+        if self._saving is not None:
+            wait([self._saving])  # A failed save was already reported by `_saved`.
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            self.write(self.serialize())
@@ -0,0 +1,267 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands, tasks
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+    from utils.yobot_scheduler import YoBotJob
+
+
+def _key(payload: dict) -> Tuple[str, int]:
+    """Returns the name and type identifying an application command payload or interaction."""
+    return payload.get('name'), payload.get('type', 1)  # type: ignore
+
+
+class YoBotLazyCogs():
+    """
+    Loads cogs on first use instead of at startup.
+
+    Each lazy cog has a manifest of its prefix commands, listeners and application commands,
+    captured the one time it is imported after its file changes and kept in the cog index. At startup only
+    light stubs are registered from the manifest: a prefix command stub or listener stub
+    imports the real cog and hands the invocation over to it, and application command
+    interactions load their cog before the tree looks the command up. Cogs that go unused
+    for longer than the idle TTL are unloaded and replaced by their stubs again. Cogs that
+    work in the background, with scheduler jobs, message triggers or task loops, are loaded
+    at startup and never unloaded, since nothing would load them again.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `lazy_cogs` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict]):
+        config = config or {}
+        self.yobot = yobot
+        self.enabled = bool(config.get('enabled', False))
+        self.idle_ttl = float(config.get('idle_ttl', 3600))
+        self.eager = set(config.get('eager') or [])
+        self.manifests: Dict[str, dict] = {}
+        self.last_used: Dict[str, float] = {}
+        self._stubs: Dict[str, List[Tuple[str, Any]]] = {}
+        self._app_commands: Dict[Tuple[str, int], str] = {}
+        self._events: Dict[str, List[str]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._sweeper: Optional['YoBotJob'] = None
+
+    def is_lazy(self, filename: str) -> bool:
+        """Returns whether a cog file is loaded lazily."""
+        return self.enabled and filename not in self.eager
+
+    async def add(self, name: str, entry: dict) -> None:
+        """
+        Registers a lazy cog's stubs, importing it first if its manifest is missing.
+
+        Args:
+            name (str): The extension name, `cogs.<file>`.
+            entry (dict): The cog's entry in the cog index, which drops the manifest when the file changes.
+        """
+        if name in self.yobot.extensions:
+            return
+        manifest = entry.get('manifest')
+        if manifest is None or 'background' not in manifest:  # Manifests from before background cogs were noted.
+            self.remove_stubs(name)
+            await self.capture(name, entry)  # Stays loaded until it goes idle.
+            return
+        if self.manifests.get(name) is not manifest:
+            self.remove_stubs(name)
+            self._register(name, manifest)
+        if manifest.get('background'):
+            await self.yobot.load_extension(name)
+            self.yobot.log.debug(f'Loaded - [ {name} ] (works in the background)')
+            return
+        if name not in self._stubs:
+            self.add_stubs(name)
+
+    def prune(self) -> None:
+        """Removes the stubs of deferred cogs whose file is gone from the cog index."""
+        for name in list(self._stubs):
+            if f"{name[len('cogs.'):]}.py" not in self.yobot.cog_index.entries:
+                self.remove_stubs(name)
+                self._forget(name)
+                self.last_used.pop(name, None)
+                self.yobot.log.debug(f'Removed stubs - [ {name} ] (file removed)')
+
+    def _register(self, name: str, manifest: dict) -> None:
+        """Adds a manifest and its application commands and events to the lookups."""
+        self._forget(name)
+        self.manifests[name] = manifest
+        for payload in manifest['app_commands']:
+            self._app_commands[_key(payload)] = name
+        for event in manifest['listeners']:
+            self._events.setdefault(event, []).append(name)
+
+    def _forget(self, name: str) -> None:
+        """Removes a manifest from the lookups."""
+        manifest = self.manifests.pop(name, None)
+        if manifest is None:
+            return
+        for payload in manifest['app_commands']:
+            self._app_commands.pop(_key(payload), None)
+        for event in manifest['listeners']:
+            self._events[event].remove(name)
+
+    async def capture(self, name: str, entry: dict) -> None:
+        """Imports a cog and records what it registers in its cog index entry."""
+        await self.yobot.load_extension(name)
+        self.record(name, entry)
+
+    def record(self, name: str, entry: dict) -> None:
+        """
+        Records what a loaded cog registers in its cog index entry, replacing any older manifest.
+
+        Args:
+            name (str): The extension name.
+            entry (dict): The cog's entry in the cog index.
+        """
+        cogs = [cog for cog in self.yobot.cogs.values() if cog.__module__ == name]
+        prefix_commands = [[command.name, list(command.aliases), command.short_doc]
+                           for cog in cogs for command in cog.get_commands()]
+        listeners = sorted({event for cog in cogs for event, _ in cog.get_listeners()})
+        app_commands = [command.to_dict() for command in self.yobot.tree.get_commands() if command.module == name]
+        entry['manifest'] = {
+            'commands': prefix_commands,
+            'listeners': listeners,
+            'app_commands': app_commands,
+            'background': self._works_in_background(name, cogs),
+        }
+        self.yobot.cog_index.save()
+        self._register(name, entry['manifest'])
+        self.touch(name)
+        self.yobot.log.debug(f'Captured manifest for [ {name} ]')
+
+    def _works_in_background(self, name: str, cogs: List[commands.Cog]) -> bool:
+        """Returns whether a loaded cog has scheduler jobs, message triggers or task loops, which no stub can stand in for."""
+        def owns(module: Optional[str]) -> bool:
+            return bool(module) and (module == name or module.startswith(f'{name}.'))  # type: ignore
+
+        if any(owns(job.module) for job in self.yobot.scheduler.jobs):
+            return True
+        if any(owns(subscription.module) for subscription in self.yobot.triggers.subscriptions.values()):
+            return True
+        return any(isinstance(value, tasks.Loop) for cog in cogs
+                   for cls in type(cog).__mro__ for value in vars(cls).values())
+
+    def add_stubs(self, name: str) -> None:
+        """Registers the stubs that stand in for an unloaded cog."""
+        manifest = self.manifests[name]
+        stubs = self._stubs[name] = []
+        for command_name, aliases, short_doc in manifest['commands']:
+            stub = commands.Command(self._command_stub(name), name=command_name, aliases=aliases, help=short_doc)
+            self.yobot.add_command(stub)
+            stubs.append(('command', command_name))
+        for event in manifest['listeners']:
+            listener = self._listener_stub(name, event)
+            self.yobot.add_listener(listener, event)
+            stubs.append(('listener', (listener, event)))
+        self.yobot.log.debug(f'Deferred - [ {name} ]')
+
+    def remove_stubs(self, name: str) -> None:
+        """Removes a cog's stubs before the real cog is loaded."""
+        for kind, stub in self._stubs.pop(name, []):
+            if kind == 'command':
+                self.yobot.remove_command(stub)
+            else:
+                self.yobot.remove_listener(*stub)
+
+    def _command_stub(self, name: str) -> Callable:
+        """Returns a prefix command callback that loads the cog and runs the real command."""
+        async def stub(ctx: commands.Context) -> None:
+            await self.load(name)
+            real_ctx = await self.yobot.get_context(ctx.message)
+            if real_ctx.command is not None and real_ctx.command.module == name:
+                await self.yobot.invoke(real_ctx)
+        stub.__module__ = name  # Per-guild cog settings apply to the stub as to the real command.
+        return stub
+
+    def _listener_stub(self, name: str, event: str) -> Callable:
+        """Returns a listener that loads the cog and passes the event on to its real listeners."""
+        async def stub(*args: Any, **kwargs: Any) -> None:
+            await self.load(name)
+            for cog in [cog for cog in self.yobot.cogs.values() if cog.__module__ == name]:
+                for listener_event, listener in cog.get_listeners():
+                    if listener_event == event:
+                        await listener(*args, **kwargs)
+        stub.__module__ = name
+        return stub
+
+    async def load(self, name: str) -> None:
+        """
+        Imports a lazy cog if it is not loaded yet.
+
+        Args:
+            name (str): The extension name.
+        """
+        self.touch(name)
+        if name in self.yobot.extensions:
+            return
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name in self.yobot.extensions:
+                return
+            started = time.perf_counter()
+            self.remove_stubs(name)
+            try:
+                await self.yobot.load_extension(name)
+            except Exception:
+                self.add_stubs(name)
+                raise
+            self.yobot.log.debug(f'Loaded on first use - [ {name} ] in {(time.perf_counter() - started) * 1000:.1f}ms')
+
+    async def load_all(self) -> None:
+        """Loads every deferred cog, so the full command tree is registered."""
+        for name in list(self._stubs):
+            await self.load(name)
+
+    async def prepare_interaction(self, interaction: discord.Interaction) -> None:
+        """Loads the cog behind an application command interaction before the tree handles it."""
+        data = interaction.data or {}
+        name = self._app_commands.get(_key(data))  # type: ignore
+        if name is not None:
+            await self.load(name)
+
+    def touch(self, name: str) -> None:
+        """Marks a lazy cog as used now."""
+        if name in self.manifests:
+            self.last_used[name] = time.monotonic()
+
+    def touch_event(self, event_name: str) -> None:
+        """Marks the loaded lazy cogs listening to a dispatched event as used."""
+        names = self._events.get(f'on_{event_name}')
+        if names:
+            now = time.monotonic()
+            for name in names:
+                self.last_used[name] = now
+
+    def unloaded_app_commands(self) -> List[dict]:
+        """Returns the application command payloads of deferred cogs."""
+        return [payload for name in self._stubs for payload in self.manifests[name]['app_commands']]
+
+    def start(self) -> None:
+        """Starts unloading idle cogs in the background."""
+        if self.enabled and self._sweeper is None:
+            self._sweeper = self.yobot.scheduler.every(min(self.idle_ttl / 2, 60), self._sweep, name='lazy cogs idle sweep')
+
+    def stop(self) -> None:
+        """Stops unloading idle cogs."""
+        if self._sweeper is not None:
+            self.yobot.scheduler.cancel(self._sweeper)
+            self._sweeper = None
+
+    async def _sweep(self) -> None:
+        """Unloads lazy cogs that have been idle for longer than the idle TTL."""
+        now = time.monotonic()
+        for name, used in list(self.last_used.items()):
+            if now - used < self.idle_ttl or name not in self.yobot.extensions or name not in self.manifests:
+                continue
+            if self.manifests[name].get('background'):
+                continue
+            try:
+                await self.yobot.unload_extension(name)
+                self.add_stubs(name)
+                self.yobot.log.debug(f'Unloaded idle cog - [ {name} ]')
+            except Exception as e:
+                self.yobot.log.error(f'Error unloading idle cog {name}: {e}')
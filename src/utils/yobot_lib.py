@@ -1,14 +1,8 @@
-import csv
 import os
-import shutil
-import subprocess
-import tempfile
 import traceback
 from typing import TYPE_CHECKING
 
 import discord
-import requests
-import yaml
 
 if TYPE_CHECKING:
     from bot.yobot import YoBot
@@ -70,9 +64,8 @@ async def update_with_discord(yobot: 'YoBot') -> None:
             'You may also manually set these attributes with the terminal.')
 
         try:  # Try to update the bot's name, presence, and avatar on the Discord servers.
-            with open(yobot.avatar_file, 'rb') as f:
-                new_avatar = f.read()
-                await yobot.user.edit(avatar=new_avatar)
+            new_avatar = await yobot.run_blocking(read_file, yobot.avatar_file)
+            await yobot.user.edit(avatar=new_avatar)
             await yobot.user.edit(username=yobot.config_file.get('bot_name'))
             await yobot.change_presence(activity=discord.Game(name=yobot.presence))
         except Exception as e:
@@ -87,9 +80,9 @@ async def update_with_discord(yobot: 'YoBot') -> None:
         if successful == True:
             yobot.log.debug(
                 'Successfully synchronized YoBot settings with Discord.')
-            yobot.config_file.load()
+            await yobot.run_blocking(yobot.config_file.load)
             yobot.config_file.set('update_bot', False)
-            yobot.config_file.save()
+            await yobot.run_blocking(yobot.config_file.save)
     else:
         yobot.log.info('YoBot settings are up to date.')
         yobot.log.info('Connected to Discord.')
@@ -121,7 +114,35 @@ def get_boolean_input(yobot: 'YoBot', prompt: str) -> bool:
             yobot.log.error(f'Error occurred while getting boolean input: {e}')
             yobot.log.debug(f'Error details: {traceback.format_exc()}')
             yobot.log.warning('Invalid input. Try again.')
-            
+
+
+async def ask_boolean(yobot: 'YoBot', prompt: str) -> bool:
+    """
+    Returns a boolean input, read in a thread so YoBot keeps running while it waits.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        prompt (str): The prompt to display.
+    """
+    return await yobot.run_blocking(get_boolean_input, yobot, prompt, timeout=0)
+
+
+async def ask(yobot: 'YoBot', prompt: str) -> str:
+    """
+    Returns a line of input, read in a thread so YoBot keeps running while it waits.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        prompt (str): The prompt to display.
+    """
+    return await yobot.run_blocking(input, prompt, timeout=0)
+
+
+def read_file(path: str) -> bytes:
+    """Returns the contents of a file, for reading files through `run_blocking`."""
+    with open(path, 'rb') as f:
+        return f.read()
+
 
 def download_cogs(yobot: 'YoBot', owner: str, repo: str, file_name: str) -> list:
     """
@@ -139,38 +160,11 @@ def download_cogs(yobot: 'YoBot', owner: str, repo: str, file_name: str) -> list
     getcogs = get_boolean_input(yobot, 'Would you like to download extra extensions? (y/n) ')
     if getcogs == True:
         try:
-            url = f"https://raw.githubusercontent.com/{owner}/{repo}/master/{file_name}"
-            response = requests.get(url)
+            import requests  # Only needed on first run, and slow to import.
+            response = requests.get(cog_list_url(owner, repo, file_name))
 
             if response.status_code == 200:
-                yobot.log.debug(f'{file_name} fetched.')
-                csv_contents = response.text.splitlines()
-                csv_reader = csv.reader(csv_contents)
-                headers = next(csv_reader)
-                rows = list(csv_reader)
-                yobot.log.debug(f'Loaded file {file_name}:')
-                yobot.log.info(f"{headers[0]} | {headers[1]} | {headers[2]}")
-                
-                for i, row in enumerate(rows):
-                    yobot.log.info(f"{i+1}: {row[0]}, {row[1]} Author: {row[2]}")
-                row_num = input("Enter the row number of the extension to install: ")
-                try:
-                    row_num = int(row_num)
-                    if row_num < 1 or row_num > len(rows):
-                        raise ValueError
-                except ValueError:
-                    yobot.log.error("Invalid row number.")
-                    return []
-                link = rows[row_num-1][headers.index("Repo")]
-                extension_name = link.split("/")[-1]
-                try:
-                    yobot.log.info(f"Downloading {extension_name}...")
-                    github_clone_repo(yobot, link, yobot.cogs_dir)
-                except Exception as e:
-                    yobot.log.error(f"Error downloading {extension_name}: {e}")
-                    return []
-                yobot.log.info(f"{extension_name} download successful.")
-                return rows
+                return install_cog_from_list(yobot, file_name, response.text)
             else:
                 yobot.log.error(
                     f'Error fetching {file_name}. Status code: {response.status_code}')
@@ -182,7 +176,86 @@ def download_cogs(yobot: 'YoBot', owner: str, repo: str, file_name: str) -> list
     else:
         yobot.log.info("Skipping extra extensions.")
         yobot.log.info("If you would like to install extra extensions, run the command 'getcogs'.")
-            
+
+
+async def download_cogs_async(yobot: 'YoBot', owner: str, repo: str, file_name: str) -> list:
+    """
+    Fetches a CSV file from a GitHub repository through YoBot's shared HTTP client, once YoBot is running.
+
+    The list is cached for a few minutes and revalidated with its ETag after that.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        owner (str): The owner of the repo.
+        repo (str): The name of the repo.
+        file_name (str): The name of the file to fetch.
+
+    Returns:
+        list: The contents of the CSV file.
+    """
+    getcogs = await ask_boolean(yobot, 'Would you like to download extra extensions? (y/n) ')
+    if getcogs == True:
+        try:
+            csv_text = await yobot.web.get_text(cog_list_url(owner, repo, file_name), ttl=300)
+            # Asks which cog to install and clones it, both blocking, so the whole step runs in a thread.
+            return await yobot.run_blocking(install_cog_from_list, yobot, file_name, csv_text, timeout=0)
+        except Exception as e:
+            yobot.log.error(f'Error fetching {file_name}: {e}')
+            yobot.log.debug(f'Error details: {traceback.format_exc()}')
+            return []
+    else:
+        yobot.log.info("Skipping extra extensions.")
+        return []
+
+
+def cog_list_url(owner: str, repo: str, file_name: str) -> str:
+    """Returns the raw GitHub URL of the cog list."""
+    return f"https://raw.githubusercontent.com/{owner}/{repo}/master/{file_name}"
+
+
+def install_cog_from_list(yobot: 'YoBot', file_name: str, csv_text: str) -> list:
+    """
+    Shows the cog list, asks which cog to install and clones it into the cogs directory.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file_name (str): The name of the cog list file.
+        csv_text (str): The contents of the cog list.
+
+    Returns:
+        list: The rows of the cog list, or an empty list if nothing was installed.
+    """
+    import csv
+
+    yobot.log.debug(f'{file_name} fetched.')
+    csv_contents = csv_text.splitlines()
+    csv_reader = csv.reader(csv_contents)
+    headers = next(csv_reader)
+    rows = list(csv_reader)
+    yobot.log.debug(f'Loaded file {file_name}:')
+    yobot.log.info(f"{headers[0]} | {headers[1]} | {headers[2]}")
+
+    for i, row in enumerate(rows):
+        yobot.log.info(f"{i+1}: {row[0]}, {row[1]} Author: {row[2]}")
+    row_num = input("Enter the row number of the extension to install: ")
+    try:
+        row_num = int(row_num)
+        if row_num < 1 or row_num > len(rows):
+            raise ValueError
+    except ValueError:
+        yobot.log.error("Invalid row number.")
+        return []
+    link = rows[row_num-1][headers.index("Repo")]
+    extension_name = link.split("/")[-1]
+    try:
+        yobot.log.info(f"Downloading {extension_name}...")
+        github_clone_repo(yobot, link, yobot.cogs_dir)
+    except Exception as e:
+        yobot.log.error(f"Error downloading {extension_name}: {e}")
+        return []
+    yobot.log.info(f"{extension_name} download successful.")
+    return rows
+
 
 def github_clone_repo(yobot: 'YoBot', repo: str, target_dir: str):
     """
@@ -193,6 +266,10 @@ def github_clone_repo(yobot: 'YoBot', repo: str, target_dir: str):
         repo (str): The GitHub repository to clone.
         target_dir (str): The directory to clone the repository to.
     """
+    import shutil
+    import subprocess
+    import tempfile
+
     try:
         yobot.log.debug(f"Cloning {repo} to {target_dir}...")
         
@@ -0,0 +1,270 @@
+import asyncio
+import collections
+import contextlib
+import functools
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, Hashable, List, Optional, Sequence
+
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+SCOPES = ('user', 'guild', 'global')
+
+
+class CommandRateLimited(commands.CheckFailure):
+    """
+    Raised when a command is rejected by the limiter.
+
+    Args:
+        scope (str): The scope that rejected the command, a bucket scope or 'concurrency'.
+        retry_after (float): The number of seconds until the command would be accepted.
+    """
+
+    def __init__(self, scope: str, retry_after: float):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f'Rate limited by the {scope} limit, try again in {retry_after:.1f}s.')
+
+
+class TokenBucket():
+    """
+    A set of token buckets sharing a rate, one per key.
+
+    Each bucket is stored as a single float, the time it will be full again (the generic cell
+    rate algorithm), so a bucket holds `rate` tokens and refills one every `per / rate` seconds.
+    Buckets that have refilled are the same as missing ones and are swept away.
+
+    Args:
+        rate (int): The number of tokens a bucket holds.
+        per (float): The number of seconds a full bucket takes to refill.
+    """
+
+    __slots__ = ('rate', 'per', 'interval', 'buckets', '_swept')
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.interval = per / rate
+        self.buckets: Dict[Hashable, float] = {}
+        self._swept = time.monotonic()
+
+    def retry_after(self, key: Hashable, now: float, cost: int = 1) -> float:
+        """Returns how long until a key can spend its cost, 0 if it can now."""
+        full_at = max(self.buckets.get(key, now), now) + self.interval * cost
+        return max(0.0, full_at - now - self.per)
+
+    def spend(self, key: Hashable, now: float, cost: int = 1) -> None:
+        """Spends a key's tokens, the caller checks `retry_after` first."""
+        self.buckets[key] = max(self.buckets.get(key, now), now) + self.interval * cost
+        if now - self._swept > self.per:
+            self.sweep(now)
+
+    def sweep(self, now: float) -> None:
+        """Drops buckets that have refilled."""
+        self._swept = now
+        for key in [key for key, full_at in self.buckets.items() if full_at <= now]:
+            del self.buckets[key]
+
+
+class Slots():
+    """
+    A semaphore whose limit can change while slots are held.
+
+    Lowering the limit lets running holders finish, and new ones wait until fewer than the
+    new limit are held. Raising it wakes waiters straight away.
+
+    Args:
+        limit (int): The number of slots.
+    """
+
+    __slots__ = ('limit', 'used', '_waiters')
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+
+    async def acquire(self) -> None:
+        """Takes a slot, waiting in order for one to be free."""
+        if self.used < self.limit and not self._waiters:
+            self.used += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Given a slot just as it was cancelled.
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Gives a slot back."""
+        self.used -= 1
+        self._wake()
+
+    def resize(self, limit: int) -> None:
+        """Changes the number of slots, keeping the ones held."""
+        self.limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hands free slots to the oldest waiters."""
+        while self._waiters and self.used < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.used += 1
+                waiter.set_result(None)
+
+
+class YoBotLimiter():
+    """
+    Shared command limits for YoBot.
+
+    Commands that opt in with `limited` spend tokens from per-user, per-guild and global
+    buckets, and run in a bounded number of concurrent slots. Each guild can only hold a
+    share of the slots, so a busy guild queues behind itself rather than in front of others.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `limiter` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        self.yobot = yobot
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.accepted = 0
+        self.rejections = collections.Counter()
+        self.running = 0
+        self._slots: Optional[Slots] = None
+        self._guild_slots: Dict[Hashable, List[Any]] = {}
+        self.configure(config)
+
+    def configure(self, config: Optional[dict]) -> None:
+        """
+        Sets the rates and concurrency caps, keeping the buckets' tokens and the slots held.
+
+        Args:
+            config (dict): The `limiter` config section.
+        """
+        config = config or {}
+        for scope, default in zip(SCOPES, [(5, 10.0), (30, 10.0), (100, 1.0)]):
+            limit = config.get(scope, {}) or {}
+            rate, per = int(limit.get('rate', default[0])), float(limit.get('per', default[1]))
+            bucket = self.buckets.get(scope)
+            if bucket is None:
+                self.buckets[scope] = TokenBucket(rate, per)
+            else:
+                bucket.rate, bucket.per, bucket.interval = rate, per, per / rate
+        self.max_concurrency = int(config.get('max_concurrency', 50))
+        self.guild_concurrency = int(config.get('guild_concurrency', 5))
+        self.queue_timeout = float(config.get('queue_timeout', 5.0))
+        if self._slots is not None:
+            self._slots.resize(self.max_concurrency)
+        for guild_slots in self._guild_slots.values():
+            guild_slots[0].resize(self.guild_concurrency)
+
+    def check(self, ctx: commands.Context, scopes: Sequence[str] = SCOPES, cost: int = 1) -> None:
+        """
+        Spends a command's tokens, or raises if any of its buckets is empty.
+
+        Tokens are only spent when every bucket can afford them.
+
+        Args:
+            ctx (Context): The command's context.
+            scopes (list): The bucket scopes to spend from.
+            cost (int): The number of tokens to spend.
+        """
+        now = time.monotonic()
+        keys = {'user': ctx.author.id, 'guild': ctx.guild.id if ctx.guild else None, 'global': 0}
+        spending = [(scope, self.buckets[scope], keys[scope]) for scope in scopes if keys[scope] is not None]
+        for scope, bucket, key in spending:
+            retry_after = bucket.retry_after(key, now, cost)
+            if retry_after:
+                self.rejections[scope] += 1
+                raise CommandRateLimited(scope, retry_after)
+        for _, bucket, key in spending:
+            bucket.spend(key, now, cost)
+        self.accepted += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, guild_id: Optional[int]) -> AsyncIterator[None]:
+        """
+        Holds one of the guild's and one of the global concurrent slots.
+
+        Args:
+            guild_id (int): The guild's ID, or None for direct messages.
+        """
+        if self._slots is None:
+            self._slots = Slots(self.max_concurrency)
+        guild_slots = self._guild_slots.get(guild_id)
+        if guild_slots is None:
+            guild_slots = self._guild_slots[guild_id] = [Slots(self.guild_concurrency), 0]
+        guild_slots[1] += 1
+        try:
+            async with self._acquire(guild_slots[0]), self._acquire(self._slots):
+                self.running += 1
+                try:
+                    yield
+                finally:
+                    self.running -= 1
+        finally:
+            guild_slots[1] -= 1
+            if not guild_slots[1]:
+                del self._guild_slots[guild_id]
+
+    @contextlib.asynccontextmanager
+    async def _acquire(self, slots: Slots) -> AsyncIterator[None]:
+        """Takes a slot within the queue timeout."""
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejections['concurrency'] += 1
+            raise CommandRateLimited('concurrency', self.queue_timeout)
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        """Returns the limiter's counters and the number of tracked buckets."""
+        return {
+            'accepted': self.accepted,
+            'rejections': dict(self.rejections),
+            'running': self.running,
+            'active_guilds': len(self._guild_slots),
+            'buckets': {scope: len(bucket.buckets) for scope, bucket in self.buckets.items()},
+        }
+
+
+def limited(scopes: Sequence[str] = SCOPES, cost: int = 1, concurrency: bool = True) -> Callable:
+    """
+    Opts a command into the shared limiter, place it under the command decorator.
+
+    Rejected commands raise `CommandRateLimited`, a `CheckFailure`.
+
+    Args:
+        scopes (list): The bucket scopes the command spends from.
+        cost (int): The number of tokens the command spends.
+        concurrency (bool): Whether the command runs in one of the limited concurrent slots.
+    """
+    def predicate(ctx: commands.Context) -> bool:
+        ctx.bot.limiter.check(ctx, scopes, cost)
+        return True
+
+    def decorator(func: Callable) -> Callable:
+        if not concurrency:
+            return commands.check(predicate)(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            ctx = next(arg for arg in args if isinstance(arg, commands.Context))
+            async with ctx.bot.limiter.slot(ctx.guild.id if ctx.guild else None):
+                return await func(*args, **kwargs)
+        return commands.check(predicate)(wrapper)
+
+    return decorator
@@ -1,11 +1,11 @@
 import asyncio
 import logging
 import os
+import queue
 import re
+import threading
 from logging.handlers import RotatingFileHandler
-from typing import TYPE_CHECKING
-
-from utils.yobot_terminal import YoBotTerminalCommands
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from bot.yobot import YoBot
@@ -36,10 +36,15 @@ class YoBotLogger(logging.Logger):
         self.backupCount = backupCount
         self.setup_logger()
 
-    def setup_logger(self):
-        """Sets up the logger."""
+    def setup_logger(self, rotate: bool = True):
+        """
+        Sets up the logger.
+
+        Args:
+            rotate (bool): Whether to move the latest log aside first, as on launch.
+        """
         file_handler = YoBotLoggerRotator(
-            log_file=self.log_file, maxBytes=self.maxBytes, backupCount=self.backupCount)  # Setup the file rotater.
+            log_file=self.log_file, maxBytes=self.maxBytes, backupCount=self.backupCount, rotate=rotate)  # Setup the file rotater.
         # Setup the file formatter.
         file_handler.setFormatter(YoBotLoggerFormat())
         console_handler = logging.StreamHandler()
@@ -52,6 +57,19 @@ class YoBotLogger(logging.Logger):
         self.addHandler(file_handler)  # Add the handlers.
         self.addHandler(console_handler)
 
+    def reload(self, level: str) -> None:
+        """
+        Rebuilds the handlers with a new level, continuing the current log file.
+
+        Args:
+            level (str): The new logging level.
+        """
+        for handler in list(self.handlers):
+            self.removeHandler(handler)
+            handler.close()
+        self.level = level.upper()  # type: ignore
+        self.setup_logger(rotate=False)
+
 
 class YoBotLoggerFormat(logging.Formatter):
     """Provides a custom logging format."""
@@ -98,13 +116,14 @@ class YoBotLoggerRotator(RotatingFileHandler):
         maxBytes (int): The maximum number of bytes before the log file is rotated.
         backupCount (int): The number of log files to keep.
         encoding (str): The encoding to use.
+        rotate (bool): Whether to move the existing log file to old.log first.
     """
 
-    def __init__(self, log_file: str, mode='a', maxBytes=0, backupCount=0, encoding=None):
+    def __init__(self, log_file: str, mode='a', maxBytes=0, backupCount=0, encoding=None, rotate=True):
         """Handles file swap before beginning to write to the log file."""
         self.log_file = log_file
 
-        if os.path.isfile(self.log_file):
+        if rotate and os.path.isfile(self.log_file):
             if os.path.isfile(os.path.join(os.path.dirname(self.log_file), 'old.log')):
                 os.remove(os.path.join(
                     os.path.dirname(self.log_file), 'old.log'))
@@ -131,25 +150,57 @@ class YoBotLoggerRotator(RotatingFileHandler):
 async def terminal_command_loop(yobot: 'YoBot'):
     """The main YoBotLogger terminal command loop."""
     loop = asyncio.get_event_loop()
-    delay = 0.25  # The amount of time to wait between each loop.
     # The amount of time to wait for YoBot to finish launching.
     launch_delay = 3.5
     black = YoBotLoggerFormat.black
     purple = YoBotLoggerFormat.purple
     bold = YoBotLoggerFormat.bold
     reset = YoBotLoggerFormat.reset
+    # Input is read in a daemon thread, so a waiting prompt never holds up shutdown.
+    prompts: 'queue.Queue[str]' = queue.Queue()
+    commands: 'asyncio.Queue[Optional[str]]' = asyncio.Queue()
+    threading.Thread(target=read_terminal_input, args=(loop, prompts, commands), name='YoBotTerminal', daemon=True).start()
 
     if yobot.running:
         # Wait for YoBot to finish launching.
         await asyncio.sleep(launch_delay)
 
     while yobot.running:
-        # Prevents the terminal from using too much CPU.
-        await asyncio.sleep(delay)
         terminal_format = f'{black}{bold}[{purple}YoBot{reset}{black}{bold}]{reset} {yobot.owner_name}{bold}{black}@{reset}{yobot.config_file.get("bot_name")}{reset}'
         terminal_prompt = f'{terminal_format}{black}{bold}: > {reset}'
         # Get the terminal command.
-        terminal_command = loop.run_in_executor(None, input, terminal_prompt)
+        prompts.put(terminal_prompt)
+        terminal_command = await commands.get()
+        if terminal_command is None:
+            return yobot.log.debug('Terminal input closed.')
+        from utils.yobot_terminal import YoBotTerminalCommands  # Loaded on the first command, not at startup.
+
         # Handle the terminal command.
-        command_handler = YoBotTerminalCommands(yobot, await terminal_command)
+        command_handler = YoBotTerminalCommands(yobot, terminal_command)
         await command_handler.handle_terminal_command()
+
+
+def read_terminal_input(loop: asyncio.AbstractEventLoop, prompts: 'queue.Queue[str]', commands: 'asyncio.Queue[Optional[str]]'):
+    """
+    Reads terminal commands, one for each prompt the terminal loop asks for.
+
+    Commands read their own confirmations with `input`, so nothing is read until the
+    previous command has finished and the next prompt arrives.
+
+    Args:
+        loop (AbstractEventLoop): The loop the terminal runs on.
+        prompts (Queue): The prompts to show.
+        commands (Queue): The commands read, None once input is closed.
+    """
+    while True:
+        prompt = prompts.get()
+        try:
+            terminal_command = input(prompt)
+        except (EOFError, OSError):
+            terminal_command = None
+        try:
+            loop.call_soon_threadsafe(commands.put_nowait, terminal_command)
+        except RuntimeError:
+            return  # The loop is closed.
+        if terminal_command is None:
+            return
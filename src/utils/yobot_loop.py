@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+# `auto` uses uvloop when it is installed and asyncio's own loop otherwise.
+LOOPS = ('auto', 'asyncio', 'uvloop')
+
+
+def load_uvloop() -> Optional[ModuleType]:
+    """Returns the uvloop module, or None if it is not installed, as on Windows."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop
+
+
+def choose_loop(yobot: 'YoBot', choice: str) -> Optional[ModuleType]:
+    """
+    Returns the uvloop module if the chosen loop is uvloop, or None for asyncio's own loop.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        choice (str): One of `LOOPS`.
+    """
+    if choice not in LOOPS:
+        yobot.log.warning(f"Unknown event loop '{choice}', choose from {', '.join(LOOPS)}. Using asyncio.")
+        return None
+    if choice == 'asyncio':
+        return None
+    uvloop = load_uvloop()
+    if uvloop is None and choice == 'uvloop':
+        yobot.log.warning('uvloop is not installed, using asyncio. Install it with `pip install uvloop`.')
+    return uvloop
+
+
+def configure_loop(yobot: 'YoBot', loop: asyncio.AbstractEventLoop, config: dict) -> None:
+    """
+    Sets the loop's task factory and default executor from the `loop` config section.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        loop (asyncio.AbstractEventLoop): The running loop.
+        config (dict): The `loop` config section.
+    """
+    if config.get('eager_tasks'):
+        eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+        if eager_task_factory is None:
+            yobot.log.warning('Eager tasks need Python 3.12 or newer, running without them.')
+        else:
+            # Tasks start right away and finish without a trip through the loop if they never wait.
+            loop.set_task_factory(eager_task_factory)
+    workers = config.get('executor_workers')
+    if workers:
+        # Used by `run_in_executor(None, ...)`, which discord.py and aiohttp use for DNS and files.
+        loop.set_default_executor(ThreadPoolExecutor(int(workers), thread_name_prefix='yobot-default'))
+
+
+def describe_loop(loop: asyncio.AbstractEventLoop) -> str:
+    """Returns which loop is running and whether it starts tasks eagerly."""
+    name = 'uvloop' if type(loop).__module__.startswith('uvloop') else 'asyncio'
+    eager = loop.get_task_factory() is getattr(asyncio, 'eager_task_factory', object())
+    return f"{name}{', eager tasks' if eager else ''}"
+
+
+def run_loop(yobot: 'YoBot', main: Callable[[], Coroutine], choice: Optional[str] = None) -> Any:
+    """
+    Runs a coroutine to completion on the event loop chosen on the command line or in the config.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        main (Callable): Returns the coroutine to run, such as `yobot.start_bot`.
+        choice (str): The loop chosen on the command line, which wins over the config.
+
+    Returns:
+        Any: What the coroutine returned.
+    """
+    config = yobot.config_file.get('loop') or {}
+    uvloop = choose_loop(yobot, (choice or config.get('policy') or 'auto').lower())
+
+    async def configured() -> Any:
+        loop = asyncio.get_running_loop()
+        configure_loop(yobot, loop, config)
+        yobot.log.info(f'Event loop: {describe_loop(loop)}.')
+        return await main()
+
+    runner = getattr(asyncio, 'Runner', None)
+    if runner is not None:  # Python 3.11 and newer take a loop factory.
+        with runner(loop_factory=uvloop.new_event_loop if uvloop else None) as loop_runner:
+            return loop_runner.run(configured())
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(configured())
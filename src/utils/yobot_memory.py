@@ -0,0 +1,245 @@
+import functools
+import os
+import random
+import sys
+import sysconfig
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import discord
+from discord.state import ConnectionState
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Objects that are cached in their own right, or shared by everything. Sizing stops at these so
+# a message is not charged for its guild, author or channel.
+SHARED_TYPES = (discord.Client, ConnectionState, discord.Guild, discord.abc.GuildChannel, discord.Thread,
+                discord.abc.PrivateChannel, discord.Member, discord.User, discord.ClientUser, discord.Role)
+PRIMITIVE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+class YoBotMemory():
+    """
+    Live memory diagnostics for the bot.
+
+    Wraps `tracemalloc` so allocations can be snapshot and diffed while the bot runs, grouped
+    by the cog or module that made them, and estimates the size of discord.py's caches.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        keep (int): The number of snapshots to keep.
+    """
+
+    def __init__(self, yobot: 'YoBot', keep: int = 5):
+        self.yobot = yobot
+        self.keep = keep
+        self.snapshots: List[Tuple[float, tracemalloc.Snapshot]] = []
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10) -> None:
+        """
+        Starts tracing allocations.
+
+        Args:
+            frames (int): The number of frames kept per allocation, more frames attribute better but cost more.
+        """
+        if not self.tracing:
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stops tracing and drops the snapshots, which cannot be compared with new ones."""
+        tracemalloc.stop()
+        self.snapshots.clear()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Takes a snapshot of the traced allocations.
+
+        Returns:
+            dict: Bytes and block counts by group.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        self.snapshots.append((time.time(), snapshot))
+        del self.snapshots[:-self.keep]
+        return self.group(snapshot)
+
+    def diff(self) -> List[Tuple[str, int, int, int, int]]:
+        """
+        Compares the last two snapshots.
+
+        Returns:
+            list: (group, size change, count change, size, count) tuples, largest growth first.
+        """
+        if len(self.snapshots) < 2:
+            raise ValueError('Two snapshots are needed for a diff.')
+        old = self.group(self.snapshots[-2][1])
+        new = self.group(self.snapshots[-1][1])
+        rows = []
+        for name in old.keys() | new.keys():
+            old_size, old_count = old.get(name, (0, 0))
+            size, count = new.get(name, (0, 0))
+            rows.append((name, size - old_size, count - old_count, size, count))
+        return sorted(rows, key=lambda row: abs(row[1]), reverse=True)
+
+    def group(self, snapshot: tracemalloc.Snapshot) -> Dict[str, Tuple[int, int]]:
+        """
+        Groups a snapshot's allocations by the cog or module that made them.
+
+        Allocations are charged to the innermost cog frame on their traceback, otherwise the
+        innermost frame outside the standard library.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+
+        Returns:
+            dict: Bytes and block counts by group.
+        """
+        groups: Dict[str, List[int]] = {}
+        for stat in snapshot.statistics('traceback'):
+            name = self.owner(frame.filename for frame in reversed(stat.traceback))
+            totals = groups.setdefault(name, [0, 0])
+            totals[0] += stat.size
+            totals[1] += stat.count
+        return {name: (size, count) for name, (size, count) in groups.items()}
+
+    def owner(self, filenames: Iterable[str]) -> str:
+        """Returns the group of a traceback's filenames, given innermost first."""
+        fallback = None
+        for filename in filenames:
+            name = module_group(filename, os.path.abspath(self.yobot.cogs_dir or ''))
+            if name.startswith('cogs.'):
+                return name
+            if fallback is None and name != 'stdlib':
+                fallback = name
+        return fallback or 'stdlib'
+
+    def cache_sizes(self, sample: int = 200) -> Dict[str, Tuple[int, int]]:
+        """
+        Estimates the size of discord.py's caches.
+
+        Each cache is sized from a random sample of its objects, so this stays cheap on big bots.
+
+        Args:
+            sample (int): The number of objects sized per cache.
+
+        Returns:
+            dict: Object counts and approximate bytes by cache.
+        """
+        guilds = self.yobot.guilds
+        caches = {
+            'messages': list(self.yobot.cached_messages),
+            'guilds': guilds,
+            'channels': [channel for guild in guilds for channel in guild.channels],
+            'threads': [thread for guild in guilds for thread in guild.threads],
+            'roles': [role for guild in guilds for role in guild.roles],
+            'members': [member for guild in guilds for member in guild.members],
+            'users': self.yobot.users,
+        }
+        sizes = {}
+        for name, objects in caches.items():
+            picked = random.sample(objects, sample) if len(objects) > sample else objects
+            total = sum(object_size(obj, root=True) for obj in picked)
+            sizes[name] = (len(objects), int(total * len(objects) / len(picked)) if picked else 0)
+        return sizes
+
+    def write_report(self, kind: str, header: Iterable[str], rows: Iterable[Iterable]) -> str:
+        """
+        Writes a tab separated report into the log directory.
+
+        Args:
+            kind (str): The report kind, used in the file name.
+            header (list): The column names.
+            rows (list): The rows.
+
+        Returns:
+            str: The report's path.
+        """
+        log_dir = self.yobot.config_file.get('file_paths.log_dir') or '.'
+        os.makedirs(log_dir, exist_ok=True)
+        file = os.path.join(log_dir, f"memory-{kind}-{time.strftime('%Y%m%d-%H%M%S')}.tsv")
+        with open(file, 'w', encoding='utf-8') as f:
+            f.write('\t'.join(header) + '\n')
+            for row in rows:
+                f.write('\t'.join(str(value) for value in row) + '\n')
+        return file
+
+
+@functools.lru_cache(maxsize=4096)
+def module_group(filename: str, cogs_dir: str) -> str:
+    """
+    Returns the group an allocating file belongs to.
+
+    Cogs are grouped per cog, YoBot per module and installed packages per top level package.
+
+    Args:
+        filename (str): The file's path.
+        cogs_dir (str): The absolute path of the cogs directory.
+
+    Returns:
+        str: The group's name.
+    """
+    path = os.path.abspath(filename)
+    if cogs_dir and path.startswith(cogs_dir + os.sep):
+        return f'cogs.{os.path.splitext(os.path.relpath(path, cogs_dir))[0]}'.replace(os.sep, '.')
+    if path.startswith(SRC_DIR + os.sep):
+        return os.path.splitext(os.path.relpath(path, SRC_DIR))[0].replace(os.sep, '.')
+    paths = sysconfig.get_paths()
+    for site_dir in {paths['purelib'], paths['platlib']}:
+        if path.startswith(site_dir + os.sep):
+            return os.path.relpath(path, site_dir).split(os.sep)[0].split('.')[0]
+    if path.startswith(paths['stdlib'] + os.sep) or filename.startswith('<'):
+        return 'stdlib'
+    return os.path.basename(filename)
+
+
+def object_size(obj: object, root: bool = False, seen: Optional[set] = None) -> int:
+    """
+    Approximates the bytes an object holds on its own, following its slots, attributes and containers.
+
+    Args:
+        obj (object): The object.
+        root (bool): Whether this is the object being sized, which is followed even if it is a shared type.
+        seen (set): The ids already counted.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or (not root and isinstance(obj, SHARED_TYPES)):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, PRIMITIVE_TYPES):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(object_size(key, seen=seen) + object_size(value, seen=seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(object_size(item, seen=seen) for item in obj)
+    if callable(obj) or isinstance(obj, type):
+        return size
+    for cls in type(obj).__mro__:
+        slots = getattr(cls, '__slots__', ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            size += object_size(getattr(obj, slot, None), seen=seen)
+    if hasattr(obj, '__dict__'):
+        size += object_size(vars(obj), seen=seen)
+    return size
+
+
+def format_bytes(size: float) -> str:
+    """Formats a byte count, signed counts keep their sign."""
+    for unit in ['B', 'KiB', 'MiB']:
+        if abs(size) < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GiB'
@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotOffloadStats():
+    """Call counts and recent queue and run times for one cog's offloaded work."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.running = 0
+        self.queue_times: Deque[float] = deque(maxlen=256)
+        self.run_times: Deque[float] = deque(maxlen=256)
+
+    @staticmethod
+    def percentile(values: Deque[float], pct: float) -> float:
+        """Returns a percentile in milliseconds of recent times."""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+class YoBotOffload():
+    """
+    Runs blocking and CPU heavy work off the event loop.
+
+    `run_blocking` uses a thread pool, for blocking I/O such as files, subprocesses and
+    terminal input. `run_cpu` uses a process pool, for CPU heavy work such as image editing or
+    parsing, which would hold the GIL in a thread. Each cog can only have a few calls running
+    at once, so one busy cog can't take every worker, and calls are attributed to the module
+    that made them. Processes are started with `spawn` and warmed up at startup, so the first
+    call doesn't pay for starting them. A timeout stops waiting for a call, but a thread can't
+    be stopped, so its slot is only freed once the call really ends.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `offload` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        config = config or {}
+        self.yobot = yobot
+        self.threads = int(config.get('threads', min(32, (os.cpu_count() or 1) + 4)))
+        self.processes = int(config.get('processes', max(1, min(4, (os.cpu_count() or 1) - 1))))
+        self.per_cog = int(config.get('per_cog', 4))
+        self.timeout = config.get('timeout', 60.0)
+        self.stats: Dict[str, YoBotOffloadStats] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix='yobot-blocking')
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        return self._process_pool
+
+    def run_blocking(self, func: Callable, *args: Any, cog: Optional[str] = None, timeout: Optional[float] = None,
+                     **kwargs: Any) -> Awaitable[Any]:
+        """
+        Runs a blocking function in a thread, await it for the result.
+
+        This is not a coroutine function, so the calling cog is found while its code is still on
+        the stack, even when the call is handed to `asyncio.gather` or `create_task`.
+
+        Args:
+            func (Callable): The function.
+            *args: Its arguments.
+            cog (str): Who the call counts against, the calling module by default.
+            timeout (float): The most seconds to wait, the config's timeout by default and 0 for no limit.
+            **kwargs: Its keyword arguments.
+        """
+        return self._run(self.thread_pool, func, args, kwargs, cog or caller_module(), timeout)
+
+    def run_cpu(self, func: Callable, *args: Any, cog: Optional[str] = None, timeout: Optional[float] = None,
+                **kwargs: Any) -> Awaitable[Any]:
+        """
+        Runs a CPU heavy function in a worker process, await it for the result.
+
+        The function must be defined at the top level of a module, and its arguments and
+        result must be picklable.
+
+        Args:
+            func (Callable): The function.
+            *args: Its arguments.
+            cog (str): Who the call counts against, the calling module by default.
+            timeout (float): The most seconds to wait, the config's timeout by default and 0 for no limit.
+            **kwargs: Its keyword arguments.
+        """
+        return self._run(self.process_pool, func, args, kwargs, cog or caller_module(), timeout)
+
+    async def _run(self, executor: Executor, func: Callable, args: tuple, kwargs: dict, cog: str,
+                   timeout: Optional[float]) -> Any:
+        """Waits for one of a cog's slots, runs a call and records its times."""
+        loop = asyncio.get_running_loop()
+        stats = self.stats.setdefault(cog, YoBotOffloadStats())
+        slots = self._slots.setdefault(cog, asyncio.Semaphore(self.per_cog))
+        stats.calls += 1
+        stats.waiting += 1
+        queued = time.monotonic()
+        try:
+            await slots.acquire()
+        finally:
+            stats.waiting -= 1
+        stats.running += 1
+        try:
+            future = executor.submit(timed, func, args, kwargs)
+        except BaseException:
+            stats.running -= 1
+            slots.release()
+            raise
+        # The slot is freed when the call ends, not when a caller stops waiting for it.
+        future.add_done_callback(functools.partial(self._call_finished, loop, stats, slots))
+        limit = self.timeout if timeout is None else timeout
+        try:
+            started, finished, result = await asyncio.wait_for(asyncio.wrap_future(future), limit or None)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.queue_times.append(max(0.0, started - queued))
+        stats.run_times.append(finished - started)
+        return result
+
+    def _call_finished(self, loop: asyncio.AbstractEventLoop, stats: YoBotOffloadStats, slots: asyncio.Semaphore,
+                       future: Future) -> None:
+        """Hands a finished call back to the loop from the worker, unless the loop is gone after shutdown."""
+        try:
+            loop.call_soon_threadsafe(self._finished, stats, slots)
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    def _finished(stats: YoBotOffloadStats, slots: asyncio.Semaphore) -> None:
+        """Frees a finished call's slot."""
+        stats.running -= 1
+        slots.release()
+
+    async def warm_up(self) -> None:
+        """Starts every worker process and a few threads ahead of the first call."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self.process_pool, os.getpid) for _ in range(self.processes)))
+            await asyncio.gather(*(loop.run_in_executor(self.thread_pool, time.sleep, 0.01) for _ in range(self.per_cog)))
+        except Exception as e:
+            return self.yobot.log.error(f'Error warming up offload workers: {e}')
+        self.yobot.log.debug(f'Offload workers ready in {(time.perf_counter() - started) * 1000:.1f}ms.')
+
+    def shutdown(self) -> None:
+        """Stops the pools without waiting for running calls, used on shutdown."""
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = self._process_pool = None
+
+    def report(self) -> Dict[str, dict]:
+        """Returns each cog's counters and queue and run time percentiles in milliseconds."""
+        return {cog: {'calls': stats.calls, 'errors': stats.errors, 'timeouts': stats.timeouts,
+                      'waiting': stats.waiting, 'running': stats.running,
+                      'queue_p50': stats.percentile(stats.queue_times, 50), 'queue_p95': stats.percentile(stats.queue_times, 95),
+                      'run_p50': stats.percentile(stats.run_times, 50), 'run_p95': stats.percentile(stats.run_times, 95)}
+                for cog, stats in sorted(self.stats.items())}
+
+
+def timed(func: Callable, args: tuple, kwargs: dict) -> Tuple[float, float, Any]:
+    """Runs a call in a worker and returns when it started and finished along with its result."""
+    started = time.monotonic()  # The same clock in every process.
+    result = func(*args, **kwargs)
+    return started, time.monotonic(), result
+
+
+def caller_module() -> str:
+    """
+    Returns who a call into the offload API counts against.
+
+    Walks up the stack to the first cog frame, so helpers a cog calls through still count
+    against the cog, and returns `cogs.<name>`. Calls with no cog on the stack count against
+    `core` if they come from YoBot itself, otherwise against the calling module.
+    """
+    frame = sys._getframe(1)
+    caller = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', 'unknown')
+        if module.startswith('cogs.'):
+            return '.'.join(module.split('.')[:2])
+        if caller is None and module not in (__name__, 'bot.yobot'):
+            caller = module
+        frame = frame.f_back
+    if caller is None or caller.split('.')[0] in ('bot', 'utils', '__main__', 'main', 'asyncio'):
+        return 'core'
+    return caller
@@ -0,0 +1,150 @@
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Optional, Union
+
+import discord
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+DEFAULT_LEVELS = {'admin': ['Admin', 'Moderator']}
+
+
+class MissingRoleLevel(commands.CheckFailure):
+    """
+    Raised when a member does not have a role of the required level.
+
+    Args:
+        level (str): The required level.
+    """
+
+    def __init__(self, level: str):
+        self.level = level
+        super().__init__("You don't have permission to use this command.")
+
+
+class YoBotPermissions():
+    """
+    Role based permission levels for YoBot.
+
+    Each level in the `permissions` config section lists role names or IDs. These are resolved
+    once per guild into a set of role IDs, cached until the guild's roles change, and each
+    check compares a member's current roles against that set. Until a guild's roles have
+    arrived, its role sets can come from the warm-start snapshot instead.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `permissions` config section, level names to role names or IDs.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        self.yobot = yobot
+        self._allowed: Dict[int, Dict[str, FrozenSet[int]]] = {}
+        self._saved: Optional[Callable[[int], Dict[str, FrozenSet[int]]]] = None
+        self.configure(config)
+
+    def configure(self, config: Optional[dict]) -> None:
+        """
+        Sets the levels and forgets every cached role set, and any saved ones from before.
+
+        Args:
+            config (dict): The `permissions` config section.
+        """
+        self.levels: Dict[str, list] = config or DEFAULT_LEVELS
+        self._allowed.clear()
+        self._saved = None
+
+    def allowed_roles(self, guild: discord.Guild, level: str) -> FrozenSet[int]:
+        """
+        Returns the IDs of a guild's roles that grant a level.
+
+        Args:
+            guild (Guild): The guild.
+            level (str): The level.
+
+        Returns:
+            frozenset: The role IDs.
+        """
+        guild_levels = self._allowed.get(guild.id)
+        if guild_levels is None:
+            saved = self._saved(guild.id) if self._saved is not None else {}
+            guild_levels = self._allowed[guild.id] = {level: roles for level, roles in saved.items() if level in self.levels}
+        allowed = guild_levels.get(level)
+        if allowed is None:
+            allowed = guild_levels[level] = self.resolve(guild, level)
+        return allowed
+
+    def resolve(self, guild: discord.Guild, level: str) -> FrozenSet[int]:
+        """Returns the IDs of a guild's roles that grant a level, from its current roles rather than the cache."""
+        entries = {str(entry) for entry in self.levels.get(level) or []}
+        return frozenset(role.id for role in guild.roles if role.name in entries or str(role.id) in entries)
+
+    def seed(self, saved: Callable[[int], Dict[str, FrozenSet[int]]]) -> None:
+        """
+        Reads role sets saved in a snapshot for guilds not cached yet, before their roles have arrived.
+
+        Args:
+            saved (Callable): Returns a guild's saved level names to role IDs, empty if it has none.
+        """
+        self._saved = saved
+
+    def has_level(self, member: Union[discord.Member, discord.User], level: str) -> bool:
+        """
+        Returns whether a member has a role granting a level, always False outside of guilds.
+
+        Args:
+            member (Member): The member.
+            level (str): The level.
+        """
+        if not isinstance(member, discord.Member):
+            return False
+        allowed = self.allowed_roles(member.guild, level)
+        return not allowed.isdisjoint(role.id for role in member.roles)
+
+    def invalidate(self, guild_id: int) -> None:
+        """
+        Forgets a guild's cached role sets.
+
+        Args:
+            guild_id (int): The guild's ID.
+        """
+        self._allowed.pop(guild_id, None)
+
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        """A new role may match a level by name."""
+        self.invalidate(role.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        """The role no longer grants a level."""
+        self.invalidate(role.guild.id)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        """A renamed role may match or stop matching a level."""
+        if before.name != after.name:
+            self.invalidate(after.guild.id)
+
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Forgets guilds YoBot left."""
+        self.invalidate(guild.id)
+
+    def add_listeners(self) -> None:
+        """Registers the invalidation listeners on the bot."""
+        for event in ['on_guild_role_create', 'on_guild_role_delete', 'on_guild_role_update',
+                      'on_guild_remove']:
+            self.yobot.add_listener(getattr(self, event), event)
+
+
+def has_role_level(level: str):
+    """
+    A command check that the author has a role granting a level, from any cog.
+
+    Rejected members raise `MissingRoleLevel`, a `CheckFailure`.
+
+    Args:
+        level (str): The level from the `permissions` config section.
+    """
+    def predicate(ctx: commands.Context) -> bool:
+        if not ctx.bot.permissions.has_level(ctx.author, level):
+            raise MissingRoleLevel(level)
+        return True
+
+    return commands.check(predicate)
@@ -0,0 +1,115 @@
+import json
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Pattern, Tuple
+
+import discord
+
+from utils.yobot_jsonfile import YoBotJsonFile
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotPrefixes():
+    """
+    Per-guild command prefixes for YoBot.
+
+    Prefixes are kept in memory and resolved on every message without any I/O. Guilds with
+    several prefixes get a compiled pattern that finds the longest matching prefix in one pass.
+    Changes are written back to a JSON file in a worker thread, a short while after the last
+    change so bursts of edits are saved once.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the prefixes file.
+        default (str): The prefix for guilds without their own, and for direct messages.
+        save_delay (float): The number of seconds to wait for more changes before saving.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str, default: str, save_delay: float = 1.0):
+        self.yobot = yobot
+        self.file = file
+        self.default = default
+        self.prefixes: Dict[int, Tuple[str, ...]] = {}
+        self._patterns: Dict[int, Pattern[str]] = {}
+        self.saver = YoBotJsonFile(yobot, file, self._serialize, 'prefixes', save_delay)
+        self.load()
+
+    def load(self) -> None:
+        """Loads the saved prefixes, a missing or broken file means no custom prefixes."""
+        try:
+            with open(self.file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        except (OSError, ValueError) as e:
+            self.yobot.log.error(f'Error loading prefixes from {self.file}: {e}')
+            saved = {}
+        self.prefixes.clear()
+        self._patterns.clear()
+        for guild_id, prefixes in saved.items():
+            self._store(int(guild_id), prefixes)
+
+    def _store(self, guild_id: int, prefixes: Iterable[str]) -> None:
+        """Stores a guild's prefixes and compiles its pattern if it has several."""
+        prefixes = tuple(dict.fromkeys(prefix for prefix in prefixes if prefix))
+        self._patterns.pop(guild_id, None)
+        if not prefixes:
+            self.prefixes.pop(guild_id, None)
+            return
+        self.prefixes[guild_id] = prefixes
+        if len(prefixes) > 1:
+            # Longest first, so '!!' wins over '!'.
+            self._patterns[guild_id] = re.compile('|'.join(re.escape(prefix) for prefix in sorted(prefixes, key=len, reverse=True)))
+
+    def for_guild(self, guild_id: Optional[int]) -> Tuple[str, ...]:
+        """Returns a guild's prefixes, the default for guilds without their own."""
+        if guild_id is None:
+            return (self.default,)
+        return self.prefixes.get(guild_id, (self.default,))
+
+    def match(self, guild_id: Optional[int], content: str) -> Optional[str]:
+        """
+        Returns the guild prefix a message starts with.
+
+        Args:
+            guild_id (int): The guild's ID, or None for direct messages.
+            content (str): The message content.
+
+        Returns:
+            str: The matching prefix, or None.
+        """
+        pattern = self._patterns.get(guild_id) if guild_id is not None else None
+        if pattern is not None:
+            found = pattern.match(content)
+            return found.group() if found else None
+        prefix = self.for_guild(guild_id)[0]
+        return prefix if content.startswith(prefix) else None
+
+    def get_prefix(self, yobot: 'YoBot', message: discord.Message) -> str:
+        """
+        The bot's `command_prefix`, returns the prefix this message uses.
+
+        A message without a prefix gets the guild's first one back, so it is not a command.
+        """
+        guild_id = message.guild.id if message.guild else None
+        return self.match(guild_id, message.content) or self.for_guild(guild_id)[0]
+
+    def set(self, guild_id: int, prefixes: Iterable[str]) -> None:
+        """
+        Sets a guild's prefixes and schedules a save, no prefixes resets it to the default.
+
+        Args:
+            guild_id (int): The guild's ID.
+            prefixes (list): The new prefixes.
+        """
+        self._store(guild_id, prefixes)
+        self.saver.schedule()
+
+    def _serialize(self) -> str:
+        """Returns the prefixes as JSON."""
+        return json.dumps({str(guild_id): list(prefixes) for guild_id, prefixes in self.prefixes.items()}, indent=4)
+
+    def flush(self) -> None:
+        """Saves any pending change now, used on shutdown."""
+        self.saver.flush()
@@ -0,0 +1,143 @@
+import asyncio
+import collections
+import inspect
+import os
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Counter, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotProfiler():
+    """
+    A low-overhead sampling profiler for the live bot.
+
+    A helper thread reads the event loop thread's current stack at a fixed interval, so the
+    bot keeps running unmodified while it is profiled. Stacks are kept in collapsed form
+    (`root;caller;leaf count`), which flamegraph tools read directly.
+
+    An idle asyncio loop waits in `selectors`. uvloop waits in C, so an idle sample ends in the
+    Python frame that started the loop, and that frame counts as idle when uvloop is running.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        interval (float): The number of seconds between samples.
+    """
+
+    IDLE_FUNCTIONS = {('selectors', 'select'), ('selectors', 'poll'), ('selectors', '_select')}
+
+    def __init__(self, yobot: 'YoBot', interval: float = 0.005):
+        self.yobot = yobot
+        self.interval = interval
+        self.stacks: Counter[Tuple[str, ...]] = collections.Counter()
+        self.leaves: Counter[Tuple[str, Optional[str]]] = collections.Counter()
+        self.cogs: Counter[str] = collections.Counter()
+        self.samples = 0
+        self.idle = 0
+        self._target: Optional[int] = None
+        self._switch_interval: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._idle_codes: Set[CodeType] = set()
+
+    def start(self) -> None:
+        """Starts sampling the calling thread, normally the event loop thread."""
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._idle_codes = self._loop_codes()
+        # A busy loop thread only hands over the GIL every switch interval (5ms by default), which
+        # would bias samples towards idle time. Shorten it while sampling.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 5))
+        self._thread = threading.Thread(target=self._sample, name='YoBotProfiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+
+    def _loop_codes(self) -> Set[CodeType]:
+        """Returns the code of the frame that runs a uvloop loop, on top of the stack when it is idle."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return set()
+        if not type(loop).__module__.startswith('uvloop'):
+            return set()
+        runner = None
+        frame = sys._getframe(1)
+        while frame is not None:
+            if frame.f_code.co_flags & inspect.CO_COROUTINE:
+                runner = frame.f_back  # Below the outermost coroutine, the call into the loop.
+            frame = frame.f_back  # type: ignore
+        return {runner.f_code} if runner is not None else set()
+
+    def _sample(self) -> None:
+        """The helper thread's sampling loop."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)  # type: ignore
+            if frame is not None:
+                self.add_sample(frame)
+
+    def add_sample(self, frame: FrameType) -> None:
+        """
+        Records one stack sample.
+
+        Args:
+            frame (FrameType): The innermost frame of the sampled stack.
+        """
+        stack: List[str] = []
+        cog = None
+        leaf = frame
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '?')
+            stack.append(f'{module}:{frame.f_code.co_name}')
+            if cog is None and module.startswith('cogs.'):
+                cog = module
+            frame = frame.f_back  # type: ignore
+        self.samples += 1
+        leaf_module = leaf.f_globals.get('__name__', '?')
+        self.stacks[tuple(reversed(stack))] += 1
+        if (leaf_module, leaf.f_code.co_name) in self.IDLE_FUNCTIONS or leaf.f_code in self._idle_codes:
+            self.idle += 1
+            return
+        self.leaves[(f'{leaf_module}:{leaf.f_code.co_name}:{leaf.f_lineno}', cog)] += 1
+        self.cogs[cog or 'core'] += 1
+
+    def write_collapsed(self, file: str) -> None:
+        """
+        Writes the samples in collapsed-stack format, one `frame;frame;frame count` line per stack.
+
+        Args:
+            file (str): The path to write to.
+        """
+        with open(file, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def top_frames(self, limit: int = 15) -> List[Tuple[str, Optional[str], int]]:
+        """
+        Returns the frames most often on top of the stack, leaving out the idle loop.
+
+        Args:
+            limit (int): The number of frames to return.
+
+        Returns:
+            list: (frame, cog module or None, samples) tuples, hottest first.
+        """
+        return [(frame, cog, count) for (frame, cog), count in self.leaves.most_common(limit)]
+
+
+def profile_file(log_dir: str) -> str:
+    """Returns a new timestamped collapsed-stack file path in the log directory."""
+    return os.path.join(log_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed")
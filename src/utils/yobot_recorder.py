@@ -0,0 +1,205 @@
+import gzip
+import json
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotRecorder():
+    """
+    Records raw gateway payloads to a compressed, append-only event log.
+
+    Each line of the log is a JSON object with the time since recording started (t),
+    the opcode (op), event type (e), sequence (s) and the scrubbed payload (d).
+    Lines are written in batches, each batch as its own gzip member, so a crash never
+    corrupts what was already written.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        enabled (bool): Whether recording is turned on.
+        log_dir (str): The directory to write recordings to.
+        batch_size (int): The number of events to buffer before writing.
+        flush_interval (float): The maximum number of seconds to buffer events for.
+    """
+
+    SNOWFLAKE = re.compile(r'^\d{15,20}$')
+    ID_LIST_KEYS = {'roles', 'mention_roles'}
+    NAME_KEYS = {'username', 'global_name', 'nick'}
+    NULL_KEYS = {'avatar', 'icon', 'banner', 'splash', 'discovery_splash', 'avatar_decoration'}
+    DROP_KEYS = {'email'}
+    INPUT_KEYS = {'value', 'values'}  # Slash command option values and select menu choices.
+    ENTITY_KEYS = {'guild': 'guild', 'guilds': 'guild', 'channel': 'channel', 'channels': 'channel',
+                   'thread': 'channel', 'threads': 'channel', 'role': 'role', 'roles': 'role'}
+    EVENT_KINDS = {'GUILD_CREATE': 'guild', 'GUILD_UPDATE': 'guild', 'CHANNEL_CREATE': 'channel',
+                   'CHANNEL_UPDATE': 'channel', 'CHANNEL_DELETE': 'channel', 'THREAD_CREATE': 'channel',
+                   'THREAD_UPDATE': 'channel', 'THREAD_DELETE': 'channel'}
+    TEXT_KEYS = {'embeds': 'embed', 'attachments': 'attachment'}
+
+    def __init__(self, yobot: 'YoBot', enabled: bool = False, log_dir: Optional[str] = None,
+                 batch_size: int = 500, flush_interval: float = 5.0):
+        self.yobot = yobot
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.file = None
+        if self.enabled:
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            self.file = os.path.join(log_dir or '.', f'gateway-{stamp}.jsonl.gz')
+        self.events = 0
+        self._buffer: List[str] = []
+        self._ids: Dict[str, str] = {}
+        self._names: Dict[str, Dict[str, str]] = {}
+        self._started = time.monotonic()
+        self._last_flush = self._started
+
+    async def on_socket_raw_receive(self, msg: str) -> None:
+        """Records a raw gateway payload, called through discord.py's debug events."""
+        try:
+            payload = json.loads(msg)
+            self.record(payload)
+        except Exception as e:
+            self.yobot.log.debug(f'Failed to record gateway payload: {e}')
+
+    def record(self, payload: dict) -> None:
+        """
+        Scrubs and buffers a gateway payload.
+
+        Args:
+            payload (dict): The decoded gateway payload.
+        """
+        if not self.enabled:
+            return
+        entry = {
+            't': round(time.monotonic() - self._started, 6),
+            'op': payload.get('op'),
+            'e': payload.get('t'),
+            's': payload.get('s'),
+            'd': self.scrub(payload.get('d'), kind=self.EVENT_KINDS.get(payload.get('t'))),
+        }
+        self._buffer.append(json.dumps(entry, separators=(',', ':')))
+        self.events += 1
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered events to the log as a new gzip member."""
+        self._last_flush = time.monotonic()
+        if not self._buffer or self.file is None:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            with gzip.open(self.file, 'ab') as f:
+                f.write(('\n'.join(batch) + '\n').encode('utf-8'))
+        except OSError as e:
+            self.yobot.log.error(f'Failed to write gateway recording {self.file}: {e}')
+
+    def close(self) -> None:
+        """Flushes the remaining events and stops recording."""
+        if not self.enabled:
+            return
+        self.flush()
+        self.enabled = False
+        self.yobot.log.info(f'Recorded {self.events} gateway events to {self.file}.')
+
+    def scrub(self, data: Any, key: Optional[str] = None, kind: Optional[str] = None) -> Any:
+        """
+        Replaces identifiers and user input in a payload with stable pseudonyms or blanks.
+
+        Snowflakes become sequential fake IDs that stay consistent for the whole recording.
+        User, guild, channel and role names and channel topics become placeholders. Tokens,
+        emails and avatars are removed. Message content and option values are blanked out,
+        except for the leading command word of prefix commands. Embed text and attachment
+        names and URLs are blanked too.
+
+        Args:
+            data (Any): The payload, or part of it, to scrub.
+            key (str): The key the data was found under.
+            kind (str): What the data belongs to: a guild, channel or role, or an embed or attachment.
+        """
+        if isinstance(data, dict):
+            kind = self.ENTITY_KEYS.get(key, kind)
+            return {self.pseudonym(k): None if k in self.NULL_KEYS else self.scrub(v, k, self.inner_kind(k, v, kind))
+                    for k, v in data.items() if k not in self.DROP_KEYS}
+        if isinstance(data, list):
+            if key in self.ID_LIST_KEYS:
+                return [self.pseudonym(v) if isinstance(v, str) else self.scrub(v, key, kind) for v in data]
+            if key in self.INPUT_KEYS:
+                return [self.scrub(v, 'value') for v in data]
+            return [self.scrub(v, key, kind) for v in data]
+        if not isinstance(data, str):
+            return data
+        if key == 'id' or (key is not None and key.endswith('_id')):
+            return self.pseudonym(data)
+        if kind == 'embed':
+            return data if key == 'type' else ''
+        if kind == 'attachment':
+            if key == 'filename':
+                return self.placeholder('file', data) + os.path.splitext(data)[1]
+            return data if key == 'content_type' else ''
+        if key in self.NAME_KEYS:
+            return self.placeholder('user', data)
+        if key == 'name' and kind in ('guild', 'channel', 'role'):
+            return self.placeholder(kind, data)
+        if key == 'topic':
+            return self.placeholder('topic', data)
+        if key in self.INPUT_KEYS:
+            return self.pseudonym(data) if self.SNOWFLAKE.match(data) else 'x' * len(data)
+        if key == 'token':
+            return 'redacted'
+        if key == 'session_id':
+            return 'session'
+        if key == 'resume_gateway_url':
+            return ''
+        if key == 'content':
+            return self.scrub_content(data)
+        return data
+
+    def inner_kind(self, key: str, value: Any, kind: Optional[str]) -> Optional[str]:
+        """Returns the kind to scrub a value found under a key with, given its dict's kind."""
+        if not isinstance(value, (dict, list)) or self.SNOWFLAKE.match(key):
+            return kind  # Plain values and resolved objects keyed by ID belong to the dict they are in.
+        if kind in ('embed', 'attachment'):
+            return kind  # Embeds and attachments are blanked all the way down.
+        return self.TEXT_KEYS.get(key)
+
+    def placeholder(self, kind: str, value: str) -> str:
+        """Returns the stable placeholder for a name, such as 'channel-3'."""
+        names = self._names.setdefault(kind, {})
+        if value not in names:
+            names[value] = f'{kind}-{len(names)}'
+        return names[value]
+
+    def pseudonym(self, value: Any) -> Any:
+        """Returns the stable fake snowflake for a real one."""
+        if not isinstance(value, str) or not self.SNOWFLAKE.match(value):
+            return value
+        if value not in self._ids:
+            self._ids[value] = str(100000000000000000 + len(self._ids))
+        return self._ids[value]
+
+    def scrub_content(self, content: str) -> str:
+        """Blanks out message content, keeping prefix commands so replays hit the same handlers."""
+        prefixes = self.yobot.prefixes
+        head, sep, rest = content.partition(' ')
+        known = (prefixes.default, *(prefix for guild in prefixes.prefixes.values() for prefix in guild))
+        if head.startswith(tuple(prefix for prefix in known if prefix)):
+            return head + sep + 'x' * len(rest)
+        return 'x' * len(content)
+
+
+def read_recording(file: str) -> List[dict]:
+    """
+    Reads every event from a gateway recording.
+
+    Args:
+        file (str): The path to the recording.
+
+    Returns:
+        list: The recorded events in order.
+    """
+    with gzip.open(file, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
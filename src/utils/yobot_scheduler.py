@@ -0,0 +1,382 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, Deque, List, Optional, Set, Tuple, Union
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+# Field ranges of a cron expression: minute, hour, day of month, month, day of week.
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+class CronSchedule():
+    """
+    A five field cron expression, `minute hour day month weekday`, in local time.
+
+    Fields take `*`, numbers, ranges like `1-5`, lists like `1,15` and steps like `*/10`.
+    Sunday is 0 or 7. As in cron, when both the day and weekday are limited a day matching
+    either runs.
+
+    Args:
+        expression (str): The cron expression.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' needs 5 fields, not {len(fields)}.")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS))
+        self.weekdays = {weekday % 7 for weekday in self.weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def day_matches(self, moment: datetime.datetime) -> bool:
+        """Returns whether the expression runs on a date."""
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays  # Python counts from Monday, cron from Sunday.
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """Returns the first time after a moment the expression runs, skipping whole days and hours that can't match."""
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + datetime.timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self.day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression '{self.expression}' never runs.")
+
+
+def parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    """Returns the values a cron field matches, within its range."""
+    values: Set[int] = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        if start < low or end > (7 if high == 6 else high) or start > end:
+            raise ValueError(f"Cron field '{field}' is outside {low}-{high}.")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class YoBotJob():
+    """
+    A scheduled job and its run statistics.
+
+    Attributes:
+        name (str): The job's name, shown by the `jobs` terminal command.
+        func (Callable): The coroutine function run with no arguments.
+        interval (float): Seconds between runs of an interval job.
+        cron (CronSchedule): The schedule of a cron job.
+        jitter (float): The most seconds each run is delayed at random.
+        module (str): The module the job comes from, its jobs are cancelled when it is unloaded.
+        next_run (float): The loop time of the next run.
+        cron_at (datetime): The local time a cron job's next run is for.
+        runs (int): The number of finished runs.
+        failures (int): The number of runs that raised.
+        coalesced (int): The number of runs skipped because the job was still running or overdue.
+        last_runtime (float): How long the last run took in seconds.
+        max_runtime (float): The longest run in seconds.
+        total_runtime (float): The time spent in all runs in seconds.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval: Optional[float] = None,
+                 cron: Optional[CronSchedule] = None, jitter: float = 0.0):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = cron
+        self.jitter = jitter
+        self.module: Optional[str] = getattr(func, '__module__', None)
+        self.next_run = 0.0
+        self.scheduled = 0.0  # The run time before jitter, which interval runs count from.
+        self.cron_at: Optional[datetime.datetime] = None
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.last_runtime = 0.0
+        self.max_runtime = 0.0
+        self.total_runtime = 0.0
+
+    @property
+    def trigger(self) -> str:
+        """Describes when the job runs."""
+        if self.cron is not None:
+            return f'cron {self.cron.expression}'
+        if self.interval is not None:
+            return f'every {self.interval:g}s'
+        return 'once'
+
+
+class YoBotScheduler():
+    """
+    One timer for every periodic job of YoBot and its cogs.
+
+    Jobs wait in a heap ordered by their next run, and a single loop timer is armed for the
+    earliest one, instead of a sleeping task per job. Due jobs run as tasks, at most
+    `max_concurrency` at a time. A job is never run twice at once: a run that comes due while
+    the last one is still going is skipped, and an interval job that fell behind, for example
+    after the loop stalled, runs once and picks up its schedule from now rather than catching
+    up on every missed run. Jobs added from a cog are cancelled when its extension is unloaded.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `scheduler` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        config = config or {}
+        self.yobot = yobot
+        self.max_concurrency = int(config.get('max_concurrency', 10))
+        self.jobs: List[YoBotJob] = []
+        self._heap: List[Tuple[float, int, YoBotJob]] = []
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._waiting: Deque[YoBotJob] = deque()  # Due jobs waiting for a free slot.
+        self._firing = False
+
+    def every(self, seconds: float, func: Callable[[], Awaitable], *, name: Optional[str] = None, jitter: float = 0.0,
+              delay: Optional[float] = None) -> YoBotJob:
+        """
+        Runs a coroutine function every number of seconds.
+
+        Args:
+            seconds (float): The seconds between runs.
+            func (Callable): An `async def` function taking no arguments, such as a cog method.
+            name (str): The job's name, the function's name by default.
+            jitter (float): The most seconds each run is delayed at random, to spread out jobs.
+            delay (float): The seconds before the first run, one interval by default.
+
+        Returns:
+            YoBotJob: The job, for `cancel`.
+        """
+        if seconds <= 0:
+            raise ValueError('The interval must be more than 0 seconds.')
+        job = YoBotJob(name or func.__qualname__, func, interval=seconds, jitter=jitter)
+        return self._add(job, self._now() + (seconds if delay is None else delay))
+
+    def cron(self, expression: str, func: Callable[[], Awaitable], *, name: Optional[str] = None,
+             jitter: float = 0.0) -> YoBotJob:
+        """
+        Runs a coroutine function on a cron schedule, like `'0 */6 * * *'` for every 6 hours.
+
+        Args:
+            expression (str): The five field cron expression, in local time.
+            func (Callable): An `async def` function taking no arguments.
+            name (str): The job's name, the function's name by default.
+            jitter (float): The most seconds each run is delayed at random.
+
+        Returns:
+            YoBotJob: The job, for `cancel`.
+        """
+        job = YoBotJob(name or func.__qualname__, func, cron=CronSchedule(expression), jitter=jitter)
+        return self._add(job, self._cron_time(job))
+
+    def once(self, when: Union[float, datetime.datetime], func: Callable[[], Awaitable], *,
+             name: Optional[str] = None) -> YoBotJob:
+        """
+        Runs a coroutine function once, after a number of seconds or at a local time.
+
+        Returns:
+            YoBotJob: The job, for `cancel`.
+        """
+        if isinstance(when, datetime.datetime):
+            when = (when - datetime.datetime.now(when.tzinfo)).total_seconds()
+        return self._add(YoBotJob(name or func.__qualname__, func), self._now() + max(0.0, when))
+
+    def cancel(self, job: Union[YoBotJob, str]) -> int:
+        """
+        Cancels a job, or every job with a name. A run already going is left to finish.
+
+        Returns:
+            int: The number of jobs cancelled.
+        """
+        cancelled = [scheduled for scheduled in self.jobs if scheduled is job or scheduled.name == job]
+        for scheduled in cancelled:
+            scheduled.cancelled = True
+            self.jobs.remove(scheduled)
+        return len(cancelled)  # Cancelled jobs are dropped from the heap when they come due.
+
+    def unregister_module(self, module: str) -> None:
+        """Cancels the jobs added from a module or its submodules."""
+        for job in list(self.jobs):
+            if job.module and (job.module == module or job.module.startswith(f'{module}.')):
+                self.cancel(job)
+
+    def _now(self) -> float:
+        """Returns the loop time, or the monotonic clock the loop uses before it runs."""
+        return self._loop.time() if self._loop is not None else time.monotonic()
+
+    def _cron_time(self, job: YoBotJob) -> float:
+        """
+        Returns the loop time of a cron job's next run.
+
+        Runs count from the time the last one was for, not from the wall clock, since the loop's
+        timer can fire a little before the minute and would otherwise run the job twice. Runs
+        missed while the loop was held up are skipped, as cron does.
+        """
+        now = datetime.datetime.now()
+        at = job.cron.next_after(job.cron_at or now)  # type: ignore
+        if at <= now:
+            at = job.cron.next_after(now)  # type: ignore
+        job.cron_at = at
+        return self._now() + (at - now).total_seconds()
+
+    def _add(self, job: YoBotJob, at: float) -> YoBotJob:
+        """Adds a job to the heap for its first run."""
+        self.jobs.append(job)
+        self._push(job, at)
+        return job
+
+    def _push(self, job: YoBotJob, at: float) -> None:
+        """Schedules a job's next run, with jitter, and rearms the timer if it is now the earliest."""
+        job.scheduled = at
+        job.next_run = at + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job))
+        if not self._firing:
+            self._arm()
+
+    def _arm(self) -> None:
+        """Points the single timer at the earliest job."""
+        if self._loop is None or not self._heap:
+            return
+        at = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_at is not None and self._timer_at <= at:
+                return  # Already due to fire first.
+            self._timer.cancel()
+        self._timer_at = at
+        self._timer = self._loop.call_at(at, self._fire)
+
+    def _fire(self) -> None:
+        """Starts every due job and rearms the timer for the next one."""
+        self._timer = self._timer_at = None
+        now = self._now()
+        self._firing = True  # Rearms once at the end rather than for every rescheduled job.
+        try:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job = heapq.heappop(self._heap)
+                if job.cancelled:
+                    continue
+                if job.running:
+                    job.coalesced += 1  # Still going, or waiting for a slot, from last time.
+                elif len(self._tasks) >= self.max_concurrency:
+                    job.running = True
+                    self._waiting.append(job)
+                else:
+                    self._start(job)
+                self._reschedule(job, now)
+        finally:
+            self._firing = False
+        self._arm()
+
+    def _start(self, job: YoBotJob) -> None:
+        """Runs a job as a task in one of the concurrent slots."""
+        job.running = True
+        task = self._loop.create_task(self._run(job))  # type: ignore
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        """Frees a job's slot for the next waiting job."""
+        self._tasks.discard(task)
+        while self._waiting and len(self._tasks) < self.max_concurrency and self._loop is not None:
+            job = self._waiting.popleft()
+            if job.cancelled:
+                job.running = False
+                continue
+            self._start(job)
+
+    def _reschedule(self, job: YoBotJob, now: float) -> None:
+        """Pushes a periodic job's next run, skipping any it is already late for."""
+        if job.interval is not None:
+            at = job.scheduled + job.interval
+            if at <= now:
+                missed = int((now - at) // job.interval) + 1
+                job.coalesced += missed
+                at += missed * job.interval
+            self._push(job, at)
+        elif job.cron is not None:
+            self._push(job, self._cron_time(job))
+        elif job in self.jobs:
+            self.jobs.remove(job)
+
+    async def _run(self, job: YoBotJob) -> None:
+        """Runs a job and records how long it took."""
+        started = time.perf_counter()
+        try:
+            await job.func()
+        except Exception as e:
+            job.failures += 1
+            self.yobot.log.error(f'Error in scheduled job {job.name}: {e}')
+        finally:
+            runtime = time.perf_counter() - started
+            job.runs += 1
+            job.last_runtime = runtime
+            job.max_runtime = max(job.max_runtime, runtime)
+            job.total_runtime += runtime
+            job.running = False
+
+    def start(self) -> None:
+        """Starts the timer, jobs added before this count their first run from now."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        shift = self._loop.time() - time.monotonic()
+        self._heap = [(at + shift, sequence, job) for at, sequence, job in self._heap]
+        for _, _, job in self._heap:
+            job.next_run += shift
+            job.scheduled += shift
+        heapq.heapify(self._heap)
+        self._arm()
+
+    async def stop(self) -> None:
+        """Stops the timer and cancels running jobs, used on shutdown."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_at = None
+        for job in self._waiting:
+            job.running = False
+        self._waiting.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=5)
+        self._loop = None
+
+    def stats(self) -> List[dict]:
+        """Returns every job's schedule and run statistics, soonest first."""
+        now = self._now()
+        return [{'name': job.name, 'trigger': job.trigger, 'next_in': job.next_run - now, 'running': job.running,
+                 'runs': job.runs, 'failures': job.failures, 'coalesced': job.coalesced,
+                 'avg_ms': job.total_runtime / job.runs * 1000 if job.runs else 0.0,
+                 'max_ms': job.max_runtime * 1000, 'last_ms': job.last_runtime * 1000}
+                for job in sorted(self.jobs, key=lambda job: job.next_run)]
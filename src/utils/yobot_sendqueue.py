@@ -0,0 +1,258 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils.yobot_exceptions import SendQueueFull
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+PRIORITIES = {'interaction': 0, 'high': 1, 'normal': 2, 'low': 3}
+INTERACTION = PRIORITIES['interaction']
+MESSAGE_LIMIT = 2000  # Discord's message length limit.
+
+
+class YoBotOutgoing():
+    """A message waiting in a send queue."""
+
+    __slots__ = ('target', 'content', 'kwargs', 'coalesce', 'future', 'queued_at')
+
+    def __init__(self, target: Any, content: Optional[str], kwargs: dict, coalesce: bool, future: asyncio.Future):
+        self.target = target
+        self.content = content
+        self.kwargs = kwargs
+        self.coalesce = coalesce and not kwargs and content is not None
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class SlidingWindow():
+    """
+    A set of sliding window limits sharing a rate, one per key.
+
+    Unlike a token bucket, no key ever goes over `rate` sends in any `per` seconds, which is
+    what Discord counts. Keys whose sends have all left the window are swept away.
+
+    Args:
+        rate (int): The number of sends allowed in a window.
+        per (float): The window's length in seconds.
+    """
+
+    __slots__ = ('rate', 'per', 'windows', '_swept')
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.windows: Dict[Hashable, Deque[float]] = {}
+        self._swept = time.monotonic()
+
+    def retry_after(self, key: Hashable, now: float, reserve: int = 0) -> float:
+        """Returns how long until a key can send, 0 if it can now, leaving `reserve` sends unused."""
+        window = self.windows.get(key)
+        allowed = self.rate - reserve
+        if window is None or len(window) < allowed:
+            return 0.0
+        return max(0.0, window[len(window) - allowed] + self.per - now)
+
+    def spend(self, key: Hashable, now: float) -> None:
+        """Records a send, the caller checks `retry_after` first."""
+        window = self.windows.setdefault(key, deque(maxlen=self.rate))
+        window.append(now)
+        if now - self._swept > self.per:
+            self.sweep(now)
+
+    def sweep(self, now: float) -> None:
+        """Drops keys with no sends left in the window."""
+        self._swept = now
+        for key in [key for key, window in self.windows.items() if window[-1] + self.per <= now]:
+            del self.windows[key]
+
+
+class YoBotSendQueue():
+    """
+    Outgoing message queues for YoBot.
+
+    Each channel, DM and interaction gets its own queue, sent in priority order by one worker
+    that paces itself with a sliding window per channel and a shared global one, so messages wait
+    in the queue rather than in discord.py's rate limit retries. Small messages sent with
+    `coalesce=True` are joined with the ones queued behind them, up to Discord's length limit,
+    and sent as one. Interaction replies skip the channel limits, and part of the global limit
+    is kept free for them.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        config (dict): The `send_queue` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', config: Optional[dict] = None):
+        config = config or {}
+        self.yobot = yobot
+        self.channel_limit = SlidingWindow(int(config.get('channel_rate', 5)), float(config.get('channel_per', 5.0)))
+        self.global_limit = SlidingWindow(int(config.get('global_rate', 45)), float(config.get('global_per', 1.0)))
+        self.interaction_reserve = min(int(config.get('interaction_reserve', 5)), self.global_limit.rate - 1)
+        self.max_depth = int(config.get('max_depth', 500))
+        self.queues: Dict[Hashable, List[Tuple[int, int, YoBotOutgoing]]] = {}
+        self.counts = {'queued': 0, 'sent': 0, 'coalesced': 0, 'failed': 0, 'dropped': 0}
+        self.waits: Deque[float] = deque(maxlen=1024)
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        self._sequence = itertools.count()
+
+    def send(self, target: Any, content: Optional[str] = None, *, priority: str = 'normal', coalesce: bool = False,
+             **kwargs: Any) -> 'asyncio.Future[Optional[discord.Message]]':
+        """
+        Queues a message.
+
+        Args:
+            target: A channel, context, user or member, or an interaction to reply to.
+            content (str): The message text.
+            priority (str): 'interaction', 'high', 'normal' or 'low', higher ones are sent first.
+            coalesce (bool): Whether the message may be joined with other small messages queued
+                for the same place, only for plain text messages.
+            **kwargs: Passed on to `send`, such as `embed` or `file`.
+
+        Returns:
+            Future: Resolves to the sent message once sent, can be awaited or left alone.
+                Joined messages all resolve to the same message, replies to an interaction's
+                first response resolve to None.
+        """
+        key = bucket_key(target)
+        queue = self.queues.setdefault(key, [])
+        if len(queue) >= self.max_depth:
+            self.counts['dropped'] += 1
+            raise SendQueueFull(key, len(queue))
+        future = asyncio.get_running_loop().create_future()
+        if isinstance(target, discord.Interaction):
+            priority = 'interaction'
+        heapq.heappush(queue, (PRIORITIES[priority], next(self._sequence), YoBotOutgoing(target, content, kwargs, coalesce, future)))
+        self.counts['queued'] += 1
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._work(key, queue), name=f'yobot-send-{key}')
+        return future
+
+    def respond(self, interaction: discord.Interaction, content: Optional[str] = None,
+                **kwargs: Any) -> 'asyncio.Future[Optional[discord.Message]]':
+        """Queues a reply to an interaction ahead of everything else, as its first response or a followup."""
+        return self.send(interaction, content, **kwargs)
+
+    async def _work(self, key: Hashable, queue: List[Tuple[int, int, YoBotOutgoing]]) -> None:
+        """Sends a queue's messages until it is empty."""
+        batch: List[YoBotOutgoing] = []
+        try:
+            while queue:
+                priority, _, item = heapq.heappop(queue)
+                if item.future.done():  # Cancelled by whoever queued it.
+                    continue
+                batch = [item]
+                if item.coalesce:
+                    length = len(item.content)  # type: ignore
+                    while queue and queue[0][0] == priority and queue[0][2].coalesce:
+                        following = queue[0][2]
+                        if length + 1 + len(following.content) > MESSAGE_LIMIT:  # type: ignore
+                            break
+                        heapq.heappop(queue)
+                        if not following.future.done():
+                            batch.append(following)
+                            length += 1 + len(following.content)  # type: ignore
+                await self._pace(key, priority)
+                content = '\n'.join(queued.content for queued in batch) if len(batch) > 1 else item.content  # type: ignore
+                now = time.monotonic()
+                self.waits.extend(now - queued.queued_at for queued in batch)
+                try:
+                    message = await deliver(item.target, content, item.kwargs)
+                except Exception as e:
+                    self.counts['failed'] += len(batch)
+                    self.yobot.log.error(f'Error sending a queued message to {key}: {e}')
+                    for queued in batch:
+                        if not queued.future.done():
+                            queued.future.set_exception(e)
+                            queued.future.exception()  # Marks it retrieved, this log is the report.
+                    continue
+                self.counts['sent'] += 1
+                self.counts['coalesced'] += len(batch) - 1
+                for queued in batch:
+                    if not queued.future.done():
+                        queued.future.set_result(message)
+        finally:
+            for queued in batch:  # Only left undone when cancelled mid-send.
+                if not queued.future.done():
+                    queued.future.cancel()
+            del self._workers[key]
+            if not queue:
+                del self.queues[key]
+
+    async def _pace(self, key: Hashable, priority: int) -> None:
+        """Waits until the channel and global limits allow a send, then records it."""
+        uses_channel = key[0] != 'interaction'  # type: ignore
+        reserve = 0 if priority == INTERACTION else self.interaction_reserve
+        while True:
+            now = time.monotonic()
+            wait = self.global_limit.retry_after(0, now, reserve)
+            if uses_channel:
+                wait = max(wait, self.channel_limit.retry_after(key, now))
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        self.global_limit.spend(0, now)
+        if uses_channel:
+            self.channel_limit.spend(key, now)
+
+    async def drain(self, timeout: float) -> None:
+        """Waits for every queued message to be sent, failing the ones left after the timeout."""
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+        for key, worker in list(self._workers.items()):
+            worker.cancel()
+            queue = self.queues.get(key, [])
+            for _, _, item in queue:
+                if not item.future.done():
+                    item.future.cancel()
+                    self.counts['dropped'] += 1
+            queue.clear()
+
+    def depth(self) -> int:
+        """Returns the number of messages waiting in every queue."""
+        return sum(len(queue) for queue in self.queues.values())
+
+    def stats(self) -> dict:
+        """Returns the counters, queue depths and wait percentiles in milliseconds."""
+        waits = sorted(self.waits)
+
+        def percentile(pct: float) -> float:
+            return waits[min(len(waits) - 1, int(len(waits) * pct / 100))] * 1000 if waits else 0.0
+
+        deepest = sorted(self.queues.items(), key=lambda item: len(item[1]), reverse=True)[:5]
+        return dict(self.counts, depth=self.depth(), queues=len(self.queues), wait_p50=percentile(50),
+                    wait_p95=percentile(95), wait_max=waits[-1] * 1000 if waits else 0.0,
+                    deepest={str(key): len(queue) for key, queue in deepest if queue})
+
+
+def bucket_key(target: Any) -> Hashable:
+    """Returns the rate limit bucket a message to a target falls in."""
+    if isinstance(target, discord.Interaction):
+        return ('interaction', target.id)
+    if isinstance(target, commands.Context):
+        if target.interaction is not None:
+            return ('interaction', target.interaction.id)
+        target = target.channel
+    if isinstance(target, (discord.User, discord.Member)):
+        return ('user', target.id)
+    return ('channel', target.id)
+
+
+async def deliver(target: Any, content: Optional[str], kwargs: dict) -> Optional[discord.Message]:
+    """Sends a message to a target, replying to interactions with their first response or a followup."""
+    if isinstance(target, commands.Context) and target.interaction is not None:
+        target = target.interaction
+    if isinstance(target, discord.Interaction):
+        if not target.response.is_done():
+            await target.response.send_message(content, **kwargs)
+            return None
+        return await target.followup.send(content, wait=True, **kwargs)  # type: ignore
+    return await target.send(content, **kwargs)
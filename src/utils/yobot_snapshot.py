@@ -0,0 +1,320 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+MAGIC = b'YBSN'
+VERSION = 1
+HEADER = struct.Struct('<4sHdI')  # Magic, version, saved at, guild count.
+INDEX = struct.Struct('<QII')  # Guild ID, record offset, record length.
+GUILD = struct.Struct('<QQI')  # Guild ID, owner ID, member count.
+ROLE = struct.Struct('<QQh')  # Role ID, permissions, position.
+COUNT = struct.Struct('<H')
+ROLE_ID = struct.Struct('<Q')
+
+
+class YoBotGuildSnapshot():
+    """
+    The saved state of one guild, readable before the gateway has sent it.
+
+    Attributes:
+        id (int): The guild's ID.
+        name (str): The guild's name.
+        owner_id (int): The guild owner's ID.
+        member_count (int): The number of members.
+        roles (Dict[int, Tuple[str, int, int]]): Role IDs to their name, permissions value and position.
+        allowed (Dict[str, FrozenSet[int]]): Permission levels to the IDs of the roles that grant them.
+        prefixes (Tuple[str, ...]): The guild's own command prefixes, empty if it uses the default.
+        disabled_cogs (Tuple[str, ...]): The cogs turned off in the guild.
+    """
+
+    def __init__(self, guild_id: int, name: str, owner_id: int, member_count: int,
+                 roles: Dict[int, Tuple[str, int, int]], allowed: Dict[str, FrozenSet[int]],
+                 prefixes: Tuple[str, ...], disabled_cogs: Tuple[str, ...]):
+        self.id = guild_id
+        self.name = name
+        self.owner_id = owner_id
+        self.member_count = member_count
+        self.roles = roles
+        self.allowed = allowed
+        self.prefixes = prefixes
+        self.disabled_cogs = disabled_cogs
+
+
+class YoBotSnapshot():
+    """
+    A warm-start snapshot of the guild state cogs depend on, kept across restarts.
+
+    On shutdown each guild's settings, roles, permission level role sets, prefixes and cogs
+    turned off are written to a compact binary file, along with the hash of the application
+    commands Discord last received. On startup the file is memory mapped and only its index
+    is read, so cogs can look up any guild straight away and only the guilds they ask for are
+    decoded. `YoBotPermissions` reads a guild's saved role sets the first time it checks that
+    guild, so the first commands after a restart don't resolve them again. As the gateway
+    sends each guild, its live role sets are checked against the snapshot and replace it
+    where they differ. The file is unmapped once YoBot is ready.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the snapshot file.
+        config (dict): The `snapshot` config section.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str, config: Optional[dict] = None):
+        config = config or {}
+        self.yobot = yobot
+        self.file = file
+        self.enabled = bool(config.get('enabled', False))
+        self.saved_at: Optional[float] = None
+        self.tree_hash: Optional[str] = None
+        self.levels_key: Optional[str] = None
+        self.reconciled = 0
+        self.changed = 0
+        self.live: Set[int] = set()
+        self._index: Dict[int, Tuple[int, int]] = {}
+        self._guilds: Dict[int, YoBotGuildSnapshot] = {}
+        self._map: Optional[mmap.mmap] = None
+        if self.enabled:
+            self.load()
+
+    def load(self) -> None:
+        """Maps the snapshot file and reads its index, a missing or broken file means no snapshot."""
+        self.release()
+        self._index.clear()
+        self._guilds.clear()
+        try:
+            with open(self.file, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, saved_at, count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'not a version {VERSION} snapshot')
+            offset = HEADER.size
+            self.tree_hash, offset = read_string(self._map, offset)
+            self.levels_key, offset = read_string(self._map, offset)
+            for _ in range(count):
+                guild_id, start, length = INDEX.unpack_from(self._map, offset)
+                self._index[guild_id] = (start, length)
+                offset += INDEX.size
+            self.saved_at = saved_at
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, struct.error) as e:
+            self.yobot.log.error(f'Error loading the snapshot from {self.file}: {e}')
+            self.release()
+            self._index.clear()
+            self.tree_hash = self.levels_key = None
+            return
+        self.yobot.log.debug(f'Snapshot of {len(self._index)} guilds from {time.ctime(self.saved_at)} loaded.')
+
+    def release(self) -> None:
+        """Unmaps the snapshot file, guilds already read stay available."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def guild_ids(self) -> List[int]:
+        """Returns the IDs of the guilds in the snapshot."""
+        return list(self._index)
+
+    def guild(self, guild_id: int) -> Optional[YoBotGuildSnapshot]:
+        """
+        Returns a guild's saved state, decoding it on first use.
+
+        Args:
+            guild_id (int): The guild's ID.
+
+        Returns:
+            YoBotGuildSnapshot: The guild's saved state, or None if it is not in the snapshot.
+        """
+        record = self._guilds.get(guild_id)
+        if record is None and self._map is not None and guild_id in self._index:
+            start, length = self._index[guild_id]
+            record = self._guilds[guild_id] = decode_guild(memoryview(self._map)[start:start + length])
+        return record
+
+    def seed_permissions(self) -> bool:
+        """Lets `YoBotPermissions` read the saved role sets, if the levels have not changed since."""
+        if not self._index or self.levels_key != levels_key(self.yobot.permissions.levels):
+            return False
+        self.yobot.permissions.seed(self.allowed)
+        return True
+
+    def allowed(self, guild_id: int) -> Dict[str, FrozenSet[int]]:
+        """Returns a guild's saved permission role sets, empty once its live roles have arrived."""
+        record = self.guild(guild_id) if guild_id not in self.live else None
+        return record.allowed if record is not None else {}
+
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        """Checks the saved role sets against the live guild, and drops them where they differ."""
+        self.live.add(guild.id)
+        record = self._guilds.get(guild.id) or self.guild(guild.id)
+        if record is None:
+            return
+        self.reconciled += 1
+        permissions = self.yobot.permissions
+        if any(permissions.resolve(guild, level) != record.allowed.get(level, frozenset()) for level in permissions.levels):
+            self.changed += 1
+            permissions.invalidate(guild.id)
+
+    async def on_ready(self) -> None:
+        """The live state has taken over, so the file can be unmapped."""
+        self.release()
+        if self._index:
+            self.yobot.log.debug(f'Snapshot reconciled: {self.reconciled} guilds checked, {self.changed} changed.')
+
+    def add_listeners(self) -> None:
+        """Registers the reconcile listeners on the bot."""
+        self.yobot.add_listener(self.on_guild_available, 'on_guild_available')
+        self.yobot.add_listener(self.on_ready, 'on_ready')
+
+    def capture(self) -> Optional[bytes]:
+        """Returns the live state as a snapshot, or None if there is nothing to save yet."""
+        guilds = self.yobot.guilds
+        if not guilds:
+            return None
+        yobot = self.yobot
+        records = [
+            YoBotGuildSnapshot(
+                guild.id, guild.name, guild.owner_id or 0, guild.member_count or 0,
+                {role.id: (role.name, role.permissions.value, role.position) for role in guild.roles},
+                {level: yobot.permissions.allowed_roles(guild, level) for level in yobot.permissions.levels},
+                yobot.prefixes.prefixes.get(guild.id, ()), tuple(yobot.guild_cogs.disabled_in(guild.id)))
+            for guild in guilds]
+        return encode(records, yobot.synced_tree_hash or '', levels_key(yobot.permissions.levels))
+
+    def save(self, data: Optional[bytes] = None) -> bool:
+        """
+        Writes a snapshot, of the live state unless given one from `capture`.
+
+        Args:
+            data (bytes): A snapshot from `capture`.
+
+        Returns:
+            bool: Whether a snapshot was written.
+        """
+        data = data if data is not None else self.capture()
+        if data is None:
+            return False
+        try:
+            write_mapped(self.file, data)
+        except OSError as e:
+            self.yobot.log.error(f'Error saving the snapshot to {self.file}: {e}')
+            return False
+        return True
+
+    def stats(self) -> dict:
+        """Returns what the snapshot holds and how much of it the live state has checked."""
+        return {'enabled': self.enabled, 'file': self.file, 'guilds': len(self._index), 'decoded': len(self._guilds),
+                'mapped': self._map is not None, 'saved_at': self.saved_at, 'tree_hash': self.tree_hash,
+                'live': len(self.live), 'reconciled': self.reconciled, 'changed': self.changed}
+
+
+def levels_key(levels: dict) -> str:
+    """Returns a hash of the permission levels config, saved role sets only hold for the same levels."""
+    return hashlib.sha1(json.dumps(levels, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def pack_string(value: str) -> bytes:
+    """Returns a string with its length in front."""
+    data = value.encode('utf-8')[:0xFFFF]
+    return COUNT.pack(len(data)) + data
+
+
+def read_string(buffer, offset: int) -> Tuple[str, int]:
+    """Reads a string written by `pack_string`, returning it and the offset after it."""
+    (length,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    return bytes(buffer[offset:offset + length]).decode('utf-8'), offset + length
+
+
+def encode_guild(record: YoBotGuildSnapshot) -> bytes:
+    """Returns a guild's record in the snapshot format."""
+    parts = [GUILD.pack(record.id, record.owner_id, record.member_count), pack_string(record.name),
+             COUNT.pack(len(record.roles))]
+    for role_id, (name, permissions, position) in record.roles.items():
+        parts.append(ROLE.pack(role_id, permissions, max(-0x8000, min(0x7FFF, position))))
+        parts.append(pack_string(name))
+    parts.append(COUNT.pack(len(record.allowed)))
+    for level, role_ids in record.allowed.items():
+        parts.append(pack_string(level))
+        parts.append(COUNT.pack(len(role_ids)))
+        parts.append(struct.pack(f'<{len(role_ids)}Q', *role_ids))
+    for values in (record.prefixes, record.disabled_cogs):
+        parts.append(COUNT.pack(len(values)))
+        parts.extend(pack_string(value) for value in values)
+    return b''.join(parts)
+
+
+def decode_guild(buffer: memoryview) -> YoBotGuildSnapshot:
+    """Reads a guild's record written by `encode_guild`."""
+    guild_id, owner_id, member_count = GUILD.unpack_from(buffer, 0)
+    name, offset = read_string(buffer, GUILD.size)
+    (count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    roles = {}
+    for _ in range(count):
+        role_id, permissions, position = ROLE.unpack_from(buffer, offset)
+        role_name, offset = read_string(buffer, offset + ROLE.size)
+        roles[role_id] = (role_name, permissions, position)
+    (count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    allowed = {}
+    for _ in range(count):
+        level, offset = read_string(buffer, offset)
+        (size,) = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        allowed[level] = frozenset(struct.unpack_from(f'<{size}Q', buffer, offset))
+        offset += size * ROLE_ID.size
+    lists = []
+    for _ in range(2):
+        (count,) = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        values = []
+        for _ in range(count):
+            value, offset = read_string(buffer, offset)
+            values.append(value)
+        lists.append(tuple(values))
+    return YoBotGuildSnapshot(guild_id, name, owner_id, member_count, roles, allowed, lists[0], lists[1])
+
+
+def encode(records: Iterable[YoBotGuildSnapshot], tree_hash: str, levels: str) -> bytes:
+    """
+    Returns a snapshot of guild records.
+
+    The header and an index of every guild's record come first, so a reader can find one
+    guild without decoding the others.
+
+    Args:
+        records (Iterable[YoBotGuildSnapshot]): The guilds.
+        tree_hash (str): The hash of the application commands Discord last received.
+        levels (str): The `levels_key` of the permission levels the role sets were resolved for.
+    """
+    encoded = [(record.id, encode_guild(record)) for record in records]
+    head = HEADER.pack(MAGIC, VERSION, time.time(), len(encoded)) + pack_string(tree_hash) + pack_string(levels)
+    offset = len(head) + INDEX.size * len(encoded)
+    index = []
+    for guild_id, data in encoded:
+        index.append(INDEX.pack(guild_id, offset, len(data)))
+        offset += len(data)
+    return b''.join([head, *index, *(data for _, data in encoded)])
+
+
+def write_mapped(file: str, data: bytes) -> None:
+    """Writes a file through a memory map, to a temporary file first so it is never half written."""
+    os.makedirs(os.path.dirname(file) or '.', exist_ok=True)
+    temporary = f'{file}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w+b') as f:
+        f.truncate(len(data))
+        with mmap.mmap(f.fileno(), len(data)) as mapped:
+            mapped[:] = data
+            mapped.flush()
+    os.replace(temporary, file)
@@ -0,0 +1,139 @@
+import builtins
+import contextlib
+import importlib
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotImportTimer():
+    """
+    Times each module imported through `import` statements while installed.
+
+    Records each module's own time and its time including what it imported in turn, like
+    `python -X importtime`, but can be switched on from the command line. Imports made in
+    other threads are timed on their own stack.
+    """
+
+    def __init__(self):
+        self.times: Dict[str, List[float]] = {}  # Module name -> [own seconds, total seconds].
+        self._local = threading.local()
+        self._original: Optional[Callable] = None
+
+    def install(self) -> None:
+        """Starts timing imports."""
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        """Stops timing imports."""
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        name_key = name
+        if level and globals:  # Relative imports are recorded by their full name.
+            package = (globals.get('__package__') or '').rsplit('.', level - 1)[0]
+            name_key = f'{package}.{name}' if name else package
+        if name_key in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.times[name_key] = [total - children, total]
+
+    def slowest(self, top: int = 15) -> List[Tuple[str, float, float]]:
+        """Returns the modules that took the longest to import, with their own and total milliseconds."""
+        ordered = sorted(self.times.items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, own * 1000, total * 1000) for name, (own, total) in ordered[:top]]
+
+
+class YoBotStartup():
+    """
+    Times YoBot's startup phases, and its imports when profiling with `--profile-startup`.
+
+    Phases can run at the same time, such as importing discord.py in a thread while the config
+    loads, so each one is shown with when it started as well as how long it took.
+
+    Args:
+        profile (bool): Whether to time imports and report the phases once YoBot is ready.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.profile = profile
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float, float, str]] = []  # Name, start, end, thread.
+        self._last_mark = self.started
+        self.imports = YoBotImportTimer()
+        self._preloads: List[threading.Thread] = []
+        if profile:
+            self.imports.install()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times a startup phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, started, time.perf_counter(), threading.current_thread().name))
+
+    def mark(self, name: str) -> None:
+        """Ends a phase that ran since the last mark, for the steps `launch_bot` runs one after another."""
+        now = time.perf_counter()
+        self.phases.append((name, self._last_mark, now, threading.current_thread().name))
+        self._last_mark = now
+
+    def preload(self, *modules: str) -> None:
+        """Starts importing modules in a thread, so the import overlaps whatever runs next."""
+        def load() -> None:
+            with self.phase(f"import {', '.join(modules)}"):
+                for module in modules:
+                    try:
+                        importlib.import_module(module)
+                    except Exception:
+                        return  # Imported again where it is used, which raises the error there.
+
+        thread = threading.Thread(target=load, name='yobot-preload', daemon=True)
+        self._preloads.append(thread)
+        thread.start()
+
+    def wait_for_preloads(self) -> None:
+        """Waits for the modules being imported in threads."""
+        for thread in self._preloads:
+            thread.join()
+        self._preloads.clear()
+        self.mark('wait for imports')
+
+    def report(self, yobot: 'YoBot', top: int = 15) -> None:
+        """
+        Logs each phase with when it started and how long it took, then the slowest imports.
+
+        Args:
+            yobot (YoBot): The YoBot instance.
+            top (int): The number of imports to show.
+        """
+        self.imports.uninstall()
+        ended = max((end for _, _, end, _ in self.phases), default=self.started)
+        yobot.log.info(f'Startup took {(ended - self.started) * 1000:.1f}ms:')
+        for name, started, end, thread in sorted(self.phases, key=lambda phase: phase[1]):
+            where = '' if thread == 'MainThread' else f' [{thread}]'
+            yobot.log.info(f'  +{(started - self.started) * 1000:7.1f}ms {(end - started) * 1000:8.1f}ms  {name}{where}')
+        if self.imports.times:
+            yobot.log.info(f'Slowest of {len(self.imports.times)} imports (own, total):')
+            for name, own, total in self.imports.slowest(top):
+                yobot.log.info(f'  {own:8.1f}ms {total:8.1f}ms  {name}')
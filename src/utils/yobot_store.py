@@ -0,0 +1,257 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+DELETED = object()  # Marks a pending delete.
+MISSING = object()
+
+
+class YoBotStore():
+    """
+    An embedded key-value store for cog state.
+
+    Values are JSON and live in an SQLite database in WAL mode, grouped by namespace, usually
+    one per cog. Reads are served from an LRU cache, and misses go to a reader thread. Writes
+    land in the cache straight away and are queued for a writer thread, which commits
+    everything queued within the batch delay in one transaction. Repeated writes to a key in
+    the same batch are written once. Values are handed out as stored, so set a value again
+    after changing it.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        file (str): The path to the database.
+        cache_size (int): The number of values kept in memory.
+        batch_delay (float): The number of seconds the writer waits to gather more writes.
+        batch_size (int): The most writes committed in one transaction.
+    """
+
+    def __init__(self, yobot: 'YoBot', file: str, cache_size: int = 4096, batch_delay: float = 0.05, batch_size: int = 500):
+        self.yobot = yobot
+        self.file = file
+        self.cache_size = cache_size
+        self.batch_delay = batch_delay
+        self.batch_size = batch_size
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'batches': 0, 'rows': 0}
+        self._cache: 'OrderedDict[Tuple[str, str], Any]' = OrderedDict()
+        self._pending: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._sequence = 0
+        self._queue: 'queue.Queue[Optional[Tuple[Any, ...]]]' = queue.Queue()
+        self._reader_connection: Optional[sqlite3.Connection] = None
+        self._reader = ThreadPoolExecutor(1, thread_name_prefix='yobot-store-reader')
+        self._connect().close()  # Creates the database and table before either thread needs it.
+        self._writer = threading.Thread(target=self._write_loop, name='yobot-store-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a connection, creating the table on first use."""
+        connection = sqlite3.connect(self.file, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # WAL keeps this safe against corruption.
+        connection.execute('CREATE TABLE IF NOT EXISTS kv (namespace TEXT, key TEXT, value TEXT, '
+                           'PRIMARY KEY (namespace, key)) WITHOUT ROWID')
+        connection.commit()
+        return connection
+
+    def namespace(self, name: str) -> 'YoBotStoreNamespace':
+        """Returns a view of the store limited to one namespace, such as a cog's name."""
+        return YoBotStoreNamespace(self, name)
+
+    def _remember(self, item: Tuple[str, str], value: Any) -> None:
+        """Puts a value in the cache, evicting the least recently used one if full."""
+        self._cache[item] = value
+        self._cache.move_to_end(item)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """
+        Returns a value, or the default if it is not set.
+
+        Args:
+            namespace (str): The namespace.
+            key (str): The key.
+            default (Any): What to return for a missing key.
+        """
+        item = (namespace, key)
+        value = self._cache.get(item, MISSING)
+        if value is not MISSING:
+            self._cache.move_to_end(item)
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            with self._pending_lock:
+                pending = self._pending.get(item)
+            if pending is not None:
+                value = pending[1]  # Evicted before the writer got to it.
+            else:
+                value = await asyncio.get_running_loop().run_in_executor(self._reader, self._read, namespace, key)
+                value = self._cache.get(item, value)  # A write while reading is newer than what was read.
+            self._remember(item, value)
+        return default if value is DELETED else value
+
+    def _read(self, namespace: str, key: str) -> Any:
+        """Reads a value from the database, on the reader thread."""
+        if self._reader_connection is None:
+            self._reader_connection = self._connect()
+        row = self._reader_connection.execute('SELECT value FROM kv WHERE namespace = ? AND key = ?',
+                                              (namespace, key)).fetchone()
+        return DELETED if row is None else json.loads(row[0])
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Sets a value. It can be read back at once, and is written with the next batch.
+
+        Args:
+            namespace (str): The namespace.
+            key (str): The key.
+            value (Any): Anything JSON can store.
+        """
+        self._write(namespace, key, json.dumps(value), value)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        """Removes a value."""
+        self._write(namespace, key, None, DELETED)
+
+    def _write(self, namespace: str, key: str, data: Optional[str], value: Any) -> None:
+        """Updates the cache and queues a write for the writer thread."""
+        item = (namespace, key)
+        self._remember(item, value)
+        with self._pending_lock:
+            self._sequence += 1
+            self._pending[item] = (self._sequence, value)
+            sequence = self._sequence
+        self.stats['writes'] += 1
+        self._queue.put((item, sequence, data))
+
+    async def scan(self, namespace: str, prefix: str = '', limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """
+        Returns the keys and values of a namespace in key order, after waiting for pending writes.
+
+        Args:
+            namespace (str): The namespace.
+            prefix (str): Only return keys starting with this.
+            limit (int): The most pairs to return.
+        """
+        await self.flush()
+        return await asyncio.get_running_loop().run_in_executor(self._reader, self._scan, namespace, prefix, limit)
+
+    def _scan(self, namespace: str, prefix: str, limit: Optional[int]) -> List[Tuple[str, Any]]:
+        """Reads a range of keys from the database, on the reader thread."""
+        if self._reader_connection is None:
+            self._reader_connection = self._connect()
+        query = 'SELECT key, value FROM kv WHERE namespace = ? AND key >= ?'
+        parameters: list = [namespace, prefix]
+        if prefix:
+            query += ' AND key < ?'
+            parameters.append(prefix[:-1] + chr(ord(prefix[-1]) + 1))  # The first key past the prefix.
+        query += ' ORDER BY key'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+        return [(key, json.loads(value)) for key, value in self._reader_connection.execute(query, parameters)]
+
+    async def flush(self) -> None:
+        """Waits until every write made so far is committed."""
+        done: Future = Future()
+        self._queue.put((None, 0, done))
+        await asyncio.wrap_future(done)
+
+    def _write_loop(self) -> None:
+        """Commits queued writes in batches, on the writer thread."""
+        connection = self._connect()
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch: Dict[Tuple[str, str], Tuple[int, Optional[str]]] = {}
+            waiters: List[Future] = []
+            closing = False
+            deadline = time.monotonic() + self.batch_delay
+            entry: Optional[Tuple[Any, ...]] = first
+            while True:
+                if entry is None:
+                    closing = True
+                    break
+                item, sequence, data = entry
+                if item is None:
+                    waiters.append(data)  # Commit now, someone is waiting on this batch.
+                    break
+                batch[item] = (sequence, data)  # The latest write to a key wins.
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._commit(connection, batch)
+                for waiter in waiters:
+                    waiter.set_result(None)
+            except Exception as e:
+                self.yobot.log.error(f'Error writing to the store: {e}')
+                for waiter in waiters:
+                    waiter.set_exception(e)
+            if closing:
+                break
+        connection.close()
+
+    def _commit(self, connection: sqlite3.Connection, batch: Dict[Tuple[str, str], Tuple[int, Optional[str]]]) -> None:
+        """Writes a batch in one transaction and forgets the pending writes it covered."""
+        with connection:
+            connection.executemany('INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)',
+                                   [(namespace, key, data) for (namespace, key), (_, data) in batch.items() if data is not None])
+            connection.executemany('DELETE FROM kv WHERE namespace = ? AND key = ?',
+                                   [item for item, (_, data) in batch.items() if data is None])
+        with self._pending_lock:
+            for item, (sequence, _) in batch.items():
+                if self._pending.get(item, (None,))[0] == sequence:  # Not written again since.
+                    del self._pending[item]
+        self.stats['batches'] += 1
+        self.stats['rows'] += len(batch)
+
+    def close(self) -> None:
+        """Commits pending writes and stops the store's threads, used on shutdown."""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._reader.shutdown(wait=True)
+        if self._reader_connection is not None:
+            self._reader_connection.close()
+
+
+class YoBotStoreNamespace():
+    """
+    One namespace of the store, with the same methods minus the namespace argument.
+
+    Args:
+        store (YoBotStore): The store.
+        name (str): The namespace.
+    """
+
+    def __init__(self, store: YoBotStore, name: str):
+        self.store = store
+        self.name = name
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return await self.store.get(self.name, key, default)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.store.set(self.name, key, value)
+
+    async def delete(self, key: str) -> None:
+        await self.store.delete(self.name, key)
+
+    async def scan(self, prefix: str = '', limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        return await self.store.scan(self.name, prefix, limit)
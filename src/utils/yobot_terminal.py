@@ -1,12 +1,19 @@
+import asyncio
 import logging
 import os
+import time
+import tracemalloc
 import traceback
 from typing import TYPE_CHECKING
 
 import discord
 import yaml
 
-from utils.yobot_lib import (get_boolean_input, download_cogs)
+from utils.yobot_cogindex import extension_name
+from utils.yobot_lib import (ask, ask_boolean, download_cogs_async, read_file)
+from utils.yobot_loop import describe_loop
+from utils.yobot_memory import format_bytes
+from utils.yobot_profiler import YoBotProfiler, profile_file
 
 if TYPE_CHECKING:
     from bot.yobot import YoBot
@@ -19,7 +26,7 @@ class YoBotTerminalCommands():
 
     Args:
         yobot (Yobot): The Yobot instance.
-        terminal_command (str): The terminal command.
+        terminal_command (str): The terminal command, optionally followed by arguments.
     """
 
     def __init__(self: 'YoBotTerminalCommands', yobot: 'YoBot', terminal_command: str):
@@ -37,8 +44,9 @@ class YoBotTerminalCommands():
 
         External Application -> Terminal == BAD!
         """
-        user_command = self.terminal_command.lower()
-        self.yobot.log.info('Received command: {}'.format(user_command))
+        user_command, *args = self.terminal_command.split() or ['']
+        user_command = user_command.lower()  # Arguments keep their case, prefixes are case sensitive.
+        self.yobot.log.info('Received command: {}'.format(self.terminal_command))
 
         if user_command in ['exit', 'quit', 'shutdown']:
             self.yobot.log.debug('Exiting bot terminal...')
@@ -74,11 +82,11 @@ class YoBotTerminalCommands():
 
         elif user_command in ['wipebot', 'wipeconfig', 'wipe', 'wb']:
             self.yobot.log.debug('Wiping bot config...')
-            wipe_config(self.yobot)
+            await wipe_config(self.yobot)
 
         elif user_command in ['getcog', 'getcogs', 'gc']:
             self.yobot.log.debug('Downloading cogs...')
-            download_cogs(self.yobot, self.cog_repo_info['repo_owner'], self.cog_repo_info['repo_name'], self.cog_repo_info['repo_info'])
+            await download_cogs_async(self.yobot, self.cog_repo_info['repo_owner'], self.cog_repo_info['repo_name'], self.cog_repo_info['repo_info'])
             await self.yobot.load_cogs()
             self.yobot.log.info('Reloaded all cogs.')
             self.yobot.log.info('You may need to resync with Discord to apply new commands.')
@@ -86,7 +94,7 @@ class YoBotTerminalCommands():
 
         elif user_command in ['removecog', 'removecogs', 'rc']:
             self.yobot.log.debug('Removing cogs...')
-            remove_cogs(self.yobot, self.yobot.cogs_dir)
+            await remove_cogs(self.yobot, self.yobot.cogs_dir)
 
         elif user_command in ['listcogs', 'list', 'lc']:
             self.yobot.log.debug('Listing cogs...')
@@ -98,19 +106,71 @@ class YoBotTerminalCommands():
 
         elif user_command in ['debug', 'd']:
             self.yobot.log.debug('Toggling debug mode...')
-            toggle_debug_mode(self.yobot)
+            await toggle_debug_mode(self.yobot)
 
         elif user_command in ['developer', 'dev', 'devmode', 'dm']:
             self.yobot.log.debug('Toggling developer mode...')
-            toggle_dev_mode(self.yobot)
+            await toggle_dev_mode(self.yobot)
 
         elif user_command in ['addblacklist', 'addbl', 'abl']:
             self.yobot.log.debug('Adding to blacklist...')
-            add_blacklist(self.yobot)
+            await add_blacklist(self.yobot)
 
         elif user_command in ['removeblacklist', 'rmblist', 'rmbl']:
             self.yobot.log.debug('Removing from blacklist...')
-            remove_blacklist(self.yobot)
+            await remove_blacklist(self.yobot)
+
+        elif user_command in ['lag', 'looplag', 'll']:
+            self.yobot.log.debug('Showing loop lag...')
+            show_loop_lag(self.yobot)
+
+        elif user_command in ['profile', 'prof', 'pf']:
+            self.yobot.log.debug('Profiling...')
+            await profile(self.yobot, *args)
+
+        elif user_command in ['memory', 'mem', 'm']:
+            self.yobot.log.debug('Running memory diagnostics...')
+            await memory(self.yobot, *args)
+
+        elif user_command in ['limits', 'limiter', 'lim']:
+            self.yobot.log.debug('Showing command limits...')
+            show_limits(self.yobot)
+
+        elif user_command in ['setprefix', 'prefix', 'spx']:
+            self.yobot.log.debug('Setting guild prefixes...')
+            set_prefix(self.yobot, *args)
+
+        elif user_command in ['guildcogs', 'guildcog', 'gcogs']:
+            self.yobot.log.debug('Managing guild cogs...')
+            guild_cogs(self.yobot, *args)
+
+        elif user_command in ['http', 'web']:
+            self.yobot.log.debug('Showing HTTP client stats...')
+            show_http(self.yobot)
+
+        elif user_command in ['sends', 'sendqueue', 'sq']:
+            self.yobot.log.debug('Showing send queue stats...')
+            show_sends(self.yobot)
+
+        elif user_command in ['jobs', 'scheduler']:
+            self.yobot.log.debug('Showing scheduled jobs...')
+            show_jobs(self.yobot)
+
+        elif user_command in ['offload', 'pools']:
+            self.yobot.log.debug('Showing offloaded work...')
+            show_offload(self.yobot)
+
+        elif user_command in ['snapshot', 'snap']:
+            self.yobot.log.debug('Showing the warm-start snapshot...')
+            await show_snapshot(self.yobot, *args)
+
+        elif user_command in ['slow', 'deferrals']:
+            self.yobot.log.debug('Showing slow commands...')
+            show_slow(self.yobot)
+
+        elif user_command in ['restart', 'softrestart', 'rs']:
+            self.yobot.log.debug('Soft restarting...')
+            await soft_restart(self.yobot)
             
         else:
             self.yobot.log.info(
@@ -119,12 +179,12 @@ class YoBotTerminalCommands():
 
 # Terminal Commands Functions
 
-def add_blacklist(yobot: 'YoBot') -> None:
+async def add_blacklist(yobot: 'YoBot') -> None:
     """
     Add something to a blacklist.
     """
     try:
-        edit_confirm = get_boolean_input(yobot, 'Are you sure you want to add to the blacklist? (y/n) ')
+        edit_confirm = await ask_boolean(yobot, 'Are you sure you want to add to the blacklist? (y/n) ')
         config = yobot.config_file
 
         if not edit_confirm:
@@ -133,20 +193,20 @@ def add_blacklist(yobot: 'YoBot') -> None:
             cogs = list_cogs(yobot, config.get('file_paths.cogs_dir'))
             yobot.log.info('Choose the cog to add to the blacklist:')
 
-            cog_index = int(input('Enter the number of the cog you want to blacklist: '))
+            cog_index = int(await ask(yobot, 'Enter the number of the cog you want to blacklist: '))
             cog_name = cogs[cog_index - 1]
-            blacklist = config.get('blacklist.cog_removal')
+            blacklist = config.get('blacklist.cog_removal') or []
 
-            if cog_name in blacklist:
+            if yobot.blacklist.matches('cog_removal', cog_name):
                 yobot.log.warning(f"'{cog_name}' is already in the cog removal blacklist.")
                 return
 
             blacklist.append(cog_name)
 
             try:
-                config.load()
+                await yobot.run_blocking(config.load)
                 config.set_all('blacklist.cog_removal', blacklist)
-                config.save()
+                await yobot.run_blocking(config.save)
             except Exception as e:
                 yobot.log.debug(f"Failed to update the configuration file: {e}")
                 return yobot.log.warning('Failed to add the cog to the cog removal blacklist.')
@@ -157,12 +217,12 @@ def add_blacklist(yobot: 'YoBot') -> None:
         yobot.log.warning('Failed to add to the cog removal blacklist.')
         
 
-def remove_blacklist(yobot: 'YoBot') -> None:
+async def remove_blacklist(yobot: 'YoBot') -> None:
     """
     Remove a cog from the blacklist.
     """
     try:
-        edit_confirm = get_boolean_input(yobot, 'Are you sure you want to remove from the blacklist? (y/n) ')
+        edit_confirm = await ask_boolean(yobot, 'Are you sure you want to remove from the blacklist? (y/n) ')
         config = yobot.config_file
 
         if not edit_confirm:
@@ -177,7 +237,7 @@ def remove_blacklist(yobot: 'YoBot') -> None:
             for i, cog_name in enumerate(blacklist):
                 yobot.log.info(f'{i+1}. {cog_name}')
 
-            cog_index = int(input('Enter the number of the cog you want to remove: '))
+            cog_index = int(await ask(yobot, 'Enter the number of the cog you want to remove: '))
             cog_name = blacklist[cog_index - 1]
 
             if cog_name not in blacklist:
@@ -188,7 +248,7 @@ def remove_blacklist(yobot: 'YoBot') -> None:
 
             try:
                 config.set_all('blacklist.cog_removal', blacklist)
-                config.save()
+                await yobot.run_blocking(config.save)
             except Exception as e:
                 yobot.log.debug(f"Failed to update the configuration file: {e}")
                 return yobot.log.warning('Failed to remove the cog from the cog removal blacklist.')
@@ -199,7 +259,7 @@ def remove_blacklist(yobot: 'YoBot') -> None:
         yobot.log.warning('Failed to remove from the cog removal blacklist.') 
     
     
-def toggle_dev_mode(yobot: 'YoBot') -> None:
+async def toggle_dev_mode(yobot: 'YoBot') -> None:
     """
     Toggles dev mode.
 
@@ -208,18 +268,18 @@ def toggle_dev_mode(yobot: 'YoBot') -> None:
     """
     try:
         config = yobot.config_file
-        config.load()
+        await yobot.run_blocking(config.load)
         if config.get('dev_mode') is True:
             yobot.log.info('Disabling dev mode...')
             config.set('dev_mode', False)
-            config.save()
+            await yobot.run_blocking(config.save)
             yobot.log.info('Restarting to apply changes...')
         else:
             yobot.log.info('Enabling dev mode...')
             config.set('dev_mode', True)
-            config.save()
+            await yobot.run_blocking(config.save)
             yobot.log.info('Restarting to apply changes...')
-        input('Press ENTER to EXIT.')
+        await ask(yobot, 'Press ENTER to EXIT.')
         yobot.stop_bot()
     except Exception as e:
         yobot.log.warning(f"An error occurred while toggling dev mode: {e}")
@@ -227,7 +287,7 @@ def toggle_dev_mode(yobot: 'YoBot') -> None:
         yobot.log.debug('Dev mode toggled successfully.')
 
 
-def toggle_debug_mode(yobot: 'YoBot') -> None:
+async def toggle_debug_mode(yobot: 'YoBot') -> None:
     """
     Toggles debug log messages.
     """
@@ -236,15 +296,15 @@ def toggle_debug_mode(yobot: 'YoBot') -> None:
         if config.get('log_level') == 'DEBUG':
             yobot.log.info('Disabling debug mode...')
             config.set('log_level', 'INFO')
-            config.save()
+            await yobot.run_blocking(config.save)
             yobot.log.info('Restarting to apply changes...')
         else:
             yobot.log.info('Enabling debug mode...')
             config.set('log_level', 'DEBUG')
-            config.save()
+            await yobot.run_blocking(config.save)
             yobot.log.setLevel(logging.DEBUG)
             yobot.log.info('Restarting to apply changes...')
-        input('Press ENTER to EXIT.')
+        await ask(yobot, 'Press ENTER to EXIT.')
         yobot.stop_bot()
     except FileNotFoundError:
         yobot.log.warning(f"Config file {yobot.config_file} not found.")
@@ -257,7 +317,7 @@ def toggle_debug_mode(yobot: 'YoBot') -> None:
         yobot.log.debug('Debug mode toggled successfully.')
 
 
-def remove_cogs(yobot: 'YoBot', cogs_dir: str) -> None:
+async def remove_cogs(yobot: 'YoBot', cogs_dir: str) -> None:
     """
     Uninstalls Cogs from the terminal. Use at the user's discretion. Has ignore list.
 
@@ -268,24 +328,24 @@ def remove_cogs(yobot: 'YoBot', cogs_dir: str) -> None:
     yobot.log.debug(f"Ignored cogs: {yobot.cogs_removal_blacklist}")
     try:
         config = yobot.config_file
-        remove_cogs = get_boolean_input(
+        remove_cogs = await ask_boolean(
             yobot, 'Do you want to uninstall cogs? (y/n) ')
         successful = False
 
         if remove_cogs == True:
-            remove_all = get_boolean_input(
+            remove_all = await ask_boolean(
                 yobot, 'Do you want to uninstall all cogs at once? (y/n) ')
 
             if remove_all == True:
-                confirm_remove_all = get_boolean_input(
+                confirm_remove_all = await ask_boolean(
                     yobot, 'Are you sure you want to uninstall all cogs? (y/n) ')
 
                 if confirm_remove_all == True:
                     yobot.log.info('Uninstalling all cogs...')
-                    for file in os.listdir(cogs_dir):
-                        if file.endswith('cog.py') and file not in config.get('blacklist.cog_removal'):
+                    for file in yobot.cog_index.files(cogs_dir):
+                        if not yobot.blacklist.matches('cog_removal', file):
                             try:
-                                os.remove(f'{cogs_dir}/{file}')
+                                await yobot.run_blocking(os.remove, f'{cogs_dir}/{file}')
                                 yobot.log.debug(
                                     f"Removed {file} from {cogs_dir}")
                             except Exception as e:
@@ -296,18 +356,18 @@ def remove_cogs(yobot: 'YoBot', cogs_dir: str) -> None:
             else:
                 yobot.log.info(
                     'Fetching the list of cogs from the cogs directory...')
-                files = [file for file in os.listdir(cogs_dir) if file.endswith(
-                    'cog.py') and file not in config.get('blacklist.cog_removal')]
+                files = [file for file in yobot.cog_index.files(cogs_dir)
+                         if not yobot.blacklist.matches('cog_removal', file)]
                 yobot.log.debug(f"List of installed cogs: {files}")
 
                 for i, file in enumerate(files, start=1):
                     yobot.log.info(f'{i}. {file}')
 
-                selected_cogs = input(
+                selected_cogs = await ask(yobot,
                     'Enter the numbers of the cogs you want to uninstall (separated by commas): ')
                 selected_cogs = [int(num.strip())
                                 for num in selected_cogs.split(',')]
-                confirm_removal = get_boolean_input(
+                confirm_removal = await ask_boolean(
                     yobot, 'Are you sure you want to uninstall the selected cogs? (y/n) ')
 
                 if confirm_removal == True:
@@ -317,7 +377,7 @@ def remove_cogs(yobot: 'YoBot', cogs_dir: str) -> None:
                     for cog_index in selected_cogs:
                         cog_name = files[cog_index - 1]
                         try:
-                            os.remove(f'{cogs_dir}/{cog_name}')
+                            await yobot.run_blocking(os.remove, f'{cogs_dir}/{cog_name}')
                             yobot.log.debug(
                                 f"Removed {cog_name} from {cogs_dir}")
                             yobot.log.info(f'{cog_name} uninstalled.')
@@ -354,8 +414,8 @@ def list_cogs(yobot: 'YoBot', cogs_dir: str) -> list:
     try:
         yobot.log.debug(
             f"Fetching list of installed cogs from directory '{cogs_dir}'...")
-        files = [file for file in os.listdir(
-            cogs_dir) if file.endswith('cog.py')]
+        entries = yobot.cog_index.refresh(cogs_dir)
+        files = list(entries)
 
         if not files:
             yobot.log.info('No cogs installed.')
@@ -364,7 +424,17 @@ def list_cogs(yobot: 'YoBot', cogs_dir: str) -> list:
             yobot.log.info('List of installed cogs:')
 
             for i, file in enumerate(files, start=1):
-                yobot.log.info(f'{i}. {file}')
+                entry = entries[file]
+                status = 'loaded' if yobot.cog_index.is_loaded(file) else 'not loaded'
+                if extension_name(file) in yobot.lazy_cogs.manifests and status == 'not loaded':
+                    status = 'deferred'
+                if entry['error']:
+                    status = f"error: {entry['error']}"
+                yobot.log.info(f'{i}. {file} ({status})')
+                names = [command['name'] if 'parent' not in command else f"{command['parent']} {command['name']}"
+                         for command in entry['commands']]
+                if names:
+                    yobot.log.info(f"     Commands: {', '.join(names)}")
             yobot.log.debug(
                 f"List of installed cogs fetched successfully from directory '{cogs_dir}'.")
             return files
@@ -377,7 +447,7 @@ def list_cogs(yobot: 'YoBot', cogs_dir: str) -> list:
         return []
 
 
-def wipe_config(yobot: 'YoBot') -> None:
+async def wipe_config(yobot: 'YoBot') -> None:
     """
     Wipes the config file and shuts down YoBot, causing setup to run on next startup
 
@@ -386,20 +456,20 @@ def wipe_config(yobot: 'YoBot') -> None:
     """
     try:
         config = yobot.config_file
-        config.load()
+        await yobot.run_blocking(config.load)
         yobot.log.warning(
             'This will wipe the config file and shut down YoBot.')
-        wipe = get_boolean_input(
+        wipe = await ask_boolean(
             yobot, 'Do you want to wipe the config file? (y/n) ')
 
         if wipe == True:
-            wipe_confirm = get_boolean_input(
+            wipe_confirm = await ask_boolean(
                 yobot, 'Are you sure you want to wipe config and restart? (y/n) ')
 
             if wipe_confirm == True:
-                os.remove(yobot.config_file)
+                await yobot.run_blocking(os.remove, yobot.config_file)
                 config.clear()
-                config.save()
+                await yobot.run_blocking(config.save)
                 yobot.log.info('Config file wiped.')
                 yobot.log.warning('YoBot will now shut down.')
                 exit_bot_terminal(yobot)
@@ -440,18 +510,18 @@ async def set_bot_name(yobot: 'YoBot') -> None:
         config = yobot.config_file
         yobot.log.debug('Setting bot name...')
         yobot.log.info(f'Current name: {config.get("bot_name")}')
-        change_bot_name = get_boolean_input(
+        change_bot_name = await ask_boolean(
             yobot, 'Do you want to change YoBots name? (y/n) ')
 
         if change_bot_name == True:
-            new_name = input('Enter new bot name: ')
+            new_name = await ask(yobot, 'Enter new bot name: ')
             try:
                 await yobot.user.edit(username=new_name)
                 yobot.log.info(
                     'Config change, bot_name: {} -> {}'.format(config.get('bot_name'), new_name))
                 config.set('bot_name', new_name)
                 config.set('update_bot', True)
-                config.save()
+                await yobot.run_blocking(config.save)
             except Exception as e:
                 yobot.log.error('Error: {}'.format(e))
                 yobot.log.warning('Bot name not changed on Discord servers.')
@@ -476,12 +546,11 @@ async def set_bot_avatar(yobot: 'YoBot') -> None:
         yobot.log.debug('Setting bot avatar...')
         yobot.log.info(
             'This sets the avatar to the image at ../resources/images/avatar.png')
-        change_avatar = get_boolean_input(
+        change_avatar = await ask_boolean(
             yobot, 'Do you want to change the avatar? (y/n) ')
         successful = True
 
-        with open(yobot.avatar_file, 'rb') as f:
-            new_avatar = f.read()
+        new_avatar = await yobot.run_blocking(read_file, yobot.avatar_file)
 
         if change_avatar == True:
             try:
@@ -494,7 +563,7 @@ async def set_bot_avatar(yobot: 'YoBot') -> None:
 
             if successful == False:
                 config.set('update_bot', True)
-                config.save()
+                await yobot.run_blocking(config.save)
 
             if successful == True:
                 yobot.log.info('Avatar changed.')
@@ -517,14 +586,14 @@ async def set_bot_presence(yobot: 'YoBot') -> None:
     try:
         config = yobot.config_file
         yobot.log.info('Current presence: {}'.format(config.get('presence')))
-        update_presence = get_boolean_input(
+        update_presence = await ask_boolean(
             yobot, 'Do you want to change the presence? (y/n) ')
 
         if update_presence == True:
-            new_presence = input('Enter new presence: ')
+            new_presence = await ask(yobot, 'Enter new presence: ')
             config.set('presence', new_presence)
             config.set('update_bot', True)
-            config.save()
+            await yobot.run_blocking(config.save)
             try:
                 # Try to change the presence on Discord servers.
                 await yobot.change_presence(activity=discord.Game(name=new_presence))
@@ -551,16 +620,16 @@ async def sync_commands(yobot: 'YoBot') -> None:
     try:
         config = yobot.config_file
         yobot.log.debug('Synchronizing commands...')
-        synchronize = get_boolean_input(
+        synchronize = await ask_boolean(
             yobot, 'Do you want to synchronize commands? (y/n) ')
 
         if synchronize == True:
             # Try to update commands on Discord servers.
             yobot.log.debug('Updating commands on Discord servers...')
-            sync_list = await yobot.tree.sync()
+            sync_list = await yobot.sync_tree()
             yobot.log.info(f'{len(sync_list)} commands synchronized.')
             config.set('update_bot', True)
-            config.save()
+            await yobot.run_blocking(config.save)
         else:
             yobot.log.info('Commands not synchronized.')
     except Exception as e:
@@ -582,17 +651,17 @@ async def set_owner(yobot: 'YoBot') -> None:
         config = yobot.config_file
         yobot.log.info(
             f"Current owner: {config.get('owner_name')} - {config.get('owner_id')}")
-        change_owner_name = get_boolean_input(
+        change_owner_name = await ask_boolean(
             yobot, 'Do you want to change YoBots owner? (y/n) ')
 
         if change_owner_name == True:
-            new_owner_name = input('Enter new owner name: ')
-            new_owner_id = input('Enter new owner id: ')
+            new_owner_name = await ask(yobot, 'Enter new owner name: ')
+            new_owner_id = await ask(yobot, 'Enter new owner id: ')
 
             config.set('owner_name', new_owner_name)
             config.set('owner_id', new_owner_id)
             config.set('update_bot', True)
-            config.save()
+            await yobot.run_blocking(config.save)
 
             yobot.log.info(
                 'Config change, owner_name: {} -> {}'.format(config.get('owner_name'), new_owner_name))
@@ -636,6 +705,19 @@ def show_help(yobot: 'YoBot') -> None:
         'devmode': 'Toggles developer mode.',
         'addblacklist': 'Adds a cog to the blacklist.',
         'removeblacklist': 'Removes a cog from the blacklist.',
+        'lag': 'Shows event loop lag statistics.',
+        'profile <seconds> [top]': 'Samples the bot and shows the hottest frames.',
+        'memory <start|stop|snap|diff|caches>': 'Traces allocations and sizes caches.',
+        'limits': 'Shows command limits and rejections.',
+        'setprefix <guild id> [prefix ...]': 'Sets or resets a guild\'s command prefixes.',
+        'restart': 'Reloads configs and cogs without disconnecting.',
+        'guildcogs <guild id> [on|off <cog>]': 'Shows or changes the cogs turned off in a guild.',
+        'http': 'Shows shared HTTP client requests and latency per host.',
+        'sends': 'Shows queued outgoing messages and how long they waited.',
+        'jobs': 'Shows scheduled jobs, when they run next and how long they take.',
+        'offload': 'Shows blocking and CPU heavy work run off the loop, per cog, with queue and run times.',
+        'snapshot': 'Shows the warm-start snapshot of guild state. Usage: snapshot [save]',
+        'slow': 'Shows how long slash commands take and how often they had to be deferred.',
     }
     try:
         yobot.log.debug('Starting show_help function...')
@@ -690,6 +772,19 @@ def show_aliases(yobot: 'YoBot') -> None:
         'developer': ['dev', 'devmode', 'dm'],
         'addblacklist': ['addbl', 'abl'],
         'removeblacklist': ['rmblist', 'rmbl'],
+        'lag': ['looplag', 'll'],
+        'profile': ['prof', 'pf'],
+        'memory': ['mem', 'm'],
+        'limits': ['limiter', 'lim'],
+        'setprefix': ['prefix', 'spx'],
+        'restart': ['softrestart', 'rs'],
+        'guildcogs': ['guildcog', 'gcogs'],
+        'http': ['web'],
+        'sends': ['sendqueue', 'sq'],
+        'jobs': ['scheduler'],
+        'offload': ['pools'],
+        'snapshot': ['snap'],
+        'slow': ['deferrals'],
     }
     try:
         yobot.log.debug('Starting show_aliases function...')
@@ -716,4 +811,332 @@ def ping(yobot: 'YoBot') -> None:
         yobot.log.debug('Pinging...')
         yobot.log.info('Pong!')
     except Exception as e:
-        yobot.log.error(f'Error in ping function: {e}')
\ No newline at end of file
+        yobot.log.error(f'Error in ping function: {e}')
+
+
+def show_loop_lag(yobot: 'YoBot') -> None:
+    """
+    Shows event loop lag statistics from the watchdog.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        stats = yobot.watchdog.stats()
+        yobot.log.info(f'Event loop: {describe_loop(asyncio.get_running_loop())}')
+        yobot.log.info(f"Loop lag over {stats['samples']} samples: "
+                       f"mean {stats['mean'] * 1000:.2f}ms | p95 {stats['p95'] * 1000:.2f}ms | max {stats['max'] * 1000:.2f}ms")
+        yobot.log.info(f"Stalls over {yobot.watchdog.threshold}s: {stats['stalls']}")
+        if yobot.watchdog.last_stall:
+            yobot.log.info(f'Last stall: {yobot.watchdog.last_stall}')
+    except Exception as e:
+        yobot.log.error(f'Error in show_loop_lag function: {e}')
+
+
+
+async def profile(yobot: 'YoBot', seconds: str = '10', top: str = '15') -> None:
+    """
+    Samples the running bot's stack for a while without pausing it.
+
+    The samples are written to the log directory in collapsed-stack format for flamegraph tools,
+    and the hottest frames are shown along with the cog they were running for.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        seconds (str): The number of seconds to sample for.
+        top (str): The number of hot frames to show.
+    """
+    try:
+        duration = float(seconds)
+        limit = int(top)
+        profiler = YoBotProfiler(yobot)
+        yobot.log.info(f'Profiling for {duration:g}s...')
+        profiler.start()
+        try:
+            await asyncio.sleep(duration)  # The loop keeps serving the bot while it is sampled.
+        finally:
+            profiler.stop()
+
+        if not profiler.samples:
+            return yobot.log.warning('No samples were collected.')
+        log_dir = yobot.config_file.get('file_paths.log_dir') or '.'
+        await yobot.run_blocking(os.makedirs, log_dir, exist_ok=True)
+        file = profile_file(log_dir)
+        await yobot.run_blocking(profiler.write_collapsed, file)
+
+        busy = profiler.samples - profiler.idle
+        yobot.log.info(f'{profiler.samples} samples, {busy / profiler.samples * 100:.1f}% busy. Collapsed stacks written to {file}')
+        yobot.log.info(f'Top {limit} frames:')
+        for i, (frame, cog, count) in enumerate(profiler.top_frames(limit), start=1):
+            yobot.log.info(f'{i}. {count / profiler.samples * 100:5.1f}% {frame} [{cog or "core"}]')
+        yobot.log.info('Samples by cog:')
+        for cog, count in profiler.cogs.most_common():
+            yobot.log.info(f'   {count / profiler.samples * 100:5.1f}% {cog}')
+    except ValueError:
+        yobot.log.warning('Usage: profile <seconds> [top]')
+    except Exception as e:
+        yobot.log.error(f'Error in profile function: {e}')
+
+
+async def memory(yobot: 'YoBot', action: str = 'caches', *args: str) -> None:
+    """
+    Memory diagnostics for the running bot.
+
+    `start [frames]` and `stop` control allocation tracing, `snap` takes a snapshot, `diff`
+    compares the last two snapshots by cog and module, and `caches` sizes discord.py's caches.
+    Each report is also written to the log directory. Snapshots are taken and compared, and
+    reports written, on a worker thread so the bot keeps running meanwhile.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        action (str): The diagnostic to run.
+    """
+    try:
+        diagnostics = yobot.memory
+        action = action.lower()
+        if action == 'start':
+            diagnostics.start(int(args[0]) if args else 10)
+            yobot.log.info('Tracing allocations. Take snapshots with `memory snap`.')
+
+        elif action == 'stop':
+            diagnostics.stop()
+            yobot.log.info('Stopped tracing allocations.')
+
+        elif action in ['snap', 'snapshot']:
+            if not diagnostics.tracing:
+                return yobot.log.warning('Tracing is not running, start it with `memory start`.')
+            groups = sorted((await yobot.run_blocking(diagnostics.snapshot)).items(), key=lambda item: item[1][0], reverse=True)
+            file = await yobot.run_blocking(diagnostics.write_report, 'snap', ['group', 'size', 'count'], [(name, size, count) for name, (size, count) in groups])
+            current, peak = tracemalloc.get_traced_memory()
+            yobot.log.info(f'Snapshot {len(diagnostics.snapshots)} taken, traced {format_bytes(current)} (peak {format_bytes(peak)}). Report: {file}')
+            for name, (size, count) in groups[:10]:
+                yobot.log.info(f'   {format_bytes(size):>10} {count:>9} blocks  {name}')
+
+        elif action == 'diff':
+            rows = await yobot.run_blocking(diagnostics.diff)
+            file = await yobot.run_blocking(diagnostics.write_report, 'diff', ['group', 'size_diff', 'count_diff', 'size', 'count'], rows)
+            yobot.log.info(f'Changes since the previous snapshot. Report: {file}')
+            for name, size_diff, count_diff, size, _ in rows[:10]:
+                yobot.log.info(f'   {format_bytes(size_diff):>10} {count_diff:>+9} blocks  {name} ({format_bytes(size)})')
+
+        elif action == 'caches':
+            sizes = diagnostics.cache_sizes()  # On the loop, since the caches change while it runs.
+            file = await yobot.run_blocking(diagnostics.write_report, 'caches', ['cache', 'objects', 'approx_size'], [(name, count, size) for name, (count, size) in sizes.items()])
+            yobot.log.info(f'Approximate cache sizes. Report: {file}')
+            for name, (count, size) in sizes.items():
+                yobot.log.info(f'   {name:<10} {count:>9} objects  ~{format_bytes(size)}')
+
+        else:
+            yobot.log.warning('Usage: memory <start [frames]|stop|snap|diff|caches>')
+    except ValueError as e:
+        yobot.log.warning(f'{e}')
+    except Exception as e:
+        yobot.log.error(f'Error in memory function: {e}')
+
+
+def show_limits(yobot: 'YoBot') -> None:
+    """
+    Shows the command limiter's configuration and counters.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        limiter = yobot.limiter
+        stats = limiter.stats()
+        for scope, bucket in limiter.buckets.items():
+            yobot.log.info(f"{scope:<8} {bucket.rate} per {bucket.per:g}s, {stats['buckets'][scope]} active buckets")
+        yobot.log.info(f"Concurrency: {stats['running']}/{limiter.max_concurrency} running, "
+                       f"{limiter.guild_concurrency} per guild, {stats['active_guilds']} active guilds")
+        rejections = ', '.join(f'{scope} {count}' for scope, count in stats['rejections'].items()) or 'none'
+        yobot.log.info(f"Accepted: {stats['accepted']} | Rejected: {rejections}")
+    except Exception as e:
+        yobot.log.error(f'Error in show_limits function: {e}')
+
+
+def show_http(yobot: 'YoBot') -> None:
+    """
+    Shows the shared HTTP client's requests, cache use and latency per host.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        stats = yobot.web.stats()
+        if not stats:
+            return yobot.log.info('No HTTP requests made yet.')
+        for host, host_stats in stats.items():
+            yobot.log.info(f"{host}: {host_stats['requests']} requests, {host_stats['errors']} errors, "
+                           f"{host_stats['cache_hits']} cached, {host_stats['revalidated']} revalidated, "
+                           f"p50 {host_stats['p50']:.1f}ms, p95 {host_stats['p95']:.1f}ms")
+    except Exception as e:
+        yobot.log.error(f'Error in show_http function: {e}')
+
+
+def show_sends(yobot: 'YoBot') -> None:
+    """
+    Shows the send queues' depth, counters and wait times.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        stats = yobot.send_queue.stats()
+        yobot.log.info(f"{stats['depth']} messages queued in {stats['queues']} queues | {stats['sent']} sent, "
+                       f"{stats['coalesced']} joined into others, {stats['failed']} failed, {stats['dropped']} dropped")
+        yobot.log.info(f"Waited p50 {stats['wait_p50']:.1f}ms, p95 {stats['wait_p95']:.1f}ms, max {stats['wait_max']:.1f}ms")
+        for key, depth in stats['deepest'].items():
+            yobot.log.info(f'{key}: {depth} queued')
+    except Exception as e:
+        yobot.log.error(f'Error in show_sends function: {e}')
+
+
+def show_jobs(yobot: 'YoBot') -> None:
+    """
+    Shows the scheduled jobs with their next run and runtimes.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        jobs = yobot.scheduler.stats()
+        if not jobs:
+            return yobot.log.info('No jobs scheduled.')
+        for job in jobs:
+            state = 'running' if job['running'] else f"next in {max(0.0, job['next_in']):.1f}s"
+            yobot.log.info(f"{job['name']} ({job['trigger']}): {state} | {job['runs']} runs, {job['failures']} failed, "
+                           f"{job['coalesced']} skipped | avg {job['avg_ms']:.1f}ms, max {job['max_ms']:.1f}ms")
+    except Exception as e:
+        yobot.log.error(f'Error in show_jobs function: {e}')
+
+
+def show_offload(yobot: 'YoBot') -> None:
+    """
+    Shows the offloaded calls of each cog with their queue and run times.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        offload = yobot.offload
+        yobot.log.info(f'{offload.threads} threads, {offload.processes} processes, '
+                       f'{offload.per_cog} calls at once per cog, {offload.timeout}s timeout.')
+        cogs = offload.report()
+        if not cogs:
+            return yobot.log.info('No work offloaded yet.')
+        for cog, stats in cogs.items():
+            yobot.log.info(f"{cog}: {stats['calls']} calls, {stats['running']} running, {stats['waiting']} waiting, "
+                           f"{stats['errors']} failed, {stats['timeouts']} timed out | "
+                           f"queue p50 {stats['queue_p50']:.1f}ms, p95 {stats['queue_p95']:.1f}ms | "
+                           f"run p50 {stats['run_p50']:.1f}ms, p95 {stats['run_p95']:.1f}ms")
+    except Exception as e:
+        yobot.log.error(f'Error in show_offload function: {e}')
+
+
+async def show_snapshot(yobot: 'YoBot', action: str = '') -> None:
+    """
+    Shows what the warm-start snapshot holds, or saves a new one from the live state.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        action (str): 'save' to write a snapshot now.
+    """
+    try:
+        snapshot = yobot.snapshot
+        if not snapshot.enabled:
+            return yobot.log.info('The snapshot is turned off, set snapshot.enabled in the config to use it.')
+        if action.lower() == 'save':
+            data = snapshot.capture()  # On the loop, while the guilds cannot change, then written from a worker thread.
+            if data is not None and await yobot.run_blocking(snapshot.save, data):
+                yobot.log.info(f'Snapshot of {len(yobot.guilds)} guilds saved to {snapshot.file}.')
+            else:
+                yobot.log.warning('No snapshot saved, YoBot has no guilds yet.')
+            return
+        stats = snapshot.stats()
+        if stats['saved_at'] is None:
+            return yobot.log.info('No snapshot was loaded at startup.')
+        yobot.log.info(f"Snapshot from {time.ctime(stats['saved_at'])}: {stats['guilds']} guilds, {stats['decoded']} read, "
+                       f"{'still mapped' if stats['mapped'] else 'unmapped'}.")
+        yobot.log.info(f"Reconciled with {stats['reconciled']} live guilds, {stats['changed']} had changed roles.")
+        synced = 'matches' if stats['tree_hash'] == yobot.tree_hash() else 'differs from'
+        yobot.log.info(f'The command tree Discord last received {synced} the current one.')
+    except Exception as e:
+        yobot.log.error(f'Error in show_snapshot function: {e}')
+
+
+def show_slow(yobot: 'YoBot') -> None:
+    """
+    Shows each slash command's runtimes and how often YoBot deferred it, the most deferred first.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        deferrals = yobot.deferrals
+        state = f'after {deferrals.threshold}s' if deferrals.enabled else 'turned off'
+        yobot.log.info(f'Automatic deferral {state}, {deferrals.failed} deferrals failed.')
+        commands = deferrals.report()
+        if not commands:
+            return yobot.log.info('No slash commands run yet.')
+        for row in commands:
+            yobot.log.info(f"/{row['command']}: {row['calls']} calls, {row['deferred']} deferred ({row['deferred_pct']:.0f}%) | "
+                           f"p50 {row['p50']:.1f}ms, p95 {row['p95']:.1f}ms, max {row['max']:.1f}ms")
+    except Exception as e:
+        yobot.log.error(f'Error in show_slow function: {e}')
+
+
+def set_prefix(yobot: 'YoBot', guild_id: str = '', *prefixes: str) -> None:
+    """
+    Sets a guild's command prefixes, or shows them when none are given.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        guild_id (str): The guild's ID.
+        prefixes (str): The new prefixes, `default` resets the guild to the default prefix.
+    """
+    try:
+        if not guild_id.isdigit():
+            return yobot.log.warning('Usage: setprefix <guild id> [prefix ...|default]')
+        guild = int(guild_id)
+        if not prefixes:
+            return yobot.log.info(f"Prefixes for {guild}: {' '.join(yobot.prefixes.for_guild(guild))}")
+        yobot.prefixes.set(guild, [] if prefixes == ('default',) else prefixes)
+        yobot.log.info(f"Prefixes for {guild} set to: {' '.join(yobot.prefixes.for_guild(guild))}")
+    except Exception as e:
+        yobot.log.error(f'Error in set_prefix function: {e}')
+
+
+def guild_cogs(yobot: 'YoBot', guild_id: str = '', action: str = '', cog: str = '') -> None:
+    """
+    Shows the cogs turned off in a guild, or turns one on or off.
+
+    Args:
+        yobot (YoBot): The bot instance.
+        guild_id (str): The guild's ID.
+        action (str): `on` or `off`, or nothing to show the guild's settings.
+        cog (str): The cog's file or extension name.
+    """
+    try:
+        if not guild_id.isdigit() or (action and (action.lower() not in ['on', 'off'] or not cog)):
+            return yobot.log.warning('Usage: guildcogs <guild id> [on|off <cog>]')
+        guild = int(guild_id)
+        if action:
+            return yobot.log.info(yobot.guild_cogs.change(guild, cog, action.lower() == 'on'))
+        disabled = yobot.guild_cogs.disabled_in(guild)
+        yobot.log.info(f"Cogs turned off in {guild}: {', '.join(disabled) or 'none'}")
+    except Exception as e:
+        yobot.log.error(f'Error in guild_cogs function: {e}')
+
+
+async def soft_restart(yobot: 'YoBot') -> None:
+    """
+    Restarts YoBot in place from the terminal, keeping it connected to Discord.
+
+    Args:
+        yobot (YoBot): The bot instance.
+    """
+    try:
+        await yobot.soft_restart()
+    except Exception as e:
+        yobot.log.debug(f'Error in soft_restart: {traceback.format_exc()}')
+        yobot.log.error(f'Error in soft_restart function: {e}')
@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING
+
+import discord
+from discord import app_commands
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+
+class YoBotCommandTree(app_commands.CommandTree):
+    """
+    The application command tree for YoBot.
+
+    Tracks running application commands so shutdown can wait for them, and turns new ones
+    away once YoBot has stopped accepting commands. Lazy cogs are loaded before their
+    commands are looked up, and commands from cogs turned off in a guild are refused.
+    Commands that run long are deferred before Discord's response deadline.
+    """
+
+    client: 'YoBot'
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Turns away commands from cogs turned off in the guild."""
+        return await self.client.guild_cogs.interaction_check(interaction)
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        """Runs an application command interaction."""
+        if not self.client.accepting:
+            if interaction.type is discord.InteractionType.application_command:
+                try:
+                    await interaction.response.send_message('YoBot is shutting down, please try again shortly.', ephemeral=True)
+                except discord.HTTPException:
+                    pass
+            return
+        with self.client.in_flight():
+            deferral = self.client.deferrals.watch(interaction)  # Loading a lazy cog counts towards the deadline too.
+            try:
+                if self.client.lazy_cogs.enabled:
+                    await self.client.lazy_cogs.prepare_interaction(interaction)
+                await super()._call(interaction)
+            finally:
+                await self.client.deferrals.finish(deferral)
@@ -0,0 +1,223 @@
+import itertools
+import re
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+import discord
+
+try:
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # Python 3.10 and older.
+    import sre_parse  # type: ignore
+
+if TYPE_CHECKING:
+    from bot.yobot import YoBot
+
+# The shortest literal worth using to skip a regex, shorter ones are found in most messages.
+MIN_LITERAL = 3
+
+
+class YoBotTriggerSubscription():
+    """
+    Keywords and regexes one cog wants to hear about, with the callback to run on a match.
+
+    Args:
+        callback (Callable): `async def callback(message, matches)`, where matches are the
+            keywords and patterns found in the message.
+        keywords (list): Words or phrases, matched case insensitively.
+        patterns (list): Regexes, matched with `search` against the original message.
+        whole_word (bool): Whether keywords only match whole words.
+    """
+
+    def __init__(self, callback: Callable, keywords: Iterable[str], patterns: Iterable[str], whole_word: bool):
+        self.callback = callback
+        self.keywords = [keyword.casefold() for keyword in keywords if keyword]
+        self.patterns: List[Pattern[str]] = [re.compile(pattern) for pattern in patterns]
+        self.whole_word = whole_word
+        self.module: Optional[str] = getattr(callback, '__module__', None)
+
+
+class YoBotTriggers():
+    """
+    A shared keyword and regex scanner for message-scanning cogs.
+
+    Every keyword from every cog goes into one Aho-Corasick automaton, so a message is read
+    once no matter how many cogs or keywords there are. Each regex is reduced to the longest
+    literal it requires, which goes into the same automaton, and the regex itself only runs on
+    messages containing that literal. Only cogs with a match get a callback, one per message.
+    The automaton is rebuilt on the next message after subscriptions change.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+    """
+
+    def __init__(self, yobot: 'YoBot'):
+        self.yobot = yobot
+        self.subscriptions: Dict[int, YoBotTriggerSubscription] = {}
+        self._ids = itertools.count(1)
+        self._dirty = True
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._outputs: List[Tuple[int, str, bool, Optional[Pattern[str]]]] = []
+        self._always: List[Tuple[int, Pattern[str]]] = []
+
+    def register(self, callback: Callable, keywords: Iterable[str] = (), patterns: Iterable[str] = (),
+                 whole_word: bool = True) -> int:
+        """
+        Subscribes a callback to messages containing any of the keywords or patterns.
+
+        Subscriptions made from a cog are dropped when its extension is unloaded.
+
+        Args:
+            callback (Callable): `async def callback(message, matches)`.
+            keywords (list): Words or phrases, matched case insensitively.
+            patterns (list): Regexes.
+            whole_word (bool): Whether keywords only match whole words.
+
+        Returns:
+            int: The subscription's ID, for `unregister`.
+        """
+        subscription_id = next(self._ids)
+        self.subscriptions[subscription_id] = YoBotTriggerSubscription(callback, keywords, patterns, whole_word)
+        self._dirty = True
+        return subscription_id
+
+    def unregister(self, subscription_id: int) -> None:
+        """Removes a subscription."""
+        if self.subscriptions.pop(subscription_id, None) is not None:
+            self._dirty = True
+
+    def unregister_module(self, module: str) -> None:
+        """Removes the subscriptions made from a module or its submodules."""
+        for subscription_id, subscription in list(self.subscriptions.items()):
+            if subscription.module and (subscription.module == module or subscription.module.startswith(f'{module}.')):
+                self.unregister(subscription_id)
+
+    def _add(self, text: str, output: Tuple[int, str, bool, Optional[Pattern[str]]]) -> None:
+        """Adds a string to the trie, with what a match of it means."""
+        state = 0
+        for character in text:
+            following = self._goto[state].get(character)
+            if following is None:
+                following = self._goto[state][character] = len(self._goto)
+                self._goto.append({})
+                self._out.append(())
+            state = following
+        self._out[state] += (len(self._outputs),)
+        self._outputs.append(output)
+
+    def build(self) -> None:
+        """Compiles every subscription into the automaton."""
+        self._goto, self._out, self._outputs, self._always = [{}], [()], [], []
+        for subscription_id, subscription in self.subscriptions.items():
+            for keyword in subscription.keywords:
+                self._add(keyword, (subscription_id, keyword, subscription.whole_word, None))
+            for pattern in subscription.patterns:
+                literal = required_literal(pattern)
+                if literal is None:
+                    self._always.append((subscription_id, pattern))
+                else:
+                    self._add(literal.casefold(), (subscription_id, pattern.pattern, False, pattern))
+        # Breadth first, so every state's failure link points at a state that is already complete.
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for character, following in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(character, 0)
+                self._fail[following] = target if target != following else 0
+                self._out[following] += self._out[self._fail[following]]
+                queue.append(following)
+        self._dirty = False
+
+    def match(self, content: str) -> Dict[int, List[str]]:
+        """
+        Scans a message once for every subscription.
+
+        Args:
+            content (str): The message content.
+
+        Returns:
+            dict: The matched keywords and patterns by subscription ID, only for subscriptions with matches.
+        """
+        if self._dirty:
+            self.build()
+        found: Dict[int, List[str]] = {}
+        text = content.casefold()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        checked = set()
+        for end, character in enumerate(text, 1):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            if not out[state]:
+                continue
+            for output in out[state]:
+                subscription_id, name, whole_word, pattern = self._outputs[output]
+                if pattern is not None:
+                    if output in checked:
+                        continue
+                    checked.add(output)
+                    if pattern.search(content) is None:
+                        continue
+                elif whole_word and not _is_whole_word(text, end - len(name), end):
+                    continue
+                matches = found.setdefault(subscription_id, [])
+                if name not in matches:
+                    matches.append(name)
+        for subscription_id, pattern in self._always:
+            if pattern.search(content) is not None:
+                matches = found.setdefault(subscription_id, [])
+                if pattern.pattern not in matches:
+                    matches.append(pattern.pattern)
+        return found
+
+    async def on_message(self, message: discord.Message) -> None:
+        """Scans each message and schedules the callbacks of the subscriptions it matches."""
+        if not self.subscriptions or message.author == self.yobot.user or not message.content:
+            return
+        for subscription_id, matches in self.match(message.content).items():
+            callback = self.subscriptions[subscription_id].callback
+            # Scheduled like a listener, so errors are reported and per-guild cog settings apply.
+            self.yobot._schedule_event(callback, 'on_trigger', message, matches)
+
+    def add_listeners(self) -> None:
+        """Registers the message listener on the bot."""
+        self.yobot.add_listener(self.on_message, 'on_message')
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Returns whether text[start:end] is not part of a longer word."""
+    return ((start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_'))
+            and (end == len(text) or not (text[end].isalnum() or text[end] == '_')))
+
+
+def required_literal(pattern: Pattern[str]) -> Optional[str]:
+    """
+    Returns the longest run of plain characters every match of a regex contains.
+
+    Only the top level of the pattern is looked at, so alternations and groups give nothing
+    and the regex then runs on every message.
+
+    Args:
+        pattern (Pattern): The compiled regex.
+
+    Returns:
+        str: The literal, or None if there is none at least `MIN_LITERAL` characters long.
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    best, run = '', []
+    for op, value in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        if len(run) > len(best):
+            best = ''.join(run)
+        run = []
+    return best if len(best) >= MIN_LITERAL else None
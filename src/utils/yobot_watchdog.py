@@ -0,0 +1,137 @@
+import collections
+import statistics
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from bot.yobot import YoBot
+
+
+class YoBotWatchdog():
+    """
+    Measures event loop lag from a helper thread.
+
+    Every interval the helper thread schedules a callback on the loop and times how long it
+    takes to run. If the loop does not get to it within the threshold, the loop thread's stack
+    is captured and logged together with the cog and command that were running.
+
+    Args:
+        yobot (YoBot): The YoBot instance.
+        threshold (float): The lag in seconds that counts as a stall.
+        interval (float): The number of seconds between measurements.
+        history (int): The number of lag samples to keep for statistics.
+    """
+
+    def __init__(self, yobot: 'YoBot', threshold: float = 0.25, interval: float = 0.5, history: int = 1200):
+        self.yobot = yobot
+        self.threshold = threshold
+        self.interval = interval
+        self.samples = collections.deque(maxlen=history)
+        self.stalls = 0
+        self.worst = 0.0
+        self.last_stall: Optional[str] = None
+        self._loop: Optional['asyncio.AbstractEventLoop'] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, loop: 'asyncio.AbstractEventLoop') -> None:
+        """Starts watching a loop, must be called from the loop's thread."""
+        if self._thread is not None:
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='YoBotWatchdog', daemon=True)
+        self._thread.start()
+        self.yobot.log.debug(f'Loop watchdog started with a {self.threshold}s threshold.')
+
+    def stop(self) -> None:
+        """Stops the helper thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + self.threshold)
+            self._thread = None
+
+    def _watch(self) -> None:
+        """The helper thread's main loop."""
+        while not self._stop.wait(self.interval):
+            answered = threading.Event()
+            posted = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)  # type: ignore
+            except RuntimeError:
+                return  # The loop is closed.
+
+            if not answered.wait(self.threshold):
+                self._report_stall()
+                while not answered.wait(self.interval):
+                    if self._stop.is_set():
+                        return
+            lag = time.perf_counter() - posted
+            self.samples.append(lag)
+            self.worst = max(self.worst, lag)
+
+    def _report_stall(self) -> None:
+        """Logs the loop thread's stack along with the cog and command being run."""
+        self.stalls += 1
+        frame = sys._current_frames().get(self._loop_thread)  # type: ignore
+        if frame is None:
+            return
+        cog, command = self.find_culprit(frame)
+        stack = ''.join(traceback.format_stack(frame))
+        self.last_stall = f'cog={cog or "unknown"} command={command or "unknown"}'
+        self.yobot.log.warning(
+            f'Event loop blocked for over {self.threshold}s ({self.last_stall}). Blocking call stack:\n{stack}')
+
+    @staticmethod
+    def find_culprit(frame: Optional[FrameType]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Walks a stack from the innermost frame outwards to find the cog and command running it.
+
+        Args:
+            frame (FrameType): The innermost frame.
+
+        Returns:
+            tuple: The cog name and command name, either may be None.
+        """
+        cog = command = None
+        while frame is not None and (cog is None or command is None):
+            local_vars = frame.f_locals
+            if command is None:
+                ctx = local_vars.get('ctx')
+                app_command = getattr(local_vars.get('interaction'), 'command', None)
+                if isinstance(ctx, commands.Context) and ctx.command is not None:
+                    command = ctx.command.qualified_name
+                elif app_command is not None:
+                    command = getattr(app_command, 'qualified_name', None)
+            if cog is None:
+                owner = local_vars.get('self')
+                module = frame.f_globals.get('__name__', '')
+                if isinstance(owner, commands.Cog):
+                    cog = owner.qualified_name
+                elif module.startswith('cogs.'):
+                    cog = module
+            frame = frame.f_back
+        return cog, command
+
+    def stats(self) -> dict:
+        """Returns loop lag statistics in seconds."""
+        samples = sorted(self.samples)
+        if not samples:
+            return {'samples': 0, 'mean': 0.0, 'p95': 0.0, 'max': self.worst, 'stalls': self.stalls}
+        return {
+            'samples': len(samples),
+            'mean': statistics.fmean(samples),
+            'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            'max': self.worst,
+            'stalls': self.stalls,
+        }